@@ -0,0 +1,159 @@
+"""
+Benchmarks of the stepping engines, the rendering of the grid and the pattern I/O:
+
+    python -m benchmarks run --preset quick --out base.json
+    python -m benchmarks run --engines bitpacked,jit --sizes 4096x4096 --suites engine --out new.json
+    python -m benchmarks compare base.json new.json --threshold 0.1
+
+The comparison exits with code 1 if any case regressed by more than the threshold, so it can gate a CI job.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+from engine import engines
+from benchmarks import suites
+
+SUITES = ("engine", "render", "io")
+PRESETS = {
+    "quick": {"sizes": [(150, 250), (1024, 1024)], "densities": [0.05, 0.35]},
+    "full": {"sizes": [(150, 250), (1024, 1024), (4096, 4096), (16384, 16384)], "densities": [0.05, 0.2, 0.35]},
+}
+# Largest grid of the I/O cases (the text formats of a 16k x 16k grid take minutes to write)
+_IO_MAX_CELLS = 4096 * 4096
+
+
+def _grid_size(value: str) -> tuple:
+    try:
+        rows, cols = (int(size) for size in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid grid size: {value} (expected ROWSxCOLS)")
+    return rows, cols
+
+
+def _list(item_type):
+    def parse(value: str) -> list:
+        return [item_type(item) for item in value.split(",") if item]
+    return parse
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the engines, the rendering "
+                                                                              "and the pattern I/O")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--preset", choices=PRESETS, default="quick", help="grid sizes and densities of the random "
+                                                                               "soups (default: %(default)s)")
+    run_parser.add_argument("--sizes", type=_list(_grid_size), default=None,
+                            help="comma separated grid sizes as ROWSxCOLS (overrides the preset)")
+    run_parser.add_argument("--densities", type=_list(float), default=None,
+                            help="comma separated densities of the random soups (overrides the preset)")
+    run_parser.add_argument("--engines", type=_list(str), default=None,
+                            help=f"comma separated engines (default: all of {', '.join(engines.get_available_engines())})")
+    run_parser.add_argument("--suites", type=_list(str), default=list(SUITES),
+                            help=f"comma separated suites among {', '.join(SUITES)} (default: all)")
+    run_parser.add_argument("--min-time", type=float, default=0.5, help="time budget of each case in seconds (default: "
+                                                                        "%(default)s)")
+    run_parser.add_argument("--seed", type=int, default=0, help="seed of the random soups (default: %(default)s)")
+    run_parser.add_argument("-o", "--out", default=None, help="JSON file where to save the results")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files and report the regressions")
+    compare_parser.add_argument("base", help="JSON results of the reference run")
+    compare_parser.add_argument("new", help="JSON results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative throughput loss counted as a regression (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def _get_meta() -> dict:
+    return {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(), "machine": platform.machine(),
+            "cpu_count": os.cpu_count()}
+
+
+def _format_throughput(result: dict) -> str:
+    if result["skipped"]:
+        return f"skipped ({result['skipped']})"
+    return f"{result['throughput']:.4g} {result['unit']}"
+
+
+def run(args: argparse.Namespace) -> int:
+    unknown = [suite for suite in args.suites if suite not in SUITES] + \
+              [engine for engine in (args.engines or []) if engine not in engines.ENGINES]
+    if unknown:
+        print(f"error: unknown suites or engines: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    sizes = args.sizes or PRESETS[args.preset]["sizes"]
+    densities = args.densities or PRESETS[args.preset]["densities"]
+    cases = []
+    if "engine" in args.suites:
+        cases.append(suites.engine_suite(sizes, densities, args.engines or engines.get_available_engines(),
+                                         args.min_time, args.seed, explicit_engines=args.engines is not None))
+    if "render" in args.suites:
+        cases.append(suites.render_suite(sizes, densities, args.min_time, args.seed))
+    if "io" in args.suites:
+        cases.append(suites.io_suite(sizes, densities, args.min_time, args.seed, _IO_MAX_CELLS))
+
+    results = []
+    for suite_cases in cases:
+        for result in suite_cases:
+            result = result.to_dict()
+            results.append(result)
+            print(f"{result['name']}: {_format_throughput(result)}", flush=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": _get_meta(), "results": results}, f, indent=2)
+        print(f"results saved to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    try:
+        with open(args.base) as f:
+            base_results = {result["name"]: result for result in json.load(f)["results"]}
+        with open(args.new) as f:
+            new_results = {result["name"]: result for result in json.load(f)["results"]}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    regressions = 0
+    compared = 0
+    names = [name for name in new_results if name in base_results]
+    width = max((len(name) for name in names), default=4)
+    print(f"{'case':<{width}}  {'base':>12}  {'new':>12}  {'change':>8}")
+    for name in names:
+        base_result, new_result = base_results[name], new_results[name]
+        if base_result["skipped"] or new_result["skipped"] or not base_result["throughput"]:
+            continue
+        compared += 1
+        change = new_result["throughput"] / base_result["throughput"] - 1
+        regressed = change < -args.threshold
+        regressions += regressed
+        print(f"{name:<{width}}  {base_result['throughput']:>12.4g}  {new_result['throughput']:>12.4g}  "
+              f"{change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+
+    missing = [name for name in base_results if name not in new_results]
+    if missing:
+        print(f"{len(missing)} cases of the base run are missing from the new run")
+    print(f"{regressions} regressions over {compared} cases (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv: list = None) -> int:
+    args = _parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
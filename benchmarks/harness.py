@@ -0,0 +1,105 @@
+"""
+Measurement helpers of the benchmarks: timing with a time budget, peak resident memory and allocations
+"""
+import gc
+import resource
+import sys
+import time
+import tracemalloc
+
+
+class Result:
+    """
+    Measurements of a benchmark case
+    """
+
+    def __init__(self, suite: str, name: str, params: dict):
+        """
+        :param suite: The suite of the case (e.g. "engine")
+        :param name: Unique name of the case, used to match the cases of two runs
+        :param params: Parameters of the case (e.g. engine, grid size, density)
+        """
+        self.suite = suite
+        self.name = name
+        self.params = params
+        # Main figure of merit of the case (higher is better) and its unit
+        self.throughput = None
+        self.unit = None
+        self.metrics = {}
+        self.skipped = None
+
+    def to_dict(self) -> dict:
+        return {"suite": self.suite, "name": self.name, "params": self.params, "throughput": self.throughput,
+                "unit": self.unit, "metrics": self.metrics, "skipped": self.skipped}
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident memory of the process, when the OS allows it (Linux), so that get_peak_rss measures a
+    single case
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def get_peak_rss() -> int:
+    """
+    :return: Peak resident memory of the process in bytes (since the last reset_peak_rss, where supported)
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def measure_allocations(function, repeat: int = 1) -> dict:
+    """
+    Trace the memory allocated by a function (numpy arrays included) with tracemalloc
+
+    :param function: The function to trace
+    :param repeat: Number of calls
+    :return: The peak of the memory allocated during a call and the memory still allocated after the calls, in bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start_current, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            function()
+            _, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_bytes": peak, "alloc_retained_bytes": end_current - start_current}
+
+
+def time_calls(function, min_time: float, max_calls: int = None) -> tuple:
+    """
+    Call a function repeatedly until the time budget is spent (at least once)
+
+    :param function: The function to time
+    :param min_time: Time budget in seconds
+    :param max_calls: Maximum number of calls (default: unlimited)
+    :return: A tuple (calls, elapsed seconds)
+    """
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while calls == 0 or (elapsed < min_time and (max_calls is None or calls < max_calls)):
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls, elapsed
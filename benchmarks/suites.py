@@ -0,0 +1,222 @@
+"""
+Benchmark cases of the stepping engines, the rendering of the grid and the pattern I/O.
+Each suite runs its cases and yields their results (see benchmarks.harness.Result).
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from config import config
+from engine import engines
+from utils import patterns, snapshot, viewport
+from benchmarks.harness import Result, get_peak_rss, measure_allocations, reset_peak_rss, time_calls
+
+# Largest soup evolved by the unbounded engines unless they are explicitly requested: their cost grows with the number
+# of alive cells, so dense soups of large grids would take minutes per generation
+_UNBOUNDED_MAX_CELLS = 1024 * 1024
+# Size (width, height) of the widget the grid is rendered to in the rendering cases
+_RENDER_SIZE = (1280, 800)
+# Formats of the I/O cases (the snapshot one included)
+_IO_FORMATS = (".cells", ".rle", ".lif", snapshot.SNAPSHOT_EXTENSION)
+
+
+def format_size(grid_size: tuple) -> str:
+    return f"{grid_size[0]}x{grid_size[1]}"
+
+
+def random_grid(grid_size: tuple, density: float, seed: int) -> np.ndarray:
+    """
+    :return: Numpy array (uint8) with random alive cells (age 1) with the given density
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.zeros(grid_size, dtype=np.uint8)
+    # Fill by rows to bound the memory of the random numbers on huge grids
+    for row in range(0, grid_size[0], 1024):
+        grid[row:row + 1024] = rng.random((min(1024, grid_size[0] - row), grid_size[1]), dtype=np.float32) < density
+    return grid
+
+
+def bundled_patterns() -> dict:
+    """
+    :return: The patterns of the resources folder, each one centered in a grid of the configured size
+    """
+    grids = {}
+    for pattern_name in patterns.get_available_patterns():
+        grid_pattern, _ = patterns.read_pattern(patterns.get_pattern_file(pattern_name))
+        grid_size = tuple(max(size, pattern_size) for size, pattern_size in zip(config.GRID_SIZE, grid_pattern.shape))
+        grid = np.zeros(grid_size, dtype=np.uint8)
+        v_margin = (grid_size[0] - grid_pattern.shape[0]) // 2
+        h_margin = (grid_size[1] - grid_pattern.shape[1]) // 2
+        grid[v_margin:v_margin + grid_pattern.shape[0], h_margin:h_margin + grid_pattern.shape[1]] = grid_pattern
+        grids[pattern_name] = grid
+    return grids
+
+
+def _inputs(sizes: list, densities: list, seed: int, with_patterns: bool = True):
+    """
+    Generate the input grids of the cases: random soups of each size and density and the bundled patterns
+
+    :return: Tuples (label, params, grid), the grid being created lazily (a function)
+    """
+    for grid_size in sizes:
+        for density in densities:
+            yield (f"{format_size(grid_size)}/d{density:.2f}", {"grid_size": format_size(grid_size), "density": density},
+                   lambda grid_size=grid_size, density=density: random_grid(grid_size, density, seed))
+    if with_patterns:
+        for pattern_name, grid in bundled_patterns().items():
+            yield (f"pattern/{pattern_name}", {"grid_size": format_size(grid.shape), "pattern": pattern_name},
+                   lambda grid=grid: grid)
+
+
+def engine_suite(sizes: list, densities: list, engine_names: list, min_time: float, seed: int,
+                 explicit_engines: bool = False):
+    """
+    Time the evolution of the grid as done by the GUI at each frame: a step of one generation and the export of the
+    cells age
+    """
+    for label, params, make_grid in _inputs(sizes, densities, seed):
+        grid = None
+        for engine_name in engine_names:
+            result = Result("engine", f"engine/{engine_name}/{label}", dict(params, engine=engine_name))
+            engine_class = engines.get_engine_class(engine_name)
+            cells = np.prod([int(size) for size in params["grid_size"].split("x")])
+            if engine_class.unbounded and "density" in params and cells > _UNBOUNDED_MAX_CELLS and \
+                    not explicit_engines:
+                result.skipped = "soup too large for an unbounded engine (select it explicitly to run it)"
+                yield result
+                continue
+
+            grid = make_grid() if grid is None else grid
+            gol_engine = engines.create_engine(engine_name)
+            try:
+                gol_engine.load(grid)
+
+                def frame():
+                    gol_engine.step()
+                    gol_engine.to_numpy()
+
+                # Warm up (e.g. JIT compilation, caches)
+                frame()
+                reset_peak_rss()
+                calls, elapsed = time_calls(frame, min_time)
+                result.metrics["peak_rss_bytes"] = get_peak_rss()
+                result.metrics.update(measure_allocations(frame, repeat=2))
+            except MemoryError:
+                result.skipped = "out of memory"
+                yield result
+                continue
+            finally:
+                gol_engine.close()
+
+            result.throughput = calls / elapsed
+            result.unit = "gens/s"
+            result.metrics["generations"] = calls
+            result.metrics["cell_updates_per_s"] = calls * int(cells) / elapsed
+            yield result
+
+
+def render_suite(sizes: list, densities: list, min_time: float, seed: int):
+    """
+    Time the rendering of the grid as done by the GUI: the rendering of the visible cells at the widget resolution
+    (with the whole grid in view and zoomed in), then the upload of the image into a QPixmap. The cases of the
+    conversion are skipped when PyQt5 is not installed
+    """
+    try:
+        # Render without a display
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtGui import QPixmap
+        from PyQt5.QtWidgets import QApplication
+        from utils.utils import GridImage
+    except ImportError:
+        GridImage = None
+
+    application = None
+    if GridImage is not None:
+        application = QApplication.instance() or QApplication([])
+
+    for label, params, make_grid in _inputs(sizes, densities, seed, with_patterns=False):
+        grid = make_grid()
+        for view in ("fit", "zoom"):
+            grid_viewport = viewport.Viewport()
+            grid_viewport.set_sizes(grid.shape, _RENDER_SIZE)
+            if view == "zoom":
+                grid_viewport.zoom_at(8 / grid_viewport.get_zoom(), _RENDER_SIZE[0] / 2, _RENDER_SIZE[1] / 2)
+
+            for mode in ("viewport", "binary", "age"):
+                result = Result("render", f"render/{mode}/{view}/{label}", dict(params, mode=mode, view=view))
+                if mode != "viewport" and application is None:
+                    result.skipped = "PyQt5 not installed"
+                    yield result
+                    continue
+
+                if mode == "viewport":
+                    def frame():
+                        grid_viewport.render(grid)
+                else:
+                    # Render into a persistent image and upload it into a persistent pixmap
+                    x, y, width, height = grid_viewport.get_grid_rect()
+                    grid_image = GridImage()
+                    pixmap = QPixmap(width, height)
+
+                    def frame(show_age=mode == "age"):
+                        grid_viewport.render(grid, viewport.ANY if show_age else None,
+                                             out=grid_image.get_buffer(width, height))
+                        grid_image.set_mode(show_age)
+                        pixmap.convertFromImage(grid_image.get_image())
+
+                frame()
+                reset_peak_rss()
+                calls, elapsed = time_calls(frame, min_time)
+                result.throughput = calls / elapsed
+                result.unit = "frames/s"
+                result.metrics["peak_rss_bytes"] = get_peak_rss()
+                result.metrics["cells_per_s"] = calls * grid.size / elapsed
+                result.metrics.update(measure_allocations(frame, repeat=2))
+                yield result
+
+
+def io_suite(sizes: list, densities: list, min_time: float, seed: int, max_cells: int):
+    """
+    Time the reading and the writing of the grid in each supported file format
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        for label, params, make_grid in _inputs(sizes, densities, seed):
+            cells = np.prod([int(size) for size in params["grid_size"].split("x")])
+            grid = None
+            for extension in _IO_FORMATS:
+                file_format = extension[1:]
+                file_path = os.path.join(folder, "pattern" + extension)
+                write_result = Result("io", f"io/write/{file_format}/{label}", dict(params, format=file_format))
+                read_result = Result("io", f"io/read/{file_format}/{label}", dict(params, format=file_format))
+                if cells > max_cells:
+                    write_result.skipped = read_result.skipped = "grid larger than the I/O limit"
+                    yield write_result
+                    yield read_result
+                    continue
+
+                grid = make_grid() if grid is None else grid
+                if extension == snapshot.SNAPSHOT_EXTENSION:
+                    def write():
+                        snapshot.save_snapshot(file_path, grid)
+
+                    def read():
+                        snapshot.load_snapshot(file_path).to_numpy()
+                else:
+                    def write():
+                        patterns.save_pattern(file_path, grid)
+
+                    def read():
+                        patterns.read_pattern(file_path)
+
+                for result, function in ((write_result, write), (read_result, read)):
+                    function()
+                    reset_peak_rss()
+                    calls, elapsed = time_calls(function, min_time)
+                    result.throughput = calls * int(cells) / elapsed
+                    result.unit = "cells/s"
+                    result.metrics["seconds"] = elapsed / calls
+                    result.metrics["file_bytes"] = os.path.getsize(file_path)
+                    result.metrics["peak_rss_bytes"] = get_peak_rss()
+                    result.metrics.update(measure_allocations(function))
+                    yield result
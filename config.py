@@ -4,10 +4,56 @@ import os
 class Config:
 
     def __init__(self):
+        # Longest period detected by the batch simulation (see engine.batch), which keeps the hashes of that many
+        # generations of each grid. Grids oscillating with a longer period are never reported as stable (their period
+        # stays 0) and are evolved up to the last generation
+        self.BATCH_MAX_PERIOD = 64
+        # Boundary condition of the grid: dead, torus, reflect or klein (see engine.boundary). Unbounded engines only
+        # support dead
+        self.BOUNDARY = "dead"
+        # Folder of the periodic checkpoints of the simulation (relative to ROOT_PATH)
+        self.CHECKPOINT_FOLDER = "checkpoints"
+        # Seconds between two checkpoints of a running simulation (0: checkpoints disabled)
+        self.CHECKPOINT_INTERVAL = 300
+        # Number of checkpoints kept
+        self.CHECKPOINT_KEEP = 3
+        # Detect when the grid of a bounded engine stabilizes, to pause the simulation (see engine.cycles). Each
+        # generation is then compared with the previous one, unless the engine knows that nothing changed: disable it to
+        # save that work on the largest grids
+        self.CYCLE_DETECTION = True
+        # Number of generations kept to detect cycles, i.e. the longest detectable period
+        self.CYCLE_HISTORY = 1024
+        # Refresh rate of the grid while the simulation runs, independent from the simulation speed
+        self.DISPLAY_FPS = 60
+        # Engine evolving the grid: convolution, bitpacked, hashlife, jit, parallel, sparse or tiled (see
+        # engine.engines)
+        self.ENGINE = "convolution"
         self.FOLDER_PATTERNS = os.path.join("resources", "patterns")
         self.FPS = 30
         self.GRID_SIZE = (150, 250)
+        # Number of nodes of the hashlife engine beyond which its caches are cleared, keeping only the current universe
+        # (bounds its memory)
+        self.HASHLIFE_MAX_NODES = 1000000
+        # Number of threads of the parallel engine (None: one for each CPU)
+        self.PARALLEL_WORKERS = None
+        # Collect the timings of the step loop at startup (see utils.profiling). The stats panel of the GUI also enables
+        # the profiler while it is shown
+        self.PROFILING = False
+        # Maximum number of cells read to render a frame of the zoomed out grid: larger views sample the cells of each
+        # pixel (see utils.viewport)
+        self.RENDER_MAX_CELLS = 4 * 1024 * 1024
+        # Reduction of the cells shown by a single pixel when zoomed out: "any" alive or "density" of the alive cells
+        self.RENDER_REDUCTION = "any"
         self.ROOT_PATH = os.path.dirname(os.path.abspath(__file__))
+        # Rule of the simulation in B/S notation, e.g. B3/S23 (Conway) or B36/S23 (HighLife), see engine.rules
+        self.RULE = "B3/S23"
+        # How the simulation recovers the generations it could not compute on time: "skip" them or "catch_up" with them
+        # (see utils.worker)
+        self.SCHEDULER_POLICY = "skip"
+        # Number of generations whose statistics are kept for the plot of the GUI (see engine.statistics)
+        self.STATISTICS_HISTORY = 1000
+        # Side in cells of the square tiles of the tiled engine, which only recomputes the tiles that can change
+        self.TILE_SIZE = 32
 
 
 config = Config()
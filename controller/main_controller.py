@@ -1,15 +1,32 @@
 import os
+import threading
+import time
 
 import numpy as np
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import QFileDialog, QApplication
-from scipy import ndimage
 
-from utils import patterns
+from utils import checkpoint, patterns, profiling, snapshot, telemetry
 from config import config
+from engine import engines
+from engine.cycles import CycleDetector
+from engine.rules import Rule
 from gui.main_window import MainWindow
+from model import damage
 from model.gol_model import GOLModel
+from utils.profiling import profiler
 from utils.worker import Worker
 
+# File filters of the dialogs to load and save the patterns
+_PATTERN_FILES_FILTER = "Pattern File ({})".format(" ".join("*" + extension for extension in
+                                                              (*patterns.PATTERN_EXTENSIONS, snapshot.SNAPSHOT_EXTENSION)))
+_SAVE_FILTERS = {"Plain text (*.cells)": ".cells", "Run Length Encoded (*.rle)": ".rle", "Life 1.06 (*.lif)": ".lif",
+                 "Snapshot (*.snap)": snapshot.SNAPSHOT_EXTENSION}
+# File filters of the dialog to record the statistics (only the available formats)
+_STATISTICS_FILTERS = {name: extension for name, extension in {"CSV (*.csv)": telemetry.CSV,
+                                                               "Parquet (*.parquet)": telemetry.PARQUET}.items()
+                       if extension in telemetry.get_available_formats()}
+
 
 class MainController:
     """
@@ -25,19 +42,52 @@ class MainController:
         main_window.connect_to_button_clear(self.clear_grid)
         main_window.connect_to_button_load(self.load_custom_pattern)
         main_window.connect_to_button_play(self.start_stop)
+        main_window.connect_to_button_record(self.record_statistics)
         main_window.connect_to_button_save(self.save_pattern)
         main_window.connect_to_button_step(self.single_step)
+        main_window.connect_to_check_max_speed(self.toggle_max_speed)
+        main_window.connect_to_combo_boundary(self.select_boundary)
+        main_window.connect_to_combo_engine(self.select_engine)
         main_window.connect_to_combo_patterns(self.select_example_pattern)
+        main_window.connect_to_combo_rule(self.select_rule)
+        main_window.connect_to_dock_statistics(self.toggle_statistics)
         main_window.connect_to_radio_age(self.toggle_show_cell_age)
         main_window.connect_to_slider_speed(self.set_speed)
-        main_window.grid_widget.connect_to_cell_clicked(self.toggle_cell)
+        main_window.grid_widget.connect_to_stroke_drawn(self.draw_stroke)
+        main_window.grid_widget.connect_to_stroke_started(self.start_stroke)
 
         self._gol_model = gol_model
+
+        # Thread stepping the engine while the simulation runs, which then owns the engine. The generations are handed
+        # to the GUI thread through _frame, when the previous one has been displayed, and shown by the display timer at
+        # the display rate: the engine is not slowed down by the rendering
         self._worker = None
+        self._frame = None
+        self._frame_lock = threading.Lock()
+        # Grid of the last frame handed by the worker thread, to find the cells changed by the next one
+        self._frame_grid = None
+        self._display_timer = QTimer()
+        self._display_timer.setTimerType(Qt.PreciseTimer)
+        self._display_timer.setInterval(round(1000 / config.DISPLAY_FPS))
+        self._display_timer.timeout.connect(self._show_frame)
+
+        # Engine that evolves the grid. It keeps its own copy of the grid state, so every change made to the grid from
+        # the controller must also be loaded into the engine (see _set_grid)
+        self._engine = engines.create_engine(gol_model.get_engine(), gol_model.get_rule(), gol_model.get_boundary())
+        self._engine.load(gol_model.get_grid_as_numpy())
+        # Detector of the grid stabilization, which pauses the simulation. It must be reset whenever the grid is
+        # changed other than by the engine (see _reset_cycle_detection)
+        self._cycle_detector = CycleDetector()
+        self._reset_cycle_detection()
+
+        # State given to the cells by the current stroke of the mouse (see start_stroke)
+        self._stroke_value = 1
+        # Flag that indicates whether the statistics of the generations are displayed
+        self._statistics_shown = False
 
-        # Variables for the grid update
-        self._conv_filter = np.ones((3, 3))
-        self._conv_filter[1, 1] = 0
+        # Background writer of the periodic checkpoints (started with the first checkpoint)
+        self._checkpoint_writer = None
+        self._last_checkpoint_time = time.monotonic()
 
     def clear_grid(self):
         """
@@ -52,7 +102,7 @@ class MainController:
         Load a pattern from a chosen file into the current GOL state
         :return:
         """
-        file_path = QFileDialog.getOpenFileName(self._main_window, "Load pattern file", filter="Pattern File (*.cells)")[0]
+        file_path = QFileDialog.getOpenFileName(self._main_window, "Load pattern file", filter=_PATTERN_FILES_FILTER)[0]
         if file_path:
             self._main_window.reset_combo_patterns()
             if self._load_file(file_path):
@@ -60,44 +110,169 @@ class MainController:
 
     def _load_file(self, file_path: str):
         """
-        Helper method to load a pattern from a .cells file (plain text format).
+        Helper method to load a pattern from a file of any supported format (see utils.patterns) or from a snapshot
+        (see utils.snapshot).
 
         :param file_path: Path of the pattern file
-        :return: False if the file is invalid or the pattern do not fit the current grid, otherwise True
+        :return: False if the file is invalid or the pattern do not fit the current grid (only for bounded engines),
+        otherwise True
         """
-        grid_pattern = patterns.read_pattern_file(file_path)
+        if snapshot.is_snapshot_file(file_path):
+            return self._load_snapshot(file_path)
 
-        if grid_pattern is None:
+        try:
+            pattern = patterns.read_pattern(file_path)
+        except ValueError:
+            pattern = None
+
+        if pattern is None:
             self._main_window.show_error_message("Invalid pattern file")
             return False
-        else:
-            grid_height, grid_width = self._gol_model.get_grid_size()
-            pattern_height, pattern_width = grid_pattern.shape
+        return self._place_pattern(*pattern)
 
+    def _load_snapshot(self, file_path: str):
+        """
+        Helper method to restore the grid state saved into a snapshot: cells age, rule, boundary and generation
+
+        :param file_path: Path of the snapshot file
+        :return: False if the file is invalid or the grid do not fit the current one (only for bounded engines),
+        otherwise True
+        """
+        try:
+            grid_snapshot = snapshot.load_snapshot(file_path)
+        except ValueError as e:
+            self._main_window.show_error_message(str(e))
+            return False
+
+        self.select_boundary(grid_snapshot.get_boundary())
+        self._main_window.set_combo_boundary(self._gol_model.get_boundary())
+        return self._place_pattern(grid_snapshot.to_numpy(), grid_snapshot.get_rule(), grid_snapshot.get_generation())
+
+    def _place_pattern(self, grid_pattern: np.ndarray, rule: str, generation: int = 0):
+        """
+        Helper method to load a pattern at the center of the grid
+
+        :param grid_pattern: Numpy array (uint8) with the age of each cell of the pattern
+        :param rule: The rule of the pattern, or None
+        :param generation: The generation of the pattern (0 for a new simulation)
+        :return: False if the pattern do not fit the current grid (only for bounded engines), otherwise True
+        """
+        grid_height, grid_width = self._gol_model.get_grid_size()
+        pattern_height, pattern_width = grid_pattern.shape
+
+        v_margin = (grid_height - pattern_height) // 2
+        h_margin = (grid_width - pattern_width) // 2
+
+        if pattern_height <= grid_height and pattern_width <= grid_width:
+            # Copy the pattern at the center of a blank grid
+            new_grid = np.zeros(self._gol_model.get_grid_size(), np.uint8)
+            new_grid[v_margin:v_margin + pattern_height, h_margin:h_margin + pattern_width] = grid_pattern
+
+            self._set_grid(new_grid, generation)
+            self._load_pattern_rule(rule)
+            return True
+        elif self._engine.unbounded:
+            # The pattern exceeds the grid, which is only a window on the unbounded universe: center the pattern
+            # on the window and let its border lie outside of it
+            self._engine.set_generation(generation)
+            self._engine.load(np.zeros(self._gol_model.get_grid_size(), np.uint8))
+            rows, cols = np.nonzero(grid_pattern)
+            self._engine.set_cells(rows + v_margin, cols + h_margin, grid_pattern[rows, cols])
+            self._gol_model.set_grid_as_numpy(self._engine.to_numpy())
+            self._gol_model.get_statistics().reset()
+            self._reset_cycle_detection()
+            self._load_pattern_rule(rule)
+            return True
+        else:
             # If the pattern is bigger than the grid show an error
-            if pattern_height > grid_height or pattern_width > grid_width:
-                self._main_window.show_error_message("The loaded pattern is bigger than the available grid")
-                return False
-            else:
-                # Copy the pattern at the center of a blank grid
-                new_grid = np.zeros(self._gol_model.get_grid_size(), np.uint8)
-                v_margin = (grid_height - pattern_height) // 2
-                h_margin = (grid_width - pattern_width) // 2
-                new_grid[v_margin:v_margin + pattern_height, h_margin:h_margin + pattern_width] = grid_pattern
+            self._main_window.show_error_message("The loaded pattern is bigger than the available grid. "
+                                                 "Select an unbounded engine (hashlife, sparse) to load it")
+            return False
 
-                self._gol_model.set_grid_as_numpy(new_grid)
-                return True
+    def _load_pattern_rule(self, rule: str):
+        """
+        Helper method to apply the rule specified by a pattern file, if any
+        :param rule: The rule read from the pattern file, or None
+        """
+        if rule is not None:
+            self.select_rule(rule)
 
     def save_pattern(self):
         """
-        Save the current grid state in a .cells file as a reloadable state
+        Save the current grid state in a pattern file as a reloadable state. The format is chosen through the file
+        extension or the selected file filter
         :return:
         """
-        file_path = QFileDialog.getSaveFileName(self._main_window, "Save pattern file", filter="Pattern File (*.cells)")[0]
+        file_path, file_filter = QFileDialog.getSaveFileName(self._main_window, "Save pattern file",
+                                                             filter=";;".join(_SAVE_FILTERS))
         if file_path:
-            patterns.save_pattern_file(file_path, self._gol_model.get_grid_as_numpy())
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension not in _SAVE_FILTERS.values():
+                extension = _SAVE_FILTERS.get(file_filter, ".cells")
+                file_path += extension
+
+            if extension == snapshot.SNAPSHOT_EXTENSION:
+                # Snapshots keep the cells age and the whole simulation state
+                snapshot.save_snapshot(file_path, self._gol_model.get_grid_as_numpy(), self._gol_model.get_rule(),
+                                       self._engine.get_generation(), self._gol_model.get_boundary(),
+                                       self._gol_model.get_engine())
+            else:
+                patterns.save_pattern(file_path, self._gol_model.get_grid_as_numpy(), self._gol_model.get_rule())
             self._main_window.show_message_on_status_bar("Pattern saved")
 
+    def select_boundary(self, boundary: str):
+        """
+        Change the boundary condition of the grid
+        :param boundary: The name of the boundary condition (see engine.boundary)
+        """
+        try:
+            self._engine.set_boundary(boundary)
+        except ValueError as e:
+            self._main_window.show_error_message(str(e))
+            self._main_window.set_combo_boundary(self._gol_model.get_boundary())
+            return
+
+        self._gol_model.set_boundary(boundary)
+        self._reset_cycle_detection()
+
+    def select_engine(self, engine_name: str):
+        """
+        Change the engine used to evolve the grid. The new engine starts from the current grid state
+        :param engine_name: The name of the engine (see engine.engines)
+        """
+        try:
+            engine = engines.create_engine(engine_name, self._gol_model.get_rule(), self._gol_model.get_boundary())
+        except ValueError as e:
+            # The engine does not support the current rule or boundary: keep the previous one
+            self._main_window.show_error_message(str(e))
+            self._main_window.set_combo_engine(self._gol_model.get_engine())
+            return
+
+        self._engine.close()
+        self._engine = engine
+        self._engine.load(self._gol_model.get_grid_as_numpy())
+        self._gol_model.set_engine(engine_name)
+        self._reset_cycle_detection()
+
+    def select_rule(self, rulestring: str) -> bool:
+        """
+        Change the rule of the simulation
+        :param rulestring: The rule in B/S notation (e.g. B3/S23 for the Game of Life, B36/S23 for HighLife)
+        :return: True if the rule has been applied, False if it is invalid or not supported by the current engine
+        """
+        try:
+            rule = Rule(rulestring)
+            self._engine.set_rule(rule)
+        except ValueError as e:
+            self._main_window.show_error_message(str(e))
+            self._main_window.set_combo_rule(self._gol_model.get_rule())
+            return False
+
+        self._gol_model.set_rule(str(rule))
+        self._main_window.set_combo_rule(str(rule))
+        self._reset_cycle_detection()
+        return True
+
     def select_example_pattern(self, pattern_name):
         """
         Load a predefined pattern chosen from the provided list
@@ -108,13 +283,40 @@ class MainController:
         # The selected pattern is the custom one: restart from a blank grid
         if pattern_name == "Custom":
             new_grid = np.zeros(self._gol_model.get_grid_size(), np.uint8)
-            self._gol_model.set_grid_as_numpy(new_grid)
+            self._set_grid(new_grid)
         else:
-            file_path = os.path.join(config.ROOT_PATH, config.FOLDER_PATTERNS, pattern_name + ".cells")
-            if not self._load_file(file_path):
+            file_path = patterns.get_pattern_file(pattern_name)
+            if file_path is None or not self._load_file(file_path):
                 # Something went wrong during the pattern loading: select the Custom pattern
                 self._main_window.reset_combo_patterns()
 
+    def _set_grid(self, grid: np.ndarray, generation: int = 0):
+        """
+        Helper method to replace the grid state both in the engine and in the model
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param generation: The generation of the grid (0 for a new simulation)
+        """
+        self._engine.set_generation(generation)
+        self._engine.load(grid)
+        self._gol_model.set_grid_as_numpy(grid)
+        self._gol_model.get_statistics().reset()
+        self._reset_cycle_detection()
+
+    def _reset_cycle_detection(self):
+        """
+        Helper method to restart the cycle detection (and the statistics) after the grid, the rule or the boundary has
+        been changed
+        """
+        self._cycle_detector.reset()
+        if config.CYCLE_DETECTION and not self._engine.unbounded:
+            # The current generation is the first one of the history
+            self._cycle_detector.update_from_engine(self._engine)
+        statistics = self._gol_model.get_statistics()
+        statistics.reset(clear=False)
+        statistics.update(self._engine)
+        if self._gol_model.get_cycle() is not None:
+            self._gol_model.set_cycle(None)
+
     def set_speed(self, speed):
         """
         Change the simulation speed
@@ -123,37 +325,98 @@ class MainController:
         """
         self._gol_model.set_fps(speed)
         if self._gol_model.get_running():
-            self._worker.set_wait_time(1 / self._gol_model.get_fps())
+            self._worker.set_wait_time(self._get_step_time())
+
+    def toggle_max_speed(self, max_speed: bool):
+        """
+        Run the simulation as fast as possible or at the speed of the slider
+        :param max_speed: Whether to ignore the speed of the slider
+        """
+        self._gol_model.set_max_speed(max_speed)
+        if self._gol_model.get_running():
+            self._worker.set_wait_time(self._get_step_time())
+
+    def _get_step_time(self) -> float:
+        """
+        :return: Seconds between two generations of the running simulation (0: as fast as possible)
+        """
+        return 0 if self._gol_model.get_max_speed() else 1 / self._gol_model.get_fps()
 
     def single_step(self):
         """
-        Performs an update step of the grid applying the Game of Life rules.
-        Besides calculating dead and living cells at the next time step, it also calculates the age of each cell
-        (how many time steps they are alive). The age ranges from 0 (dead) to 255 (ancient)
+        Performs an update step of the grid applying the Game of Life rules through the selected engine
         """
-        grid_curr_age = self._gol_model.get_grid_as_numpy()
-        grid_curr_alive = grid_curr_age.astype(np.bool).astype(np.uint8)
+        cycle = self._advance()
+        with profiler.section(profiling.EXPORT):
+            grid = self._engine.to_numpy()
+        self._show_grid(grid, cycle, damage.diff_grids(self._gol_model.get_grid_as_numpy(), grid))
 
-        # Use convolution to calculate the number of neighbors for each cell
-        grid_neighbors = ndimage.convolve(grid_curr_alive, self._conv_filter, mode="constant", cval=0)
+    def _advance(self):
+        """
+        Helper method to evolve the grid by one generation and check whether it became periodic
+        :return: The cycle reached by the grid (see engine.cycles), or None
+        """
+        with profiler.section(profiling.STEP):
+            self._engine.step()
+        self._gol_model.get_statistics().update(self._engine)
 
-        # Calculate which cells to give birth: a dead cell is born when it has exactly three neighbors
-        grid_newborns = grid_neighbors == 3
-        grid_newborns = np.logical_and(grid_newborns, np.logical_not(grid_curr_alive))
+        # The window of an unbounded universe can become empty or still while the patterns move away from it, so
+        # cycles are only detected on bounded grids
+        if config.CYCLE_DETECTION and not self._engine.unbounded:
+            return self._cycle_detector.update_from_engine(self._engine)
+        return None
 
-        # Calculate which cells survive: a living cell survive when it has two or three neighbors
-        grid_survived = np.logical_and(grid_neighbors >= 2, grid_neighbors <= 3)
-        grid_survived = np.logical_and(grid_survived, grid_curr_alive)
+    def _step_worker(self):
+        """
+        Task of the worker thread: evolve the grid and hand a new frame to the GUI thread once the previous one has been
+        displayed
+        """
+        cycle = self._advance()
+        if cycle is not None:
+            # Stop stepping a grid that will not change anymore (the simulation can be resumed manually)
+            self._worker.stop()
+
+        if self._frame is None or cycle is not None:
+            # The engine keeps evolving its grid, so the frame is a copy
+            with profiler.section(profiling.EXPORT):
+                grid = self._engine.to_numpy().copy()
+            damage_region = damage.diff_grids(self._frame_grid, grid)
+            self._frame_grid = grid
+            with self._frame_lock:
+                if self._frame is not None and damage_region is not None:
+                    # The frame replaces one not displayed yet: the cells changed by both must be repainted
+                    damage_region = None if self._frame[3] is None else damage.merge(self._frame[3] + damage_region)
+                self._frame = (grid, self._engine.get_generation(), cycle, damage_region)
+            profiler.mark(profiling.QUEUE)
 
-        # Calculate the living cells at the next step merging survived and newborn cells
-        grid_next = np.logical_or(grid_newborns, grid_survived).astype(np.uint8)
+    def _show_frame(self):
+        """
+        Slot of the display timer: show the last generation computed by the worker thread, if not already shown
+        """
+        with self._frame_lock:
+            frame, self._frame = self._frame, None
+        if frame is None:
+            return
+        profiler.add_since_mark(profiling.QUEUE)
 
-        # Calculate the age of the cells in the new grid
-        grid_next = grid_curr_age * grid_next + grid_next
-        np.putmask(grid_next, grid_curr_age == 255,
-                   255)  # This is necessary to avoid the overflow handling by numpy and cap the array values to 255
+        grid, generation, cycle, damage_region = frame
+        self._show_grid(grid, cycle, damage_region)
+        if cycle is not None:
+            self._stop_simulation()
+        elif config.CHECKPOINT_INTERVAL and time.monotonic() - self._last_checkpoint_time >= config.CHECKPOINT_INTERVAL:
+            self._write_checkpoint(grid, generation)
 
-        self._gol_model.set_grid_as_numpy(grid_next)
+    def _show_grid(self, grid: np.ndarray, cycle, damage_region: list):
+        """
+        Helper method to update the model with a new generation of the grid
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param cycle: The cycle reached by the grid, or None
+        :param damage_region: The cells changed since the displayed generation (see model.damage)
+        """
+        with profiler.section(profiling.NOTIFY):
+            self._gol_model.set_grid_as_numpy(grid, damage_region)
+        if cycle is not None:
+            self._gol_model.set_cycle(cycle)
 
     def start_stop(self):
         """
@@ -161,26 +424,179 @@ class MainController:
         """
         if not self._gol_model.get_running():
             self._gol_model.set_running(True)
-            self._worker = Worker(self.single_step, 1 / self._gol_model.get_fps())
+            self._frame = None
+            self._frame_grid = self._gol_model.get_grid_as_numpy().copy()
+            self._worker = Worker(self._step_worker, self._get_step_time(), config.SCHEDULER_POLICY)
             self._worker.start()
+            self._display_timer.start()
         else:
-            self._worker.stop()
-            self._gol_model.set_running(False)
+            self._stop_simulation()
+
+    def _stop_simulation(self):
+        """
+        Helper method to stop the worker thread, giving the engine back to the GUI thread, and show the last generation
+        """
+        self._worker.stop()
+        self._worker.join()
+        self._display_timer.stop()
+        self._frame = None
+        self._frame_grid = None
+        # The display may have skipped the last generations
+        grid = self._engine.to_numpy()
+        self._gol_model.set_grid_as_numpy(grid, damage.diff_grids(self._gol_model.get_grid_as_numpy(), grid))
+        self._gol_model.set_running(False)
 
     def _stop_worker_on_app_closing(self):
         if self._worker is not None:
             self._worker.stop()
+            self._worker.join()
+        self._display_timer.stop()
+
+        # Save the progress of the simulation, waiting for the checkpoint to be written
+        if config.CHECKPOINT_INTERVAL and self._engine.get_generation() > 0:
+            self._write_checkpoint(self._engine.to_numpy(), self._engine.get_generation())
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.stop()
+        if self._gol_model.get_recording():
+            self._stop_recording()
+        self._engine.close()
+
+    def _write_checkpoint(self, grid: np.ndarray, generation: int):
+        """
+        Helper method to save a checkpoint of the simulation in the background (see utils.checkpoint)
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param generation: The generation of the grid
+        """
+        if self._checkpoint_writer is None:
+            self._checkpoint_writer = checkpoint.CheckpointWriter(
+                os.path.join(config.ROOT_PATH, config.CHECKPOINT_FOLDER), config.CHECKPOINT_KEEP)
+            self._checkpoint_writer.start()
+
+        settings = {"base_pattern": self._gol_model.get_base_pattern(), "fps": self._gol_model.get_fps(),
+                    "max_speed": self._gol_model.get_max_speed(), "show_cell_age": self._gol_model.get_show_cell_age()}
+        self._checkpoint_writer.submit(grid, self._gol_model.get_rule(), generation, self._gol_model.get_boundary(),
+                                       self._gol_model.get_engine(), settings)
+        self._last_checkpoint_time = time.monotonic()
+
+    def resume(self, file_path: str = None) -> bool:
+        """
+        Resume a simulation from a checkpoint, restoring the grid, the cells age, the generation and the settings
+        :param file_path: The snapshot file of the checkpoint (default: the most recent checkpoint)
+        :return: True if the simulation has been restored, otherwise False
+        """
+        file_path = file_path or checkpoint.find_latest_checkpoint(os.path.join(config.ROOT_PATH,
+                                                                                config.CHECKPOINT_FOLDER))
+        if file_path is None:
+            self._main_window.show_error_message("No checkpoint to resume from")
+            return False
+
+        try:
+            engine_name = snapshot.load_snapshot(file_path).get_engine()
+        except (OSError, ValueError):
+            self._main_window.show_error_message("Invalid checkpoint file")
+            return False
+        if engine_name in engines.get_available_engines() and engine_name != self._gol_model.get_engine():
+            self.select_engine(engine_name)
+            self._main_window.set_combo_engine(self._gol_model.get_engine())
+
+        if not self._load_snapshot(file_path):
+            return False
+
+        settings = checkpoint.read_checkpoint_settings(file_path)
+        if "fps" in settings:
+            self._main_window.set_slider_speed(settings["fps"])
+        if "max_speed" in settings:
+            self._main_window.set_check_max_speed(settings["max_speed"])
+        if "show_cell_age" in settings:
+            self._main_window.set_radio_age(settings["show_cell_age"])
+        if "base_pattern" in settings:
+            self._gol_model.set_base_pattern(settings["base_pattern"])
+        self._main_window.show_message_on_status_bar(f"Resumed from generation {self._engine.get_generation()}")
+        return True
+
+    def toggle_statistics(self, visible: bool):
+        """
+        Collect the statistics of the generations while they are displayed (or recorded)
+        :param visible: Whether the statistics are displayed
+        """
+        self._statistics_shown = visible
+        statistics = self._gol_model.get_statistics()
+        statistics.set_enabled(visible or self._gol_model.get_recording())
+        if not self._gol_model.get_running():
+            # Start from the current generation (while running, the engine is owned by the worker thread)
+            statistics.update(self._engine)
+
+    def record_statistics(self):
+        """
+        Start recording the statistics of every generation to a CSV or Parquet file chosen by the user, or stop the
+        recording if it was already started
+        """
+        if self._gol_model.get_recording():
+            self._stop_recording()
+            return
+
+        file_path, file_filter = QFileDialog.getSaveFileName(self._main_window, "Record statistics",
+                                                             filter=";;".join(_STATISTICS_FILTERS))
+        if not file_path:
+            return
+        if os.path.splitext(file_path)[1].lower() not in _STATISTICS_FILTERS.values():
+            file_path += _STATISTICS_FILTERS.get(file_filter, telemetry.CSV)
+        try:
+            writer = telemetry.TelemetryWriter(file_path)
+        except ValueError as e:
+            self._main_window.show_error_message(str(e))
+            return
+
+        writer.start()
+        statistics = self._gol_model.get_statistics()
+        statistics.set_writer(writer)
+        statistics.set_enabled(True)
+        if not self._gol_model.get_running():
+            statistics.update(self._engine)
+        self._gol_model.set_recording(True)
+
+    def _stop_recording(self):
+        """
+        Helper method to stop recording the statistics, waiting for the pending rows to be written
+        """
+        statistics = self._gol_model.get_statistics()
+        writer = statistics.get_writer()
+        statistics.set_writer(None)
+        statistics.set_enabled(self._statistics_shown)
+        writer.stop()
+        self._gol_model.set_recording(False)
+        if writer.get_error() is not None:
+            self._main_window.show_error_message(f"Error recording the statistics: {writer.get_error()}")
+        else:
+            self._main_window.show_message_on_status_bar(f"{writer.get_rows()} generations recorded to "
+                                                         f"{writer.get_file_path()}")
 
     def toggle_show_cell_age(self, show_cell_age: bool):
         self._gol_model.set_show_cell_age(show_cell_age)
 
-    def toggle_cell(self, cell_coord: tuple):
+    def start_stroke(self, cell_coord: tuple):
         """
-        Toggle the state of the specified cell
-        :param cell_coord: A tuple containing the cell coordinates as (row, column)
+        Start editing the grid with a stroke of the mouse: the stroke toggles the state of its first cell, and gives the
+        same state to all the cells it crosses (see draw_stroke)
+        :param cell_coord: A tuple containing the coordinates of the first cell as (row, column)
         """
-
-        grid = self._gol_model.get_grid_as_numpy()
         row, col = cell_coord
-        grid[row, col] = 0 if grid[row, col] else 1
-        self._gol_model.set_grid_as_numpy(grid)
+        self._stroke_value = 0 if self._gol_model.get_grid_as_numpy()[row, col] else 1
+        self.draw_stroke((np.array([row]), np.array([col])))
+
+    def draw_stroke(self, cells: tuple):
+        """
+        Give the state chosen at the start of the stroke to a batch of cells crossed by it, with a single edit of the
+        engine and of the model
+        :param cells: A tuple containing the rows and the columns of the cells as numpy arrays
+        """
+        rows, cols = cells
+        # Only edit the cells that do not have the state yet: the age of the alive cells is kept
+        changed = (self._gol_model.get_grid_as_numpy()[rows, cols] != 0) != bool(self._stroke_value)
+        if not np.any(changed):
+            return
+        rows, cols = rows[changed], cols[changed]
+        values = np.full(len(rows), self._stroke_value, np.uint8)
+        self._engine.set_cells(rows, cols, values)
+        self._gol_model.set_cells(rows, cols, values)
+        self._reset_cycle_detection()
@@ -0,0 +1,159 @@
+import numpy as np
+
+from engine.boundary import DEAD, check_boundary
+from engine.rules import Rule, get_rule
+
+
+class Engine:
+    """
+    Base class of the engines that evolve the GOL universe.
+    An engine owns its own representation of the universe: it is loaded from a numpy array of cells age and exported
+    back to the same kind of array when the view needs it.
+    """
+
+    # Human readable name of the engine, used to select it from the settings
+    name = ""
+    # Whether the universe extends beyond the loaded grid, which then is only a window on the universe
+    unbounded = False
+
+    def __init__(self, rule=None, boundary: str = None):
+        """
+        Object constructor
+
+        :param rule: The rule to apply, as a Rule or in B/S notation (default: Conway's Game of Life B3/S23)
+        :param boundary: The boundary condition of the grid (see engine.boundary). Unbounded engines only accept the
+        dead one (the default)
+        """
+        self._rule = get_rule(rule)
+        self._boundary = DEAD
+        self.set_boundary(boundary)
+        # Number of generations computed since the engine creation
+        self._generation = 0
+        # Cells age at the last export, for the engines that only store the alive state of the cells
+        self._ages = None
+        self._ages_generation = 0
+
+    def close(self):
+        """
+        Release the resources held by the engine besides its memory (e.g. threads). The engine must not be used
+        afterwards
+        """
+
+    def get_boundary(self) -> str:
+        return self._boundary
+
+    def get_changed_tiles(self):
+        """
+        :return: Boolean numpy array (one element per tile) of the tiles that changed during the last generation, or
+            None if the engine does not track them
+        """
+        return None
+
+    def get_counts(self):
+        """
+        :return: The number of alive cells and the number of cells born and died during the last generation, as a tuple
+            (population, births, deaths), if the engine counts them while stepping (see engine.statistics), otherwise
+            None
+        """
+        return None
+
+    def get_generation(self) -> int:
+        return self._generation
+
+    def get_population(self) -> int:
+        return int(np.count_nonzero(self.to_numpy()))
+
+    def get_rule(self) -> Rule:
+        return self._rule
+
+    def load(self, grid: np.ndarray):
+        """
+        Replace the state of the universe with the given grid
+
+        :param grid: Numpy array (uint8) with the age of each cell (0: dead cell)
+        """
+        raise NotImplementedError
+
+    def set_boundary(self, boundary: str):
+        """
+        Change the boundary condition applied from the next generation on
+
+        :param boundary: The boundary condition (see engine.boundary)
+        """
+        boundary = check_boundary(boundary)
+        if self.unbounded and boundary != DEAD:
+            raise ValueError(f"The {self.name} engine has an unbounded universe: boundary conditions are not supported")
+        self._boundary = boundary
+
+    def set_cells(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        """
+        Change the state of some cells. For unbounded engines the coordinates can lie outside of the loaded grid.
+        The default implementation reloads the whole grid, engines can override it with a cheaper update
+
+        :param rows: Rows of the cells to change
+        :param cols: Columns of the cells to change
+        :param values: New age of each cell (0: dead cell)
+        """
+        grid = self.to_numpy().copy()
+        grid[rows, cols] = values
+        self.load(grid)
+
+    def set_generation(self, generation: int):
+        """
+        Set the generation counter, e.g. to resume a simulation from a snapshot. It must be called before loading the
+        grid of that generation
+
+        :param generation: The generation of the grid that will be loaded
+        """
+        self._generation = generation
+
+    def set_rule(self, rule):
+        """
+        Change the rule applied from the next generation on
+
+        :param rule: The rule, as a Rule or in B/S notation
+        """
+        self._rule = get_rule(rule)
+
+    def step(self, n: int = 1):
+        """
+        Advance the universe by n generations
+
+        :param n: Number of generations to compute
+        """
+        raise NotImplementedError
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Export the current state of the universe.
+        The returned array may be shared with the engine internal state and must not be modified by the caller
+
+        :return: Numpy array (uint8) with the age of each cell (0: dead cell)
+        """
+        raise NotImplementedError
+
+    def _reset_ages(self, grid: np.ndarray):
+        """
+        Store the cells age of a loaded grid as the starting point of the age tracking (see _track_ages)
+
+        :param grid: Numpy array (uint8) with the age of each cell
+        """
+        self._ages = grid.copy()
+        self._ages_generation = self._generation
+
+    def _track_ages(self, grid_alive: np.ndarray) -> np.ndarray:
+        """
+        Helper for the engines that only store the alive state of the cells.
+        The ages are updated lazily, only when the grid is exported. They are exact when the grid is exported after
+        every generation (as the GUI does), otherwise the cells alive after a multi-generation jump get age 1.
+
+        :param grid_alive: Numpy array (uint8 or bool) with the alive state of each cell at the current generation
+        :return: Numpy array (uint8) with the age of each cell
+        """
+        elapsed = self._generation - self._ages_generation
+        if self._ages is None or self._ages.shape != grid_alive.shape or elapsed > 1:
+            self._ages = grid_alive.astype(np.uint8)
+        elif elapsed == 1:
+            self._ages = (self._ages + (self._ages < 255)) * grid_alive.astype(np.uint8)
+        self._ages_generation = self._generation
+        return self._ages
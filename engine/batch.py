@@ -0,0 +1,246 @@
+"""
+Vectorized simulation of a batch of grids of the same size.
+All the grids of the batch are stored in a single 3-D array (batch, rows, cols) and each generation is computed for the
+whole batch with a few numpy operations, so evolving thousands of small grids (e.g. random soups) costs about as much
+as evolving a single grid with the same number of cells. No Qt object is involved.
+"""
+import numpy as np
+
+from config import config
+from engine.boundary import check_boundary, fill_halo
+from engine.rules import get_rule
+
+# Multipliers of the hash of the grids (fixed seed: the hashes are only compared within a simulation)
+_HASH_SEED = 0x5EED
+_HASH_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+
+class BatchResult:
+    """
+    Outcome of the simulation of a batch of grids
+    """
+
+    def __init__(self, grids: np.ndarray, populations: np.ndarray, stabilizations: np.ndarray, periods: np.ndarray):
+        self._grids = grids
+        self._populations = populations
+        self._stabilizations = stabilizations
+        self._periods = periods
+
+    def get_grids(self) -> np.ndarray:
+        """
+        :return: Numpy array (uint8, shape (batch, rows, cols)) with the alive cells of each grid at the last generation
+        """
+        return self._grids
+
+    def get_periods(self) -> np.ndarray:
+        """
+        :return: Numpy array (int64) with the period of each grid once stabilized (1 for still lifes and dead grids),
+            or 0 if the grid did not stabilize
+        """
+        return self._periods
+
+    def get_populations(self) -> np.ndarray:
+        """
+        :return: Numpy array (int64) with the number of alive cells of each grid at the last generation
+        """
+        return self._populations
+
+    def get_stabilizations(self) -> np.ndarray:
+        """
+        :return: Numpy array (int64) with the first generation from which each grid repeats periodically,
+            or -1 if the grid did not stabilize
+        """
+        return self._stabilizations
+
+
+class BatchStepper:
+    """
+    Steps a batch of grids of the same size.
+    The grids are stored with a border of cells (the halo, see engine.boundary) in two preallocated buffers that are
+    swapped at each generation.
+    """
+
+    def __init__(self, grids: np.ndarray, rule=None, boundary: str = None):
+        """
+        :param grids: Numpy array with shape (batch, rows, cols). Non-zero cells are alive
+        :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+        :param boundary: The boundary condition of the grids (see engine.boundary, default: dead)
+        """
+        if grids.ndim != 3:
+            raise ValueError("The batch must be a 3-D array with shape (batch, rows, cols)")
+        self._rule = get_rule(rule)
+        self._boundary = check_boundary(boundary)
+        # Rule lookup table packed into the bits of an integer (see step)
+        self._rule_mask = np.uint32(sum(1 << i for i, value in enumerate(self._rule.flat_table) if value))
+        self._alive = None
+        self._next_alive = None
+        self._sums = None
+        self._neighbors = None
+        self._lookup = None
+        self._allocate(grids.astype(bool))
+
+    def _allocate(self, grids_alive: np.ndarray):
+        batch, rows, cols = grids_alive.shape
+        self._alive = np.zeros((batch, rows + 2, cols + 2), dtype=np.uint8)
+        self._next_alive = np.zeros_like(self._alive)
+        self._alive[:, 1:-1, 1:-1] = grids_alive
+        # Work buffers: sums of three vertically adjacent cells, then of the 3x3 blocks
+        self._sums = np.zeros((batch, rows, cols + 2), dtype=np.uint8)
+        self._neighbors = np.zeros((batch, rows, cols), dtype=np.uint8)
+        self._lookup = np.zeros((batch, rows, cols), dtype=np.uint32)
+
+    def get_alive(self) -> np.ndarray:
+        """
+        :return: View (uint8, shape (batch, rows, cols)) of the alive cells of the grids. It changes at the next step
+        """
+        return self._alive[:, 1:-1, 1:-1]
+
+    def get_batch_size(self) -> int:
+        return self._alive.shape[0]
+
+    def get_populations(self) -> np.ndarray:
+        """
+        :return: Numpy array (int64) with the number of alive cells of each grid
+        """
+        return np.count_nonzero(self.get_alive(), axis=(1, 2))
+
+    def select(self, mask: np.ndarray):
+        """
+        Keep only some of the grids of the batch
+
+        :param mask: Boolean numpy array with True for the grids to keep
+        """
+        self._allocate(self.get_alive()[mask].astype(bool))
+
+    def step(self, n: int = 1):
+        """
+        Advance all the grids of the batch by n generations
+
+        :param n: Number of generations
+        """
+        alive, next_alive = self._alive, self._next_alive
+        sums, neighbors, lookup = self._sums, self._neighbors, self._lookup
+        for _ in range(n):
+            fill_halo(alive, self._boundary)
+            # Sum the 3x3 block around each cell in two separable passes (vertical, then horizontal)
+            np.add(alive[:, :-2], alive[:, 1:-1], out=sums)
+            np.add(sums, alive[:, 2:], out=sums)
+            np.add(sums[:, :, :-2], sums[:, :, 1:-1], out=neighbors)
+            np.add(neighbors, sums[:, :, 2:], out=neighbors)
+            # The block sum includes the cell itself: the index 9 * alive + (sum - alive) of the rule table (see
+            # Rule.flat_table) is equal to 8 * alive + sum
+            np.add(neighbors, np.left_shift(alive[:, 1:-1, 1:-1], 3), out=neighbors)
+            # Look up the next state as the bit of the rule mask at that index: shifting is about twice as fast as
+            # indexing the table
+            np.right_shift(self._rule_mask, neighbors, out=lookup)
+            np.bitwise_and(lookup, 1, out=next_alive[:, 1:-1, 1:-1], casting="unsafe")
+            alive, next_alive = next_alive, alive
+        self._alive, self._next_alive = alive, next_alive
+
+
+def hash_grids(grids_alive: np.ndarray) -> np.ndarray:
+    """
+    Compute a 64 bit hash of each grid of a batch. Different grids have the same hash with negligible probability
+
+    :param grids_alive: Numpy array with shape (batch, rows, cols). Non-zero cells are alive
+    :return: Numpy array (uint64) with the hash of each grid
+    """
+    batch = grids_alive.shape[0]
+    packed = np.packbits(grids_alive.astype(bool).reshape(batch, -1), axis=1)
+    pad = -packed.shape[1] % 8
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    words = packed.view(np.uint64)
+    multipliers = np.random.default_rng(_HASH_SEED).integers(0, 2 ** 64, size=words.shape[1], dtype=np.uint64) | 1
+    # Mix each word with its position before summing, so that the hash depends on where the cells are
+    mixed = words * multipliers
+    mixed ^= mixed >> np.uint64(31)
+    mixed *= _HASH_MIX
+    return mixed.sum(axis=1, dtype=np.uint64)
+
+
+def step_batch(grids: np.ndarray, n: int = 1, rule=None, boundary: str = None) -> np.ndarray:
+    """
+    Advance a batch of grids by n generations
+
+    :param grids: Numpy array with shape (batch, rows, cols). Non-zero cells are alive
+    :param n: Number of generations
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grids (see engine.boundary, default: dead)
+    :return: Numpy array (uint8) with the alive cells of the grids after n generations
+    """
+    stepper = BatchStepper(grids, rule, boundary)
+    stepper.step(n)
+    return stepper.get_alive().copy()
+
+
+def simulate_batch(grids: np.ndarray, generations: int, rule=None, boundary: str = None,
+                   max_period: int = None) -> BatchResult:
+    """
+    Evolve a batch of grids for a number of generations, detecting when each grid stabilizes (i.e. when it repeats a
+    previous configuration). The grids that stabilize are only evolved until their configuration at the last generation
+    is known and then are removed from the batch, so the simulation gets faster as the grids settle down and stops as
+    soon as all of them are stable
+
+    :param grids: Numpy array with shape (batch, rows, cols). Non-zero cells are alive
+    :param generations: Number of generations
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grids (see engine.boundary, default: dead)
+    :param max_period: Longest period detected (default: config.BATCH_MAX_PERIOD)
+    :return: The populations, stabilization generations and periods of the grids
+    """
+    max_period = max_period or config.BATCH_MAX_PERIOD
+    batch = grids.shape[0]
+    stepper = BatchStepper(grids, rule, boundary)
+
+    final_grids = np.zeros(grids.shape, dtype=np.uint8)
+    populations = np.zeros(batch, dtype=np.int64)
+    stabilizations = np.full(batch, -1, dtype=np.int64)
+    periods = np.zeros(batch, dtype=np.int64)
+
+    # Indices (in the input batch) of the grids still being evolved
+    indices = np.arange(batch)
+    # Generation at which each grid has the same configuration as at the last generation (only for stable grids)
+    stop_generations = np.full(batch, generations, dtype=np.int64)
+    # Ring buffer with the hashes of the last max_period generations of each grid
+    history = np.zeros((max_period, batch), dtype=np.uint64)
+    history_valid = np.zeros(max_period, dtype=bool)
+    # Distance in generations from the current one of each slot of the ring buffer, indexed by the current slot
+    slot_ages = (np.arange(max_period)[:, None] - np.arange(max_period)[None, :]) % max_period
+    slot_ages[slot_ages == 0] = max_period
+
+    for generation in range(generations + 1):
+        hashes = hash_grids(stepper.get_alive())
+        slot = generation % max_period
+
+        # Look for the most recent generation with the same configuration, among the grids not yet stable
+        unstable = stabilizations[indices] < 0
+        matches = (history[:, indices] == hashes) & history_valid[:, None] & unstable
+        found = matches.any(axis=0)
+        if found.any():
+            ages = np.where(matches, slot_ages[slot][:, None], max_period + 1)
+            found_periods = ages.min(axis=0)[found]
+            found_indices = indices[found]
+            periods[found_indices] = found_periods
+            stabilizations[found_indices] = generation - found_periods
+            # The configuration at the last generation is reached again within a period
+            stop_generations[found_indices] = generation + (generations - generation) % found_periods
+
+        history[slot, indices] = hashes
+        history_valid[slot] = True
+
+        # Store and remove the grids whose configuration at the last generation has been reached
+        done = stop_generations[indices] == generation
+        if done.any():
+            done_indices = indices[done]
+            final_grids[done_indices] = stepper.get_alive()[done]
+            populations[done_indices] = stepper.get_populations()[done]
+            indices = indices[~done]
+            if indices.size == 0:
+                break
+            stepper.select(~done)
+
+        if generation < generations:
+            stepper.step()
+
+    return BatchResult(final_grids, populations, stabilizations, periods)
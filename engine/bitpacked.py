@@ -0,0 +1,235 @@
+"""
+Bit-packed representation of the GOL grid, storing 64 cells per 64-bit word.
+The next generation is computed with bitwise full-adder logic applied to whole words, so that 64 cells are updated by
+each numpy operation and the temporary arrays are 8 times smaller than the ones of the convolution engine.
+"""
+import numpy as np
+
+from engine.base import Engine
+from engine.boundary import DEAD, KLEIN, REFLECT, TORUS
+from engine.rules import CONWAY, Rule
+
+_ONE = np.uint64(1)
+_WORD_MSB = np.uint64(63)
+
+
+def _popcount(words: np.ndarray) -> int:
+    """
+    Count the bits set in an array of 64-bit words
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(np.unpackbits(words.view(np.uint8)).sum(dtype=np.int64))
+
+
+class BitPackedGrid:
+    """
+    Grid of dead/alive cells where each row is packed into 64-bit words (bit b of word w holds the column 64 * w + b).
+    The array of words has an additional row above and below the grid (the halo), so that the neighbors of the border
+    rows are read without special cases.
+    """
+
+    def __init__(self, rows: int, cols: int):
+        self._rows = rows
+        self._cols = cols
+        self._n_words = (cols + 63) // 64
+        self._words = np.zeros((rows + 2, self._n_words), dtype=np.uint64)
+
+        # Mask of the valid bits of the last word of each row. The padding bits must always stay dead
+        n_valid_bits = cols - 64 * (self._n_words - 1)
+        self._last_word_mask = np.uint64((1 << n_valid_bits) - 1)
+
+    @classmethod
+    def from_numpy(cls, grid: np.ndarray) -> "BitPackedGrid":
+        """
+        Create a bit-packed grid from a numpy array
+
+        :param grid: Numpy array where non-zero elements are alive cells
+        :return: The bit-packed grid
+        """
+        rows, cols = grid.shape
+        packed_grid = cls(rows, cols)
+
+        grid_alive = np.zeros((rows, packed_grid._n_words * 64), dtype=bool)
+        grid_alive[:, :cols] = grid
+        grid_bytes = np.packbits(grid_alive, axis=1, bitorder="little")
+        packed_grid._words[1:-1] = grid_bytes.view("<u8")
+
+        return packed_grid
+
+    def get_shape(self) -> tuple:
+        return self._rows, self._cols
+
+    def get_population(self) -> int:
+        return _popcount(self._words[1:-1])
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Unpack the grid into a numpy array
+
+        :return: Numpy array (uint8) with 1 for the alive cells and 0 for the dead ones
+        """
+        grid_bytes = self._words[1:-1].astype("<u8").view(np.uint8)
+        return np.unpackbits(grid_bytes, axis=1, count=self._cols, bitorder="little")
+
+    def _get_column(self, col: int) -> np.ndarray:
+        """
+        :return: The bits of a column (for all the rows, halo included) as the least significant bit of 64-bit words
+        """
+        return (self._words[:, col // 64] >> np.uint64(col % 64)) & _ONE
+
+    def _reverse_row(self, row: np.ndarray) -> np.ndarray:
+        """
+        :return: The words of a row with the order of its cells reversed
+        """
+        cells = np.unpackbits(row.astype("<u8").view(np.uint8), count=self._cols, bitorder="little")
+        reversed_cells = np.zeros(self._n_words * 64, dtype=np.uint8)
+        reversed_cells[:self._cols] = cells[::-1]
+        return np.packbits(reversed_cells, bitorder="little").view("<u8")
+
+    def _fill_vertical_halo(self, boundary: str):
+        """
+        Fill the halo rows above and below the grid according to the boundary condition (see engine.boundary)
+        """
+        words = self._words
+        if boundary == DEAD:
+            words[0] = 0
+            words[-1] = 0
+        elif boundary == TORUS:
+            words[0] = words[-2]
+            words[-1] = words[1]
+        elif boundary == REFLECT:
+            words[0] = words[1]
+            words[-1] = words[-2]
+        elif boundary == KLEIN:
+            words[0] = self._reverse_row(words[-2])
+            words[-1] = self._reverse_row(words[1])
+
+    def _horizontal_halo(self, boundary: str) -> tuple:
+        """
+        :return: The cells on the left of the first column and on the right of the last one, according to the boundary
+        condition (see engine.boundary), as the least significant bit of 64-bit words. None for the dead boundary
+        """
+        if boundary == DEAD:
+            return None, None
+        elif boundary == REFLECT:
+            return self._get_column(0), self._get_column(self._cols - 1)
+        else:
+            # Both the torus and the Klein bottle wrap the columns
+            return self._get_column(self._cols - 1), self._get_column(0)
+
+    def step(self, rule: Rule = CONWAY, boundary: str = DEAD, count: bool = False):
+        """
+        Compute the next generation of the grid applying the given rule
+
+        :param rule: The rule to apply (default: Conway's Game of Life)
+        :param boundary: The boundary condition of the grid (see engine.boundary)
+        :param count: Whether to count the cells born and died
+        :return: The number of cells born and died as a tuple (births, deaths) if counted, otherwise None
+        """
+        words = self._words
+        self._fill_vertical_halo(boundary)
+        west_halo, east_halo = self._horizontal_halo(boundary)
+
+        # Neighbors on the left (west) and on the right (east) of each cell, shifting the bits across the words
+        west = words << _ONE
+        west[:, 1:] |= words[:, :-1] >> _WORD_MSB
+        east = words >> _ONE
+        east[:, :-1] |= words[:, 1:] << _WORD_MSB
+        if west_halo is not None:
+            west[:, 0] |= west_halo
+            east[:, -1] |= east_halo << np.uint64((self._cols - 1) % 64)
+
+        # Sum the west, center and east cells of each row with a full adder: 2-bit result (sum, carry)
+        west_xor_center = west ^ words
+        row_sum = west_xor_center ^ east
+        row_carry = (west & words) | (east & west_xor_center)
+
+        # Neighbors of the current row (the cell itself is excluded): half adder of west and east
+        mid_sum = west[1:-1] ^ east[1:-1]
+        mid_carry = west[1:-1] & east[1:-1]
+
+        # Add the row above, the row below and the current row. The total is ones + 2 * (number of twos bits set)
+        top_sum, bottom_sum = row_sum[:-2], row_sum[2:]
+        top_xor_bottom = top_sum ^ bottom_sum
+        ones = top_xor_bottom ^ mid_sum
+        ones_carry = (top_sum & bottom_sum) | (mid_sum & top_xor_bottom)
+
+        twos_p = row_carry[:-2] ^ row_carry[2:]
+        twos_a = row_carry[:-2] & row_carry[2:]
+        twos_q = mid_carry ^ ones_carry
+        twos_b = mid_carry & ones_carry
+        alive = words[1:-1]
+
+        if rule == CONWAY:
+            # The cell is alive at the next generation if the total is 3, or if it is 2 and the cell is alive.
+            # Both cases require exactly one of the four "twos" bits to be set
+            exactly_one_two = (twos_p ^ twos_q) & ~(twos_a | twos_b)
+            next_words = exactly_one_two & (ones | alive)
+        else:
+            # Compute the four bits of the neighbors count (0-8) and match them against the counts of the rule
+            twos_carry = twos_p & twos_q
+            twos_a_xor_b = twos_a ^ twos_b
+            count_bits = (ones, twos_p ^ twos_q, twos_a_xor_b ^ twos_carry,
+                          (twos_a & twos_b) | (twos_carry & twos_a_xor_b))
+            next_words = (~alive & self._match_counts(count_bits, rule.birth)) | \
+                         (alive & self._match_counts(count_bits, rule.survival))
+
+        next_words[:, -1] &= self._last_word_mask
+        changes = (_popcount(next_words & ~alive), _popcount(alive & ~next_words)) if count else None
+        words[1:-1] = next_words
+        return changes
+
+    @staticmethod
+    def _match_counts(count_bits: tuple, counts: frozenset) -> np.ndarray:
+        """
+        :param count_bits: The four bit planes of the neighbors count, from the least significant one
+        :param counts: The neighbors counts to match
+        :return: The words having the bits set where the neighbors count is one of the given counts
+        """
+        matches = np.zeros_like(count_bits[0])
+        for count in counts:
+            match = ~np.zeros_like(count_bits[0])
+            for bit, count_bit in enumerate(count_bits):
+                match &= count_bit if (count >> bit) & 1 else ~count_bit
+            matches |= match
+        return matches
+
+
+class BitPackedEngine(Engine):
+    """
+    Engine storing the grid in bit-packed form (see BitPackedGrid).
+    It only stores the alive state of the cells: the grid of ages is rebuilt lazily, only when it is exported.
+    """
+
+    name = "bitpacked"
+
+    def __init__(self, rule=None, boundary: str = None):
+        super().__init__(rule, boundary)
+        self._packed_grid = None
+        # Counts of the last generation (see get_counts)
+        self._counts = None
+
+    def get_counts(self):
+        return self._counts
+
+    def get_population(self) -> int:
+        return self._packed_grid.get_population()
+
+    def load(self, grid: np.ndarray):
+        self._packed_grid = BitPackedGrid.from_numpy(grid)
+        self._reset_ages(grid)
+        self._counts = None
+
+    def step(self, n: int = 1):
+        for generation in range(n):
+            # Only the last generation is counted, on the packed words
+            changes = self._packed_grid.step(self._rule, self._boundary, count=generation == n - 1)
+        if n > 0:
+            self._counts = (self._packed_grid.get_population(), *changes)
+        self._generation += n
+
+    def to_numpy(self) -> np.ndarray:
+        if self._ages_generation == self._generation and self._ages is not None:
+            return self._ages
+        return self._track_ages(self._packed_grid.to_numpy())
@@ -0,0 +1,69 @@
+"""
+Boundary conditions of a finite grid.
+The engines store the grid inside a buffer with a border of one cell (the halo) and, before each generation, copy into
+the halo the cells that the boundary condition makes adjacent to the grid border. The copy only touches the perimeter of
+the grid, so no padded copy of the whole grid is made at each step.
+"""
+import numpy as np
+
+# Cells outside of the grid are always dead
+DEAD = "dead"
+# The opposite borders are adjacent (the grid is the surface of a torus)
+TORUS = "torus"
+# The cells outside of the grid mirror the ones on the border
+REFLECT = "reflect"
+# The left and right borders are adjacent as in the torus, while the top and bottom ones are adjacent with a flip
+KLEIN = "klein"
+
+BOUNDARIES = (DEAD, TORUS, REFLECT, KLEIN)
+
+
+def check_boundary(boundary: str) -> str:
+    """
+    :param boundary: The name of a boundary condition. None means the default one (dead)
+    :return: The name of the boundary condition
+    """
+    if boundary is None:
+        return DEAD
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown boundary: {boundary}")
+    return boundary
+
+
+def fill_halo(padded: np.ndarray, boundary: str, rows: int = None, cols: int = None):
+    """
+    Fill in place the halo of a padded grid according to the boundary condition.
+    The grid occupies padded[..., 1:rows + 1, 1:cols + 1]: the halo is made by the rows 0 and rows + 1 and by the columns
+    0 and cols + 1. Leading dimensions (e.g. a batch of grids) are supported.
+
+    :param padded: The padded grid
+    :param boundary: The boundary condition (see BOUNDARIES)
+    :param rows: Number of rows of the grid (default: all the rows of the padded array except the halo)
+    :param cols: Number of columns of the grid (default: all the columns of the padded array except the halo)
+    """
+    rows = padded.shape[-2] - 2 if rows is None else rows
+    cols = padded.shape[-1] - 2 if cols is None else cols
+    top, bottom = 0, rows + 1
+    left, right = 0, cols + 1
+    grid_rows = padded[..., :rows + 2, :]
+
+    if boundary == DEAD:
+        padded[..., top, :cols + 2] = 0
+        padded[..., bottom, :cols + 2] = 0
+        grid_rows[..., left] = 0
+        grid_rows[..., right] = 0
+    elif boundary == REFLECT:
+        padded[..., top, 1:right] = padded[..., 1, 1:right]
+        padded[..., bottom, 1:right] = padded[..., rows, 1:right]
+        grid_rows[..., left] = grid_rows[..., 1]
+        grid_rows[..., right] = grid_rows[..., cols]
+    else:
+        if boundary == TORUS:
+            padded[..., top, 1:right] = padded[..., rows, 1:right]
+            padded[..., bottom, 1:right] = padded[..., 1, 1:right]
+        else:
+            padded[..., top, 1:right] = padded[..., rows, cols:0:-1]
+            padded[..., bottom, 1:right] = padded[..., 1, cols:0:-1]
+        # Columns are filled after the rows, so that the corners are filled too
+        grid_rows[..., left] = grid_rows[..., cols]
+        grid_rows[..., right] = grid_rows[..., 1]
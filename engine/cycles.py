@@ -0,0 +1,223 @@
+"""
+Detection of the stabilization of the grid: extinction, still lifes and oscillators.
+Each generation is identified by a Zobrist hash, i.e. the XOR of a random 64 bit key for each alive cell. The hash is
+updated incrementally with the keys of the cells that changed since the previous generation, so only the changed part of
+the grid is hashed. The detector relies on what the engine knows about the last generation: when the engine counted no
+birth and no death (see Engine.get_counts), the grid is not even exported, and when it reports which tiles changed (see
+TiledEngine), the other tiles are not compared.
+A generation whose hash is found in the history of the last generations repeats a previous configuration: from then on
+the grid evolves periodically.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from config import config
+from engine.engines import create_engine
+
+# Seed of the random keys of the cells (the hashes are only compared within a detector)
+_KEYS_SEED = 0x600D
+# Fraction of changed tiles above which the whole grid is compared at once instead of tile by tile
+_FULL_COMPARE_RATIO = 0.25
+
+EXTINCTION = "extinction"
+STILL_LIFE = "still life"
+OSCILLATOR = "oscillator"
+
+
+class Cycle:
+    """
+    Periodic behavior reached by the grid
+    """
+
+    def __init__(self, start: int, period: int, population: int):
+        """
+        :param start: First generation of the cycle
+        :param period: Number of generations after which the grid repeats
+        :param population: Number of alive cells at the generation the cycle has been detected
+        """
+        self._start = start
+        self._period = period
+        self._population = population
+
+    def __str__(self):
+        if self.get_kind() == EXTINCTION:
+            return f"Extinction at generation {self._start}"
+        elif self.get_kind() == STILL_LIFE:
+            return f"Still life from generation {self._start}"
+        return f"Oscillator of period {self._period} from generation {self._start}"
+
+    def get_kind(self) -> str:
+        """
+        :return: The kind of cycle (EXTINCTION, STILL_LIFE or OSCILLATOR)
+        """
+        if self._population == 0:
+            return EXTINCTION
+        return STILL_LIFE if self._period == 1 else OSCILLATOR
+
+    def get_period(self) -> int:
+        return self._period
+
+    def get_population(self) -> int:
+        return self._population
+
+    def get_start(self) -> int:
+        return self._start
+
+
+class CycleDetector:
+    """
+    Keeps the hashes of the last generations of the grid to detect when a configuration repeats.
+    The detector must be reset whenever the grid is changed other than by the engine (e.g. loaded or edited). The
+    generations of the detected cycles are the ones given to the updates (e.g. counted by the engine)
+    """
+
+    def __init__(self, history: int = None):
+        """
+        :param history: Number of generations kept in the history, i.e. the longest detectable period
+            (default: config.CYCLE_HISTORY)
+        """
+        self._history_size = history or config.CYCLE_HISTORY
+        # Generation of each hash in the history, from the oldest one
+        self._history = OrderedDict()
+        self._keys = None
+        # Alive cells at the last update and their hash
+        self._alive = None
+        self._hash = np.uint64(0)
+        self._generation = None
+        self._cycle = None
+
+    def get_cycle(self):
+        """
+        :return: The cycle detected since the last reset, or None
+        """
+        return self._cycle
+
+    def get_hash(self) -> int:
+        return int(self._hash)
+
+    def reset(self):
+        """
+        Forget the history: the next update starts the detection from scratch
+        """
+        self._history.clear()
+        self._alive = None
+        self._generation = None
+        self._cycle = None
+
+    def _start(self, grid_alive: np.ndarray):
+        if self._keys is None or self._keys.shape != grid_alive.shape:
+            rng = np.random.default_rng(_KEYS_SEED)
+            self._keys = rng.integers(0, 2 ** 64, size=grid_alive.shape, dtype=np.uint64)
+        self._alive = grid_alive.copy()
+        self._hash = np.bitwise_xor.reduce(self._keys[grid_alive], initial=np.uint64(0))
+
+    def _changed_cells(self, grid: np.ndarray, changed_tiles: np.ndarray, tile_size: int) -> tuple:
+        """
+        :return: The coordinates (rows, cols) of the cells that changed since the last update. When the changed tiles
+            are known only they are compared
+        """
+        if changed_tiles is None or np.count_nonzero(changed_tiles) > _FULL_COMPARE_RATIO * changed_tiles.size:
+            return np.nonzero((grid != 0) != self._alive)
+
+        rows, cols = [], []
+        for tile_row, tile_col in zip(*np.nonzero(changed_tiles)):
+            first_row, first_col = tile_row * tile_size, tile_col * tile_size
+            tile = (slice(first_row, first_row + tile_size), slice(first_col, first_col + tile_size))
+            tile_rows, tile_cols = np.nonzero((grid[tile] != 0) != self._alive[tile])
+            rows.append(tile_rows + first_row)
+            cols.append(tile_cols + first_col)
+        if not rows:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def update(self, grid: np.ndarray, generation: int, changed_tiles: np.ndarray = None, tile_size: int = None):
+        """
+        Add a generation to the history
+
+        :param grid: Numpy array with the state of the grid (non-zero cells are alive)
+        :param generation: The generation of the grid (e.g. as counted by the engine)
+        :param changed_tiles: Boolean numpy array (one element per tile) of the tiles that changed since the previous
+            generation, if known (see TiledEngine.get_changed_tiles)
+        :param tile_size: Side of the tiles, in cells
+        :return: The cycle if it has been detected at this generation, otherwise None
+        """
+        if self._cycle is not None:
+            # The grid already evolves periodically
+            return None
+
+        if self._alive is None or grid.shape != self._alive.shape:
+            self._start(grid != 0)
+        else:
+            if generation != self._generation + 1:
+                # The changed tiles only refer to the last generation
+                changed_tiles = None
+            rows, cols = self._changed_cells(grid, changed_tiles, tile_size)
+            self._hash ^= np.bitwise_xor.reduce(self._keys[rows, cols], initial=np.uint64(0))
+            self._alive[rows, cols] = grid[rows, cols] != 0
+        return self._add_generation(generation)
+
+    def _add_generation(self, generation: int):
+        """
+        Helper method to add the current hash to the history
+        :param generation: The generation of the grid
+        :return: The cycle if it has been detected at this generation, otherwise None
+        """
+        self._generation = generation
+        key = int(self._hash)
+        if key in self._history:
+            start = self._history[key]
+            self._cycle = Cycle(start, generation - start, int(np.count_nonzero(self._alive)))
+            return self._cycle
+
+        self._history[key] = generation
+        if len(self._history) > self._history_size:
+            self._history.popitem(last=False)
+        return None
+
+    def update_from_engine(self, engine):
+        """
+        Add the current generation of an engine to the history (see update)
+
+        :param engine: The engine evolving the grid
+        :return: The cycle if it has been detected at this generation, otherwise None
+        """
+        generation = engine.get_generation()
+        changed_tiles = engine.get_changed_tiles()
+        if self._cycle is None and self._alive is not None and generation == self._generation + 1:
+            # Nothing to compare (nor to export) when the engine knows that no cell changed during the last generation
+            counts = engine.get_counts()
+            if (counts is not None and counts[1] == counts[2] == 0) or \
+                    (changed_tiles is not None and not changed_tiles.any()):
+                return self._add_generation(generation)
+        tile_size = engine.get_tile_size() if changed_tiles is not None else None
+        return self.update(engine.to_numpy(), generation, changed_tiles, tile_size)
+
+
+def detect_cycle(grid: np.ndarray, max_generations: int, rule=None, boundary: str = None, engine: str = "convolution",
+                 history: int = None):
+    """
+    Evolve a grid until it becomes periodic (extinct, still or oscillating)
+
+    :param grid: Numpy array (uint8) with the age of each cell (0: dead cell)
+    :param max_generations: Maximum number of generations to compute
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grid (see engine.boundary, default: dead)
+    :param engine: The name of a bounded engine (see engine.engines)
+    :param history: Longest detectable period (default: config.CYCLE_HISTORY)
+    :return: The detected cycle, or None if the grid did not stabilize within max_generations
+    """
+    gol_engine = create_engine(engine, rule, boundary)
+    if gol_engine.unbounded:
+        raise ValueError(f"The {engine} engine has an unbounded universe: cycles can only be detected on a bounded grid")
+    gol_engine.load(grid)
+
+    detector = CycleDetector(history)
+    try:
+        cycle = detector.update_from_engine(gol_engine)
+        while cycle is None and gol_engine.get_generation() < max_generations:
+            gol_engine.step()
+            cycle = detector.update_from_engine(gol_engine)
+    finally:
+        gol_engine.close()
+    return cycle
@@ -0,0 +1,46 @@
+"""
+Registry of the available engines, to select them by name.
+The engine modules are only imported when an engine is created, so that choosing an engine does not pay for the
+dependencies of the others (e.g. scipy for the convolution engine or numba for the JIT one).
+"""
+import importlib
+
+from engine.base import Engine
+
+# Module and class of each engine
+ENGINES = {
+    "convolution": ("engine.life", "ConvolutionEngine"),
+    "bitpacked": ("engine.bitpacked", "BitPackedEngine"),
+    "hashlife": ("engine.hashlife", "HashLifeEngine"),
+    "jit": ("engine.jit", "JitEngine"),
+    "parallel": ("engine.parallel", "ParallelEngine"),
+    "sparse": ("engine.sparse", "SparseEngine"),
+    "tiled": ("engine.tiled", "TiledEngine"),
+}
+
+
+def get_available_engines() -> list:
+    return list(ENGINES.keys())
+
+
+def get_engine_class(name: str) -> type:
+    """
+    :param name: The name of the engine (see get_available_engines)
+    :return: The class of the engine, importing its module if needed
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine: {name}")
+    module_name, class_name = ENGINES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_engine(name: str, rule=None, boundary: str = None) -> Engine:
+    """
+    Create an engine given its name
+
+    :param name: The name of the engine (see get_available_engines)
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grid (see engine.boundary, default: dead)
+    :return: A new instance of the requested engine
+    """
+    return get_engine_class(name)(rule=rule, boundary=boundary)
@@ -0,0 +1,376 @@
+"""
+Implementation of Gosper's HashLife algorithm.
+The universe is a quadtree whose nodes are hash-consed (identical sub-patterns are stored only once) and the evolution of
+each node is memoized, so that periodic and regularly growing patterns can be advanced by 2^k generations in a single
+call. The universe is unbounded: it grows as needed when the pattern expands.
+"""
+import numpy as np
+
+from config import config
+from engine.base import Engine
+from engine.rules import CONWAY, Rule, get_rule
+
+_HASH_MASK = (1 << 64) - 1
+
+
+class Node:
+    """
+    Node of the quadtree. A node of level k represents a square of 2^k x 2^k cells, split into four children of level
+    k - 1: a (north-west), b (north-east), c (south-west) and d (south-east). The nodes of level 0 are single cells.
+    Nodes are immutable and unique (see HashLifeUniverse.join), so they are compared by identity.
+    """
+    __slots__ = ("k", "a", "b", "c", "d", "n", "hash")
+
+    def __init__(self, k: int, a, b, c, d, n: int, hash_value: int):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        # Population of the node (number of alive cells)
+        self.n = n
+        self.hash = hash_value
+
+    def __hash__(self):
+        return self.hash
+
+
+class HashLifeUniverse:
+    """
+    Unbounded GOL universe evolved with the HashLife algorithm.
+    The universe owns the caches of the canonical nodes and of their successors. When the cache of nodes grows over
+    max_nodes the caches are garbage collected: all the successors are forgotten and only the nodes reachable from the
+    current root are kept.
+    The rule must not give birth to cells with no alive neighbors (B0 rules), otherwise the empty space is not stable.
+    """
+
+    def __init__(self, max_nodes: int = None, rule: Rule = CONWAY):
+        self._rule = None
+        self.set_rule(rule)
+        self._max_nodes = max_nodes if max_nodes is not None else config.HASHLIFE_MAX_NODES
+        # Canonical nodes, indexed by their children
+        self._nodes = {}
+        # Memoized evolution of the nodes, indexed by (node, j) where the node is advanced by 2^j generations
+        self._successors = {}
+
+        self._off = Node(0, None, None, None, None, 0, 0)
+        self._on = Node(0, None, None, None, None, 1, 1)
+        # Empty nodes of each level (index = level)
+        self._empty = [self._off]
+
+        self._root = self.get_empty(2)
+        # Universe coordinates (row, col) of the root node upper-left corner
+        self._origin = (0, 0)
+
+    def get_cache_size(self) -> int:
+        return len(self._nodes)
+
+    def get_population(self) -> int:
+        return self._root.n
+
+    def set_rule(self, rule):
+        """
+        Change the rule of the universe, forgetting the successors computed with the previous one
+
+        :param rule: The rule, as a Rule or in B/S notation
+        """
+        rule = get_rule(rule)
+        if rule.births_from_empty():
+            raise ValueError("HashLife does not support rules with births from empty space (B0)")
+        if rule != self._rule:
+            self._rule = rule
+            self._successors = {}
+
+    def get_empty(self, k: int) -> Node:
+        """
+        :param k: The level of the node
+        :return: The empty node of level k
+        """
+        while len(self._empty) <= k:
+            empty = self._empty[-1]
+            self._empty.append(self.join(empty, empty, empty, empty))
+        return self._empty[k]
+
+    def join(self, a: Node, b: Node, c: Node, d: Node) -> Node:
+        """
+        Get the canonical node with the given children, creating it if it does not exist
+        """
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            hash_value = (a.k + 1 + 5131830419411 * a.hash + 3758991985019 * b.hash + 8973110871315 * c.hash +
+                          4318490180473 * d.hash) & _HASH_MASK
+            node = Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n, hash_value)
+            self._nodes[key] = node
+        return node
+
+    def _centre(self, m: Node) -> Node:
+        """
+        :return: A node of level k + 1 having the node m (of level k) at its center, surrounded by empty space
+        """
+        z = self.get_empty(m.k - 1)
+        return self.join(self.join(z, z, z, m.a), self.join(z, z, m.b, z), self.join(z, m.c, z, z),
+                         self.join(m.d, z, z, z))
+
+    def _inner(self, m: Node) -> Node:
+        """
+        :return: The central node of level k - 1 of the node m (of level k)
+        """
+        return self.join(m.a.d, m.b.c, m.c.b, m.d.a)
+
+    def _life_4x4(self, m: Node) -> Node:
+        """
+        Base case of the recursion: advance the central 2x2 cells of a 4x4 node by one generation
+        """
+        cells = [[m.a.a.n, m.a.b.n, m.b.a.n, m.b.b.n],
+                 [m.a.c.n, m.a.d.n, m.b.c.n, m.b.d.n],
+                 [m.c.a.n, m.c.b.n, m.d.a.n, m.d.b.n],
+                 [m.c.c.n, m.c.d.n, m.d.c.n, m.d.d.n]]
+
+        next_cells = []
+        for row in (1, 2):
+            for col in (1, 2):
+                neighbors = sum(cells[r][c] for r in (row - 1, row, row + 1) for c in (col - 1, col, col + 1)) - \
+                            cells[row][col]
+                alive = self._rule.table[cells[row][col], neighbors]
+                next_cells.append(self._on if alive else self._off)
+
+        return self.join(*next_cells)
+
+    def _successor(self, m: Node, j: int) -> Node:
+        """
+        Compute the central node of level k - 1 of the node m (of level k) advanced by 2^j generations (j <= k - 2)
+        """
+        if m.n == 0:
+            return m.a
+
+        key = (m, j)
+        result = self._successors.get(key)
+        if result is not None:
+            return result
+
+        if m.k == 2:
+            result = self._life_4x4(m)
+        else:
+            # Nine overlapping sub-nodes of level k - 1, advanced by 2^sub_j generations (results of level k - 2)
+            sub_j = min(j, m.k - 3)
+            c1 = self._successor(m.a, sub_j)
+            c2 = self._successor(self.join(m.a.b, m.b.a, m.a.d, m.b.c), sub_j)
+            c3 = self._successor(m.b, sub_j)
+            c4 = self._successor(self.join(m.a.c, m.a.d, m.c.a, m.c.b), sub_j)
+            c5 = self._successor(self._inner(m), sub_j)
+            c6 = self._successor(self.join(m.b.c, m.b.d, m.d.a, m.d.b), sub_j)
+            c7 = self._successor(m.c, sub_j)
+            c8 = self._successor(self.join(m.c.b, m.d.a, m.c.d, m.d.c), sub_j)
+            c9 = self._successor(m.d, sub_j)
+
+            if j < m.k - 2:
+                # The sub-nodes have already been advanced by 2^j generations: just take their centers
+                result = self.join(self.join(c1.d, c2.c, c4.b, c5.a), self.join(c2.d, c3.c, c5.b, c6.a),
+                                   self.join(c4.d, c5.c, c7.b, c8.a), self.join(c5.d, c6.c, c8.b, c9.a))
+            else:
+                # Advance the four overlapping quadrants by further 2^(k - 3) generations (2^(k - 2) in total)
+                result = self.join(self._successor(self.join(c1, c2, c4, c5), sub_j),
+                                   self._successor(self.join(c2, c3, c5, c6), sub_j),
+                                   self._successor(self.join(c4, c5, c7, c8), sub_j),
+                                   self._successor(self.join(c5, c6, c8, c9), sub_j))
+
+        self._successors[key] = result
+        return result
+
+    def _expand(self):
+        """
+        Surround the root with empty space, keeping its content at the same universe coordinates
+        """
+        half = 1 << (self._root.k - 1)
+        self._root = self._centre(self._root)
+        self._origin = (self._origin[0] - half, self._origin[1] - half)
+
+    def _is_padded(self) -> bool:
+        """
+        :return: True if all the alive cells are inside the central node of the root (the border is empty)
+        """
+        return self._root.k >= 3 and self._inner(self._root).n == self._root.n
+
+    def _shrink(self):
+        """
+        Discard the empty border of the root while all the alive cells fit in its central node
+        """
+        while self._root.k > 2 and self._inner(self._root).n == self._root.n:
+            quarter = 1 << (self._root.k - 2)
+            self._root = self._inner(self._root)
+            self._origin = (self._origin[0] + quarter, self._origin[1] + quarter)
+
+    def _jump(self, j: int):
+        """
+        Advance the universe by 2^j generations
+        """
+        # The pattern can expand by at most one cell per generation: make sure there is enough empty space around it
+        while self._root.k < j + 2 or not self._is_padded():
+            self._expand()
+        self._expand()
+
+        quarter = 1 << (self._root.k - 2)
+        self._root = self._successor(self._root, j)
+        self._origin = (self._origin[0] + quarter, self._origin[1] + quarter)
+
+    def advance(self, n: int):
+        """
+        Advance the universe by n generations, decomposing n in powers of two
+
+        :param n: Number of generations to compute
+        """
+        j = 0
+        while n > 0:
+            if n & 1:
+                self._jump(j)
+                self._shrink()
+                self._collect_garbage()
+            n >>= 1
+            j += 1
+
+    def _collect_garbage(self):
+        """
+        Clear the caches when they grow over the limit, keeping only the nodes reachable from the root
+        """
+        if len(self._nodes) <= self._max_nodes:
+            return
+
+        self._successors.clear()
+        self._nodes = {}
+        stack = [self._root] + self._empty[1:]
+        while stack:
+            node = stack.pop()
+            if node.k == 0:
+                continue
+            key = (node.a, node.b, node.c, node.d)
+            if key not in self._nodes:
+                self._nodes[key] = node
+                stack.extend(key)
+
+    def load(self, grid: np.ndarray, origin: tuple = (0, 0)):
+        """
+        Replace the content of the universe with the given grid
+
+        :param grid: Numpy array where non-zero elements are alive cells
+        :param origin: Universe coordinates (row, col) of the grid upper-left corner
+        """
+        rows, cols = grid.shape
+        k = max(2, int(max(rows, cols) - 1).bit_length())
+        grid_alive = grid.astype(bool)
+
+        def build(row: int, col: int, level: int) -> Node:
+            size = 1 << level
+            if row >= rows or col >= cols or not grid_alive[row:row + size, col:col + size].any():
+                return self.get_empty(level)
+            if level == 0:
+                return self._on
+            half = size // 2
+            return self.join(build(row, col, level - 1), build(row, col + half, level - 1),
+                             build(row + half, col, level - 1), build(row + half, col + half, level - 1))
+
+        self._root = build(0, 0, k)
+        self._origin = origin
+
+    def set_cell(self, row: int, col: int, alive: bool):
+        """
+        Change the state of a single cell, growing the universe if the cell is outside of the root
+
+        :param row: Universe row of the cell
+        :param col: Universe column of the cell
+        :param alive: The new state of the cell
+        """
+        def contains(r: int, c: int) -> bool:
+            size = 1 << self._root.k
+            return self._origin[0] <= r < self._origin[0] + size and self._origin[1] <= c < self._origin[1] + size
+
+        while not contains(row, col):
+            self._expand()
+
+        def replace(node: Node, r: int, c: int) -> Node:
+            if node.k == 0:
+                return self._on if alive else self._off
+            half = 1 << (node.k - 1)
+            if r < half:
+                if c < half:
+                    return self.join(replace(node.a, r, c), node.b, node.c, node.d)
+                return self.join(node.a, replace(node.b, r, c - half), node.c, node.d)
+            if c < half:
+                return self.join(node.a, node.b, replace(node.c, r - half, c), node.d)
+            return self.join(node.a, node.b, node.c, replace(node.d, r - half, c - half))
+
+        self._root = replace(self._root, row - self._origin[0], col - self._origin[1])
+
+    def to_numpy(self, row: int, col: int, rows: int, cols: int) -> np.ndarray:
+        """
+        Export a window of the universe into a numpy array
+
+        :param row: Universe row of the window upper-left corner
+        :param col: Universe column of the window upper-left corner
+        :param rows: Number of rows of the window
+        :param cols: Number of columns of the window
+        :return: Numpy array (uint8) with 1 for the alive cells and 0 for the dead ones
+        """
+        grid = np.zeros((rows, cols), dtype=np.uint8)
+
+        def fill(node: Node, node_row: int, node_col: int):
+            size = 1 << node.k
+            if node.n == 0 or node_row >= row + rows or node_col >= col + cols or \
+                    node_row + size <= row or node_col + size <= col:
+                return
+            if node.k == 0:
+                grid[node_row - row, node_col - col] = 1
+                return
+            half = size // 2
+            fill(node.a, node_row, node_col)
+            fill(node.b, node_row, node_col + half)
+            fill(node.c, node_row + half, node_col)
+            fill(node.d, node_row + half, node_col + half)
+
+        fill(self._root, self._origin[0], self._origin[1])
+        return grid
+
+
+class HashLifeEngine(Engine):
+    """
+    Engine evolving the grid with the HashLife algorithm (see HashLifeUniverse).
+    The universe is unbounded, so the alive cells leaving the grid are not lost: the exported grid is only a window of
+    the universe. step(n) jumps n generations at once in logarithmic time for periodic patterns.
+    """
+
+    name = "hashlife"
+    unbounded = True
+
+    def __init__(self, rule=None, boundary: str = None):
+        super().__init__(rule, boundary)
+        self._universe = HashLifeUniverse(rule=self._rule)
+        self._grid_size = (0, 0)
+
+    def get_population(self) -> int:
+        return self._universe.get_population()
+
+    def load(self, grid: np.ndarray):
+        self._universe.load(grid)
+        self._grid_size = grid.shape
+        self._reset_ages(grid)
+
+    def set_rule(self, rule):
+        self._universe.set_rule(rule)
+        super().set_rule(rule)
+
+    def set_cells(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        grid = self.to_numpy().copy()
+        for row, col, value in zip(rows, cols, values):
+            self._universe.set_cell(int(row), int(col), bool(value))
+            if 0 <= row < self._grid_size[0] and 0 <= col < self._grid_size[1]:
+                grid[row, col] = value
+        self._reset_ages(grid)
+
+    def step(self, n: int = 1):
+        self._universe.advance(n)
+        self._generation += n
+
+    def to_numpy(self) -> np.ndarray:
+        if self._ages_generation == self._generation and self._ages is not None:
+            return self._ages
+        return self._track_ages(self._universe.to_numpy(0, 0, *self._grid_size))
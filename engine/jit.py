@@ -0,0 +1,107 @@
+"""
+Engine running a JIT-compiled kernel that fuses the neighbors count, the rules and the age update in a single pass over
+the grid, writing into a preallocated buffer without temporary arrays.
+The kernel requires numba, which is an optional dependency: when it is not installed the engine falls back to the numpy
+implementation of engine.life.
+"""
+import numpy as np
+
+from engine import life
+from engine.base import Engine
+from engine.boundary import fill_halo
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Whether the compiled kernel is available
+AVAILABLE = numba is not None
+
+
+def _step_kernel(ages: np.ndarray, next_ages: np.ndarray, rule_table: np.ndarray) -> tuple:
+    """
+    Compute the next generation of a grid of cells age surrounded by a halo filled according to the boundary condition
+
+    :param ages: Cells age of the current generation, with a border of one cell (the halo, see engine.boundary)
+    :param next_ages: Output buffer for the next generation (same shape of ages). Its border is not written
+    :param rule_table: Lookup table of the rule, indexed by [current state, number of alive neighbors]
+    :return: The number of cells born and died, as a tuple (births, deaths)
+    """
+    rows, cols = ages.shape
+    births = 0
+    deaths = 0
+    for row in _range(1, rows - 1):
+        for col in range(1, cols - 1):
+            neighbors = 0
+            for d_row in range(-1, 2):
+                for d_col in range(-1, 2):
+                    if (d_row != 0 or d_col != 0) and ages[row + d_row, col + d_col] > 0:
+                        neighbors += 1
+
+            age = ages[row, col]
+            if rule_table[1 if age > 0 else 0, neighbors]:
+                next_ages[row, col] = age + 1 if age < 255 else 255
+                if age == 0:
+                    births += 1
+            else:
+                next_ages[row, col] = 0
+                if age > 0:
+                    deaths += 1
+    return births, deaths
+
+
+if AVAILABLE:
+    _range = numba.prange
+    _step_kernel = numba.njit(_step_kernel, parallel=True, nogil=True, cache=True)
+else:
+    _range = range
+
+
+class JitEngine(Engine):
+    """
+    Engine stepping a dense grid of cells age with the compiled kernel (see _step_kernel).
+    It double-buffers the grid, so the steps do not allocate any memory.
+    """
+
+    name = "jit"
+
+    def __init__(self, rule=None, boundary: str = None):
+        super().__init__(rule, boundary)
+        # Current and next generation buffers, with a border of cells around the grid (the halo, see engine.boundary)
+        self._age_buffers = [np.zeros((2, 2), dtype=np.uint8), np.zeros((2, 2), dtype=np.uint8)]
+        # Number of alive cells, and cells born and died during the last generation (see get_counts)
+        self._population = 0
+        self._counts = None
+
+    def get_counts(self):
+        return self._counts
+
+    def get_population(self) -> int:
+        return self._population
+
+    def load(self, grid: np.ndarray):
+        rows, cols = grid.shape
+        self._age_buffers = [np.zeros((rows + 2, cols + 2), dtype=np.uint8) for _ in range(2)]
+        self._age_buffers[0][1:-1, 1:-1] = grid
+        self._population = int(np.count_nonzero(grid))
+        self._counts = None
+
+    def step(self, n: int = 1):
+        for _ in range(n):
+            ages, next_ages = self._age_buffers
+            fill_halo(ages, self._boundary)
+            if AVAILABLE:
+                births, deaths = _step_kernel(ages, next_ages, self._rule.table)
+            else:
+                next_ages[1:-1, 1:-1] = life.next_generation(ages[1:-1, 1:-1], self._rule, self._boundary)
+                # The newborn cells are the only ones of age 1
+                births = int(np.count_nonzero(next_ages[1:-1, 1:-1] == 1))
+                deaths = self._population + births - int(np.count_nonzero(next_ages[1:-1, 1:-1]))
+            self._population += births - deaths
+            self._counts = (self._population, births, deaths)
+            self._age_buffers.reverse()
+        self._generation += n
+
+    def to_numpy(self) -> np.ndarray:
+        return self._age_buffers[0][1:-1, 1:-1]
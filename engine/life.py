@@ -0,0 +1,159 @@
+"""
+Qt-free implementation of the Game of Life rules.
+The functions of this module only depend on numpy and scipy, so they can be used from scripts and batch jobs running on
+headless machines where PyQt5 is not available.
+"""
+import numpy as np
+from scipy import ndimage
+
+from engine.base import Engine
+from engine.boundary import DEAD, KLEIN, REFLECT, TORUS, check_boundary
+from engine.rules import get_rule
+
+# Convolution kernel counting the eight neighbors of each cell
+_NEIGHBORS_KERNEL = np.ones((3, 3), dtype=np.uint8)
+_NEIGHBORS_KERNEL[1, 1] = 0
+
+# Boundary handling modes of the convolution for each boundary condition
+_CONVOLVE_MODES = {DEAD: "constant", TORUS: "wrap", REFLECT: "reflect", KLEIN: "wrap"}
+
+
+def count_neighbors(grid_alive: np.ndarray, boundary: str = DEAD) -> np.ndarray:
+    """
+    Count the alive neighbors of each cell
+
+    :param grid_alive: Numpy array (uint8) with 1 for the alive cells and 0 for the dead ones
+    :param boundary: The boundary condition of the grid (see engine.boundary)
+    :return: Numpy array (uint8) with the number of alive neighbors of each cell
+    """
+    # Use convolution to calculate the number of neighbors for each cell. The convolution handles the boundary
+    # internally, without padding the grid
+    grid_neighbors = ndimage.convolve(grid_alive, _NEIGHBORS_KERNEL, mode=_CONVOLVE_MODES[boundary], cval=0)
+
+    if boundary == KLEIN:
+        # The convolution wraps the top and bottom rows as in a torus: fix their counts with the contribution of the
+        # flipped opposite row instead of the straight one
+        def row_sums(row: np.ndarray) -> np.ndarray:
+            return row + np.roll(row, 1) + np.roll(row, -1)
+
+        first_row, last_row = grid_alive[0].astype(np.int16), grid_alive[-1].astype(np.int16)
+        top_fix = row_sums(last_row[::-1]) - row_sums(last_row)
+        bottom_fix = row_sums(first_row[::-1]) - row_sums(first_row)
+        grid_neighbors[0] = grid_neighbors[0] + top_fix
+        grid_neighbors[-1] = grid_neighbors[-1] + bottom_fix
+
+    return grid_neighbors
+
+
+def next_generation(grid_curr_age: np.ndarray, rule=None, boundary: str = DEAD) -> np.ndarray:
+    """
+    Performs an update step of the grid applying the Game of Life rules (or another Life-like rule).
+    Besides calculating dead and living cells at the next time step, it also calculates the age of each cell
+    (how many time steps they are alive). The age ranges from 0 (dead) to 255 (ancient)
+
+    :param grid_curr_age: Numpy array (uint8) with the age of each cell of the current generation
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grid (see engine.boundary)
+    :return: A new numpy array (uint8) with the age of each cell of the next generation
+    """
+    return _evolve(grid_curr_age, get_rule(rule), boundary)[0]
+
+
+def _evolve(grid_curr_age: np.ndarray, rule, boundary: str) -> tuple:
+    """
+    Helper function computing the next generation (see next_generation)
+    :return: The cells age of the next generation and the intermediate arrays of the current alive, newborn and survived
+    cells (bool or uint8)
+    """
+    grid_curr_alive = grid_curr_age.astype(bool).astype(np.uint8)
+
+    grid_neighbors = count_neighbors(grid_curr_alive, boundary)
+
+    # Calculate which cells to give birth: a dead cell is born when its number of neighbors is in the birth set of the
+    # rule (exactly three neighbors in the Game of Life). The rule lookup table is indexed by the neighbors count
+    grid_newborns = rule.table[0][grid_neighbors]
+    grid_newborns = np.logical_and(grid_newborns, np.logical_not(grid_curr_alive))
+
+    # Calculate which cells survive: a living cell survive when its number of neighbors is in the survival set of the
+    # rule (two or three neighbors in the Game of Life)
+    grid_survived = rule.table[1][grid_neighbors]
+    grid_survived = np.logical_and(grid_survived, grid_curr_alive)
+
+    # Calculate the living cells at the next step merging survived and newborn cells
+    grid_next = np.logical_or(grid_newborns, grid_survived).astype(np.uint8)
+
+    # Calculate the age of the cells in the new grid
+    # The increment is skipped for ancient cells to avoid the overflow handling by numpy and cap the values to 255.
+    # Multiplying by the next state afterwards guarantees that ancient cells can still die
+    grid_next = (grid_curr_age + (grid_curr_age < 255)) * grid_next
+
+    return grid_next, grid_curr_alive, grid_newborns, grid_survived
+
+
+def step(grid: np.ndarray, n: int = 1, rule=None, boundary: str = DEAD) -> np.ndarray:
+    """
+    Advance the grid by n generations
+
+    :param grid: Numpy array (uint8) with the age of each cell (0: dead cell)
+    :param n: Number of generations to compute
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grid (see engine.boundary)
+    :return: The numpy array with the cells age after n generations. The input grid is not modified
+    """
+    rule = get_rule(rule)
+    boundary = check_boundary(boundary)
+    for _ in range(n):
+        grid = next_generation(grid, rule, boundary)
+    return grid
+
+
+def run(grid: np.ndarray, generations: int, rule=None, boundary: str = DEAD):
+    """
+    Generator that evolves the grid for the given number of generations, yielding every intermediate state.
+    It is meant for scripts that need to inspect the whole evolution of a pattern (e.g. to collect statistics).
+
+    :param grid: Numpy array (uint8) with the age of each cell of the initial generation
+    :param generations: Number of generations to compute
+    :param rule: The rule to apply, as a Rule or in B/S notation (default: B3/S23)
+    :param boundary: The boundary condition of the grid (see engine.boundary)
+    :return: A generator of numpy arrays, one for each computed generation
+    """
+    rule = get_rule(rule)
+    boundary = check_boundary(boundary)
+    for _ in range(generations):
+        grid = next_generation(grid, rule, boundary)
+        yield grid
+
+
+class ConvolutionEngine(Engine):
+    """
+    Engine storing the grid of cells age as a dense numpy array and computing each generation with next_generation
+    """
+
+    name = "convolution"
+
+    def __init__(self, rule=None, boundary: str = None):
+        super().__init__(rule, boundary)
+        self._grid = None
+        # Counts of the last generation (see get_counts)
+        self._counts = None
+
+    def get_counts(self):
+        return self._counts
+
+    def load(self, grid: np.ndarray):
+        self._grid = grid.copy()
+        self._counts = None
+
+    def step(self, n: int = 1):
+        for _ in range(n):
+            self._grid, grid_curr_alive, grid_newborns, grid_survived = _evolve(self._grid, self._rule,
+                                                                                self._boundary)
+        if n > 0:
+            # Count the cells of the last generation on the intermediate arrays of the rules
+            births, survivals = np.count_nonzero(grid_newborns), np.count_nonzero(grid_survived)
+            self._counts = (births + survivals, births, np.count_nonzero(grid_curr_alive) - survivals)
+        self._generation += n
+
+    def to_numpy(self) -> np.ndarray:
+        return self._grid
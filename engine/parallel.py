@@ -0,0 +1,133 @@
+"""
+Multi-threaded dense engine.
+The grid is split into horizontal stripes that are stepped concurrently by a pool of threads. Numpy releases the GIL
+inside its array operations, so the stripes are really computed in parallel, while sharing the grid memory without
+any copy or pickling (which a process pool would require).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import config
+from engine.base import Engine
+from engine.boundary import fill_halo
+
+
+class _Stripe:
+    """
+    Horizontal stripe of the grid with its own preallocated work buffers, so that stepping it allocates no memory
+    """
+
+    def __init__(self, first_row: int, last_row: int, cols: int):
+        # Rows of the grid covered by the stripe (last_row excluded)
+        self.first_row = first_row
+        self.last_row = last_row
+        self.neighbors = np.zeros((last_row - first_row, cols), dtype=np.uint8)
+        self.table_index = np.zeros((last_row - first_row, cols), dtype=np.uint8)
+        self.mask_a = np.zeros((last_row - first_row, cols), dtype=bool)
+        self.mask_b = np.zeros((last_row - first_row, cols), dtype=bool)
+
+
+class ParallelEngine(Engine):
+    """
+    Engine stepping horizontal stripes of a dense grid in a thread pool.
+    Each stripe reads the row above and the row below it (its halo) from the current generation buffer and writes its
+    rows into the next generation buffer. The two buffers are swapped at the end of each generation.
+    """
+
+    name = "parallel"
+
+    def __init__(self, rule=None, boundary: str = None, workers: int = None):
+        super().__init__(rule, boundary)
+        self._workers = workers or config.PARALLEL_WORKERS or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._stripes = []
+        # Current and next generation buffers, with a border of cells around the grid (the halo, see engine.boundary),
+        # filled before each generation according to the boundary condition. The alive state (0 or 1)
+        # is stored alongside the age to count the neighbors with plain sums
+        self._alive = [np.zeros((2, 2), dtype=np.uint8), np.zeros((2, 2), dtype=np.uint8)]
+        self._age_buffers = [np.zeros((2, 2), dtype=np.uint8), np.zeros((2, 2), dtype=np.uint8)]
+        # Number of alive cells, and cells born and died during the last generation (see get_counts)
+        self._population = 0
+        self._counts = None
+
+    def close(self):
+        # The threads of the pool exit once idle
+        self._executor.shutdown(wait=False)
+
+    def get_counts(self):
+        return self._counts
+
+    def get_population(self) -> int:
+        return self._population
+
+    def get_workers(self) -> int:
+        return self._workers
+
+    def load(self, grid: np.ndarray):
+        rows, cols = grid.shape
+        self._alive = [np.zeros((rows + 2, cols + 2), dtype=np.uint8) for _ in range(2)]
+        self._age_buffers = [np.zeros((rows + 2, cols + 2), dtype=np.uint8) for _ in range(2)]
+        self._alive[0][1:-1, 1:-1] = grid.astype(bool)
+        self._age_buffers[0][1:-1, 1:-1] = grid
+        self._population = int(np.count_nonzero(grid))
+        self._counts = None
+
+        n_stripes = min(self._workers, rows) or 1
+        bounds = np.linspace(0, rows, n_stripes + 1).astype(int)
+        self._stripes = [_Stripe(bounds[i], bounds[i + 1], cols) for i in range(n_stripes)]
+
+    def step(self, n: int = 1):
+        for _ in range(n):
+            fill_halo(self._alive[0], self._boundary)
+            # Consume the results to propagate the exceptions raised in the threads
+            stripes_changes = list(self._executor.map(self._step_stripe, self._stripes))
+            births = sum(changes[0] for changes in stripes_changes)
+            deaths = sum(changes[1] for changes in stripes_changes)
+            self._population += births - deaths
+            self._counts = (self._population, births, deaths)
+            self._alive.reverse()
+            self._age_buffers.reverse()
+        self._generation += n
+
+    def _step_stripe(self, stripe: _Stripe) -> tuple:
+        """
+        Compute the next generation of the rows of a stripe
+
+        :return: The number of cells of the stripe born and died, as a tuple (births, deaths)
+        """
+        alive, next_alive = self._alive
+        ages, next_ages = self._age_buffers
+        cols = alive.shape[1] - 2
+        # Rows of the stripe in the padded buffers
+        first, last = stripe.first_row + 1, stripe.last_row + 1
+
+        neighbors = stripe.neighbors
+        neighbors[:] = 0
+        for d_row in (-1, 0, 1):
+            for d_col in (0, 1, 2):
+                if d_row != 0 or d_col != 1:
+                    neighbors += alive[first + d_row:last + d_row, d_col:d_col + cols]
+
+        # Apply the rule looking up its table with the index 9 * alive + neighbors (see Rule.flat_table)
+        curr_alive = alive[first:last, 1:-1]
+        np.multiply(curr_alive, 9, out=stripe.table_index)
+        np.add(stripe.table_index, neighbors, out=stripe.table_index)
+        np.take(self._rule.flat_table, stripe.table_index, out=stripe.mask_a, mode="clip")
+        next_alive[first:last, 1:-1] = stripe.mask_a
+        np.greater(stripe.mask_a, curr_alive, out=stripe.mask_b)
+        births = int(np.count_nonzero(stripe.mask_b))
+        np.less(stripe.mask_a, curr_alive, out=stripe.mask_b)
+        deaths = int(np.count_nonzero(stripe.mask_b))
+
+        # Increment the age of the living cells, capping it to 255
+        curr_ages = ages[first:last, 1:-1]
+        stripe_next_ages = next_ages[first:last, 1:-1]
+        np.less(curr_ages, 255, out=stripe.mask_b)
+        np.add(curr_ages, stripe.mask_b, out=stripe_next_ages, casting="unsafe")
+        np.multiply(stripe_next_ages, stripe.mask_a, out=stripe_next_ages, casting="unsafe")
+        return births, deaths
+
+    def to_numpy(self) -> np.ndarray:
+        return self._age_buffers[0][1:-1, 1:-1]
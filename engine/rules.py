@@ -0,0 +1,103 @@
+"""
+Life-like cellular automata rules in B/S notation (e.g. B3/S23 for the Game of Life, B36/S23 for HighLife).
+Each rule is compiled once into a lookup table indexed by the cell state and its number of alive neighbors, so that
+every rule is applied with the same operations (and at the same speed) as the Game of Life one.
+"""
+import re
+
+import numpy as np
+
+_RULE_PATTERN = re.compile(r"^B([0-8]*)/S([0-8]*)$")
+_LEGACY_RULE_PATTERN = re.compile(r"^([0-8]*)/([0-8]*)$")
+
+# Some well known rules, by name
+KNOWN_RULES = {
+    "Life": "B3/S23",
+    "HighLife": "B36/S23",
+    "Day & Night": "B3678/S34678",
+    "Seeds": "B2/S",
+    "Life without Death": "B3/S012345678",
+    "Maze": "B3/S12345",
+    "Replicator": "B1357/S1357",
+}
+
+
+class Rule:
+    """
+    Life-like rule: a dead cell is born if its number of alive neighbors is in the birth set, while a living cell
+    survives if its number of alive neighbors is in the survival set
+    """
+
+    def __init__(self, rulestring: str):
+        """
+        Object constructor
+
+        :param rulestring: The rule in B/S notation ("B3/S23"). The S/B notation ("23/3") is also accepted
+        """
+        text = rulestring.strip().upper().replace(" ", "")
+        match = _RULE_PATTERN.match(text)
+        if match is not None:
+            birth, survival = match.groups()
+        else:
+            match = _RULE_PATTERN.match("/".join(reversed(text.split("/"))))
+            legacy_match = _LEGACY_RULE_PATTERN.match(text)
+            if match is not None:
+                birth, survival = match.groups()
+            elif legacy_match is not None:
+                survival, birth = legacy_match.groups()
+            else:
+                raise ValueError(f"Invalid rule: {rulestring}")
+
+        self.birth = frozenset(int(n) for n in birth)
+        self.survival = frozenset(int(n) for n in survival)
+
+        # Lookup table of the next state, indexed by [current state, number of alive neighbors]
+        self.table = np.zeros((2, 9), dtype=bool)
+        self.table[0, sorted(self.birth)] = True
+        self.table[1, sorted(self.survival)] = True
+        # The same table flattened, indexed by 9 * current state + number of alive neighbors
+        self.flat_table = self.table.ravel().copy()
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and self.birth == other.birth and self.survival == other.survival
+
+    def __hash__(self):
+        return hash((self.birth, self.survival))
+
+    def __repr__(self):
+        return f"Rule('{self}')"
+
+    def __str__(self):
+        return "B" + "".join(str(n) for n in sorted(self.birth)) + "/S" + \
+               "".join(str(n) for n in sorted(self.survival))
+
+    def births_from_empty(self) -> bool:
+        """
+        :return: True if dead cells with no alive neighbors are born (B0 rules), i.e. the empty space is not stable
+        """
+        return 0 in self.birth
+
+    def next_state(self, alive: np.ndarray, neighbors: np.ndarray) -> np.ndarray:
+        """
+        Apply the rule to arrays of cells
+
+        :param alive: Numpy array with the current state of the cells (1/True for alive cells)
+        :param neighbors: Numpy array with the number of alive neighbors of each cell
+        :return: Boolean numpy array with the next state of the cells
+        """
+        return self.flat_table[9 * alive.astype(np.uint8) + neighbors]
+
+
+# Rule of Conway's Game of Life
+CONWAY = Rule("B3/S23")
+
+
+def get_rule(rule) -> Rule:
+    """
+    Get a rule from its B/S notation, accepting also Rule objects and None (Conway's Game of Life)
+    """
+    if rule is None:
+        return CONWAY
+    if isinstance(rule, Rule):
+        return rule
+    return Rule(rule)
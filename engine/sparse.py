@@ -0,0 +1,125 @@
+"""
+Sparse representation of an unbounded GOL universe, storing only the alive cells.
+Memory and stepping cost scale with the population instead of the area of the bounding box, which suits patterns that
+spread over a huge area but stay sparse (e.g. methuselahs emitting gliders).
+"""
+import numpy as np
+
+from engine.base import Engine
+from engine.rules import get_rule
+
+# Cells coordinates are encoded in a single 64-bit key: (row + _OFFSET) << 32 | (col + _OFFSET). The encoding is linear,
+# so the keys of the neighbors are obtained adding constant deltas. Coordinates must lie in [-2^30, 2^30)
+_OFFSET = 1 << 30
+_NEIGHBORS_DELTAS = np.array([(d_row << 32) + d_col for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                              if d_row != 0 or d_col != 0], dtype=np.int64)
+
+
+def encode(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Encode the cells coordinates into 64-bit keys
+    """
+    return ((np.asarray(rows, dtype=np.int64) + _OFFSET) << 32) | (np.asarray(cols, dtype=np.int64) + _OFFSET)
+
+
+def decode(keys: np.ndarray) -> tuple:
+    """
+    Decode 64-bit keys into the cells coordinates
+
+    :return: A tuple of two numpy arrays (rows, cols)
+    """
+    return (keys >> 32) - _OFFSET, (keys & 0xFFFFFFFF) - _OFFSET
+
+
+class SparseEngine(Engine):
+    """
+    Engine storing the alive cells of an unbounded universe as a sorted array of coordinate keys, with the age of each
+    of them in a parallel array. The exported grid is the window of the universe covered by the loaded grid.
+    The rule must not give birth to cells with no alive neighbors (B0 rules), otherwise the empty space is not stable.
+    """
+
+    name = "sparse"
+    unbounded = True
+
+    def __init__(self, rule=None, boundary: str = None):
+        super().__init__(rule, boundary)
+        self.set_rule(self._rule)
+        # Sorted keys of the alive cells and their ages
+        self._keys = np.empty(0, dtype=np.int64)
+        self._cells_age = np.empty(0, dtype=np.uint8)
+        self._grid_size = (0, 0)
+
+    def get_population(self) -> int:
+        return len(self._keys)
+
+    def get_cells(self) -> tuple:
+        """
+        :return: A tuple of three numpy arrays (rows, cols, ages) describing all the alive cells of the universe
+        """
+        rows, cols = decode(self._keys)
+        return rows, cols, self._cells_age
+
+    def set_rule(self, rule):
+        rule = get_rule(rule)
+        if rule.births_from_empty():
+            raise ValueError("The sparse engine does not support rules with births from empty space (B0)")
+        super().set_rule(rule)
+
+    def load(self, grid: np.ndarray):
+        rows, cols = np.nonzero(grid)
+        # np.nonzero returns the coordinates in row-major order, so the keys are already sorted
+        self._keys = encode(rows, cols)
+        self._cells_age = grid[rows, cols].astype(np.uint8)
+        self._grid_size = grid.shape
+
+    def set_cells(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        keys = encode(rows, cols)
+        values = np.asarray(values, dtype=np.uint8)
+
+        # Remove the edited cells and add back the alive ones
+        kept = np.isin(self._keys, keys, invert=True)
+        alive = values > 0
+        all_keys = np.concatenate((self._keys[kept], keys[alive]))
+        all_ages = np.concatenate((self._cells_age[kept], values[alive]))
+        all_keys, unique_indices = np.unique(all_keys, return_index=True)
+
+        self._keys = all_keys
+        self._cells_age = all_ages[unique_indices]
+
+    def step(self, n: int = 1):
+        for _ in range(n):
+            self._next_generation()
+        self._generation += n
+
+    def _next_generation(self):
+        keys = self._keys
+
+        # Count the alive neighbors of every cell that has at least one of them. The alive cells are added to the
+        # candidates too (and then removed from the counts), since they can survive without neighbors (S0 rules)
+        neighbors_keys = np.concatenate(((keys[:, np.newaxis] + _NEIGHBORS_DELTAS).ravel(), keys))
+        candidates, neighbors = np.unique(neighbors_keys, return_counts=True)
+
+        # Find which candidates are alive at the current generation
+        indices = np.searchsorted(keys, candidates)
+        indices[indices == len(keys)] = 0
+        alive = keys[indices] == candidates if len(keys) else np.zeros(len(candidates), dtype=bool)
+        neighbors -= alive
+
+        # Apply the rule (e.g. a dead cell with three neighbors is born, a living cell with two or three neighbors
+        # survives)
+        next_alive = self._rule.next_state(alive, neighbors)
+
+        # Update the age of the survived cells (capped to 255) and set the newborn ones to 1
+        next_keys = candidates[next_alive]
+        curr_ages = np.where(alive[next_alive], self._cells_age[indices[next_alive]], 0).astype(np.uint8)
+        self._keys = next_keys
+        self._cells_age = curr_ages + (curr_ages < 255)
+
+    def to_numpy(self) -> np.ndarray:
+        rows, cols, ages = self.get_cells()
+        grid_height, grid_width = self._grid_size
+        in_grid = (rows >= 0) & (rows < grid_height) & (cols >= 0) & (cols < grid_width)
+
+        grid = np.zeros(self._grid_size, dtype=np.uint8)
+        grid[rows[in_grid], cols[in_grid]] = ages[in_grid]
+        return grid
@@ -0,0 +1,148 @@
+"""
+Statistics of the cells collected at each generation: population, births, deaths, density, bounding box of the alive
+cells and histogram of the cells age.
+The population, births and deaths come from the engine when it counts them while stepping (see Engine.get_counts),
+otherwise they are derived from the age histogram (the cells born at the last generation have age 1). The age histogram
+and the bounding box are not kept by the engines: each collected generation costs one full pass over the exported grid.
+The pass goes by bands of rows, counting the ages of each band at once by reading the cells two at a time as 16-bit
+values (half the elements to count) and taking the bounding box from the same band.
+"""
+import threading
+
+import numpy as np
+
+# Lower bound of the age of each bin of the histogram: a bin counts the cells from its bound to the next one (excluded)
+AGE_BINS = (1, 2, 4, 8, 16, 32, 64, 128, 255)
+# Columns of the statistics of a generation. The unknown values (e.g. the bounding box of an empty grid) are -1
+FIELDS = ("generation", "population", "births", "deaths", "density", "min_row", "min_col", "max_row", "max_col") + \
+         tuple(f"age_{age}" for age in AGE_BINS)
+DTYPE = np.dtype([(field, np.float64 if field == "density" else np.int64) for field in FIELDS])
+
+# Rows of the grid read at once, which bound the temporary memory
+_BAND_ROWS = 256
+
+
+def _count_ages(band: np.ndarray) -> np.ndarray:
+    """
+    :param band: Numpy array (uint8) with the age of the cells of some rows
+    :return: The number of cells of each age (0-255)
+    """
+    # Each pair of adjacent cells is a 16-bit value: count the pairs, then split them into the ages of the two cells
+    even_cols = band.shape[1] - band.shape[1] % 2
+    pairs = np.bincount(band[:, :even_cols].view(np.uint16).ravel(), minlength=1 << 16).reshape(256, 256)
+    counts = pairs.sum(axis=0) + pairs.sum(axis=1)
+    if even_cols < band.shape[1]:
+        counts += np.bincount(band[:, -1], minlength=256)
+    return counts
+
+
+def compute_statistics(grid: np.ndarray, generation: int, counts: tuple = None, previous_population: int = None) -> tuple:
+    """
+    :param grid: Numpy array (uint8) with the age of each cell
+    :param generation: The generation of the grid
+    :param counts: The counts of the engine for this generation (see Engine.get_counts), if any
+    :param previous_population: The population of the previous generation, to derive the deaths when the engine does not
+    count them. None if unknown (e.g. generations were skipped)
+    :return: The statistics as a tuple of values in the order of FIELDS
+    """
+    age_counts = np.zeros(256, np.int64)
+    alive_rows = np.zeros(grid.shape[0], bool)
+    alive_cols = np.zeros(grid.shape[1], bool)
+    for start in range(0, grid.shape[0], _BAND_ROWS):
+        band = grid[start:start + _BAND_ROWS]
+        age_counts += _count_ages(band)
+        alive_rows[start:start + _BAND_ROWS] = band.any(axis=1)
+        alive_cols |= band.any(axis=0)
+    ages = np.add.reduceat(age_counts, AGE_BINS)
+
+    if counts is not None:
+        population, births, deaths = counts
+    else:
+        population = int(grid.size - age_counts[0])
+        births = int(ages[0])
+        deaths = previous_population + births - population if previous_population is not None else -1
+
+    rows, cols = np.flatnonzero(alive_rows), np.flatnonzero(alive_cols)
+    bounding_box = (rows[0], cols[0], rows[-1], cols[-1]) if len(rows) else (-1, -1, -1, -1)
+    return (generation, population, births, deaths, population / grid.size, *bounding_box, *ages)
+
+
+class StatisticsCollector:
+    """
+    Collector of the statistics of the generations of a simulation.
+    The last statistics are kept in a ring buffer of fixed capacity, and can also be streamed to a writer (e.g.
+    utils.telemetry.TelemetryWriter). They can be collected on a thread and read from another one.
+    """
+
+    def __init__(self, capacity: int, enabled: bool = False):
+        """
+        Object constructor
+
+        :param capacity: Number of generations kept in the ring buffer
+        :param enabled: Whether the statistics are collected (see update)
+        """
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._buffer = np.zeros(max(capacity, 1), DTYPE)
+        # Number of generations collected since the last reset
+        self._count = 0
+        # Generation and population of the last collected statistics
+        self._last = None
+        self._writer = None
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def set_enabled(self, enabled: bool):
+        self._enabled = enabled
+
+    def get_writer(self):
+        return self._writer
+
+    def set_writer(self, writer):
+        """
+        :param writer: Object receiving the statistics of each generation through its submit method, or None
+        """
+        self._writer = writer
+
+    def get_history(self) -> np.ndarray:
+        """
+        :return: A copy of the statistics in the ring buffer, from the oldest to the most recent generation (structured
+        numpy array with the fields of FIELDS)
+        """
+        with self._lock:
+            if self._count <= len(self._buffer):
+                return self._buffer[:self._count].copy()
+            index = self._count % len(self._buffer)
+            return np.concatenate((self._buffer[index:], self._buffer[:index]))
+
+    def reset(self, clear: bool = True):
+        """
+        Restart the collection after the grid has been changed other than by the engine
+
+        :param clear: Whether to clear the ring buffer (e.g. a new grid). Otherwise the history goes on, but the deaths of
+        the next generation are unknown (e.g. some cells have been edited)
+        """
+        with self._lock:
+            if clear:
+                self._count = 0
+            self._last = None
+
+    def update(self, engine):
+        """
+        Collect the statistics of the current generation of an engine, if enabled and not collected yet
+
+        :param engine: The engine (see engine.base)
+        """
+        generation = engine.get_generation()
+        if not self._enabled or (self._last is not None and self._last[0] == generation):
+            return
+        previous_population = self._last[1] if self._last is not None and self._last[0] == generation - 1 else None
+        statistics = compute_statistics(engine.to_numpy(), generation, engine.get_counts(), previous_population)
+
+        with self._lock:
+            self._buffer[self._count % len(self._buffer)] = statistics
+            self._count += 1
+            self._last = (generation, statistics[1])
+        if self._writer is not None:
+            self._writer.submit(statistics)
@@ -0,0 +1,211 @@
+"""
+Dense engine that only recomputes the regions of the grid that can change.
+The grid is split into square tiles: a tile can only change if it, or one of its eight neighbor tiles, changed in the
+previous generation. Empty areas and still lifes are therefore skipped, and the stepping cost scales with the number of
+active tiles instead of the grid area.
+"""
+import numpy as np
+
+from config import config
+from engine.base import Engine
+from engine.boundary import DEAD, fill_halo
+
+# Fraction of active tiles over which the whole grid is computed at once
+_FULL_STEP_RATIO = 0.5
+
+
+class TiledEngine(Engine):
+    """
+    Engine tracking which tiles of the grid changed at the last generation.
+    The cells age is not updated every generation (that would touch all the alive cells, even the static ones): the
+    engine stores the generation when each cell was born and computes the ages only when the grid is exported.
+    """
+
+    name = "tiled"
+
+    def __init__(self, rule=None, boundary: str = None, tile_size: int = None):
+        # Tiles that changed during the last generation (set before the base constructor, which sets the boundary)
+        self._changed_tiles = np.zeros((0, 0), dtype=bool)
+        super().__init__(rule, boundary)
+        self._tile_size = tile_size if tile_size is not None else config.TILE_SIZE
+        self._grid_size = (0, 0)
+        # Alive state of the cells, with a border of cells (the halo, see engine.boundary) around the grid. The grid is
+        # also padded with dead cells at the bottom and on the right to contain a whole number of tiles
+        self._alive = np.zeros((2, 2), dtype=np.uint8)
+        # Generation when each cell was born (same shape as _alive)
+        self._born = np.zeros((2, 2), dtype=np.int64)
+        # Number of tiles recomputed during the last generation
+        self._active_tiles = 0
+        # Number of alive cells, and cells born and died during the last generation (see get_counts)
+        self._population = 0
+        self._counts = None
+
+    def get_active_tiles(self) -> int:
+        """
+        :return: The number of tiles recomputed during the last generation
+        """
+        return self._active_tiles
+
+    def get_changed_tiles(self) -> np.ndarray:
+        """
+        :return: Boolean numpy array (one element per tile) of the tiles that changed during the last generation
+        """
+        return self._changed_tiles
+
+    def get_counts(self):
+        return self._counts
+
+    def get_population(self) -> int:
+        return self._population
+
+    def get_tile_size(self) -> int:
+        return self._tile_size
+
+    def get_total_tiles(self) -> int:
+        return self._changed_tiles.size
+
+    def load(self, grid: np.ndarray):
+        rows, cols = grid.shape
+        tile_rows = -(-rows // self._tile_size)
+        tile_cols = -(-cols // self._tile_size)
+        padded_shape = (tile_rows * self._tile_size + 2, tile_cols * self._tile_size + 2)
+
+        self._grid_size = grid.shape
+        self._alive = np.zeros(padded_shape, dtype=np.uint8)
+        self._alive[1:rows + 1, 1:cols + 1] = grid.astype(bool)
+        self._born = np.zeros(padded_shape, dtype=np.int64)
+        self._born[1:rows + 1, 1:cols + 1] = self._generation - grid.astype(np.int64) + 1
+        self._population = int(np.count_nonzero(grid))
+        self._counts = None
+
+        # Every tile must be computed at the first generation
+        self._changed_tiles = np.ones((tile_rows, tile_cols), dtype=bool)
+        self._active_tiles = 0
+
+    def set_boundary(self, boundary: str):
+        super().set_boundary(boundary)
+        # The tiles that were static under the previous boundary can change: recompute them all at the next generation
+        self._changed_tiles[:] = True
+
+    def set_rule(self, rule):
+        super().set_rule(rule)
+        # The tiles that were static under the previous rule can change: recompute them all at the next generation
+        self._changed_tiles[:] = True
+
+    def step(self, n: int = 1):
+        for _ in range(n):
+            self._next_generation()
+
+    def _tiles_to_update(self) -> tuple:
+        """
+        :return: The coordinates (tile rows, tile cols) of the changed tiles and of their neighbors
+        """
+        changed = np.pad(self._changed_tiles, 1)
+        to_update = np.zeros_like(self._changed_tiles)
+        for d_row in (0, 1, 2):
+            for d_col in (0, 1, 2):
+                to_update |= changed[d_row:d_row + to_update.shape[0], d_col:d_col + to_update.shape[1]]
+
+        # With a boundary other than the dead one, the cells on a border are neighbors of the cells on other borders
+        border = self._changed_tiles.copy()
+        border[1:-1, 1:-1] = False
+        if self._boundary != DEAD and border.any():
+            to_update[0, :] = to_update[-1, :] = to_update[:, 0] = to_update[:, -1] = True
+
+        return np.nonzero(to_update)
+
+    def _next_generation(self):
+        tile_size = self._tile_size
+        fill_halo(self._alive, self._boundary, *self._grid_size)
+        tile_rows, tile_cols = self._tiles_to_update()
+        self._active_tiles = len(tile_rows)
+        self._generation += 1
+        self._changed_tiles[:] = False
+        if not self._active_tiles:
+            self._counts = (self._population, 0, 0)
+            return
+
+        if self._active_tiles > _FULL_STEP_RATIO * self._changed_tiles.size or self._rule.births_from_empty():
+            # Most of the grid is active: a single step over the whole grid costs less than gathering the tiles.
+            # With B0 rules even the empty tiles change, so the whole grid is always computed
+            self._full_generation()
+            return
+
+        # Gather the active tiles (with a border of one cell) into a single array of shape (tiles, size + 2, size + 2)
+        offsets = np.arange(tile_size + 2)
+        rows_index = (tile_rows[:, np.newaxis] * tile_size + offsets)[:, :, np.newaxis]
+        cols_index = (tile_cols[:, np.newaxis] * tile_size + offsets)[:, np.newaxis, :]
+        tiles = self._alive[rows_index, cols_index]
+
+        # Count the neighbors of each cell of the tiles summing the eight shifted views
+        tiles_neighbors = np.zeros((len(tile_rows), tile_size, tile_size), dtype=np.uint8)
+        for d_row in (0, 1, 2):
+            for d_col in (0, 1, 2):
+                if d_row != 1 or d_col != 1:
+                    tiles_neighbors += tiles[:, d_row:d_row + tile_size, d_col:d_col + tile_size]
+
+        # Apply the rule (e.g. a dead cell with three neighbors is born, a living cell with two or three neighbors
+        # survives)
+        tiles_curr = tiles[:, 1:-1, 1:-1]
+        tiles_next = self._rule.next_state(tiles_curr, tiles_neighbors).astype(np.uint8)
+
+        # The cells outside of the grid (added to fill the last tiles, or part of the halo) must stay dead
+        inner_rows = rows_index[:, 1:-1]
+        inner_cols = cols_index[:, :, 1:-1]
+        tiles_valid = (inner_rows <= self._grid_size[0]) & (inner_cols <= self._grid_size[1])
+        tiles_next &= tiles_valid
+        tiles_curr = tiles_curr & tiles_valid
+
+        # Write back the tiles and the birth generation of the newborn cells
+        tiles_newborns = tiles_next > tiles_curr
+        self._born[inner_rows, inner_cols] = np.where(tiles_newborns, self._generation,
+                                                      self._born[inner_rows, inner_cols])
+        self._alive[inner_rows, inner_cols] = tiles_next
+
+        tiles_changed = tiles_next != tiles_curr
+        self._changed_tiles[tile_rows, tile_cols] = np.any(tiles_changed, axis=(1, 2))
+        births = int(np.count_nonzero(tiles_newborns))
+        self._update_counts(births, int(np.count_nonzero(tiles_changed)) - births)
+
+    def _full_generation(self):
+        """
+        Compute the next generation over the whole grid, updating the changed tiles afterwards
+        """
+        alive = self._alive
+        height, width = alive.shape[0] - 2, alive.shape[1] - 2
+
+        neighbors = np.zeros((height, width), dtype=np.uint8)
+        for d_row in (0, 1, 2):
+            for d_col in (0, 1, 2):
+                if d_row != 1 or d_col != 1:
+                    neighbors += alive[d_row:d_row + height, d_col:d_col + width]
+
+        curr = alive[1:-1, 1:-1]
+        grid_next = self._rule.next_state(curr, neighbors).astype(np.uint8)
+        grid_next[self._grid_size[0]:, :] = 0
+        grid_next[:, self._grid_size[1]:] = 0
+
+        grid_changed = grid_next != curr
+        grid_changed[self._grid_size[0]:, :] = False
+        grid_changed[:, self._grid_size[1]:] = False
+        grid_newborns = grid_next > curr
+        np.putmask(self._born[1:-1, 1:-1], grid_newborns, self._generation)
+        self._changed_tiles[:] = grid_changed.reshape(self._changed_tiles.shape[0], self._tile_size,
+                                                      self._changed_tiles.shape[1], self._tile_size).any(axis=(1, 3))
+        curr[:] = grid_next
+        # The cells outside of the grid are dead in grid_next, so they are never newborns
+        births = int(np.count_nonzero(grid_newborns))
+        self._update_counts(births, int(np.count_nonzero(grid_changed)) - births)
+
+    def _update_counts(self, births: int, deaths: int):
+        """
+        Helper method to store the counts of the generation just computed and update the population
+        """
+        self._population += births - deaths
+        self._counts = (self._population, births, deaths)
+
+    def to_numpy(self) -> np.ndarray:
+        rows, cols = self._grid_size
+        alive = self._alive[1:rows + 1, 1:cols + 1]
+        ages = np.minimum(self._generation - self._born[1:rows + 1, 1:cols + 1] + 1, 255)
+        return (ages * alive).astype(np.uint8)
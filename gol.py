@@ -0,0 +1,260 @@
+"""
+Command line entry point to run simulations without the GUI, e.g. in pipelines and cron jobs:
+
+    python -m gol run acorn --generations 1e4 --engine bitpacked --out final.snap
+    python -m gol run pattern.rle --generations 1e6 --engine hashlife
+    python -m gol run acorn --generations 5206 --stats acorn.csv
+    python -m gol patterns
+
+It does not import Qt, and the engines are imported on demand, so it starts quickly.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import config
+from engine import engines
+from engine.boundary import BOUNDARIES
+from engine.statistics import StatisticsCollector
+from utils import patterns, profiling, snapshot, telemetry
+from utils.profiling import profiler
+
+
+def _count(value: str) -> int:
+    """
+    Parse a number of generations, also in scientific notation (e.g. 1e6)
+    """
+    try:
+        count = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value}")
+    if count < 0 or count != int(count):
+        raise argparse.ArgumentTypeError(f"not a non-negative integer: {value}")
+    return int(count)
+
+
+def _grid_size(value: str) -> tuple:
+    """
+    Parse a grid size in the form ROWSxCOLS
+    """
+    try:
+        rows, cols = (int(size) for size in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid grid size: {value} (expected ROWSxCOLS)")
+    return rows, cols
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m gol", description="Run Game of Life simulations without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="evolve a pattern and print throughput and statistics")
+    run_parser.add_argument("pattern", help="a pattern file (.cells, .rle, .lif, .snap) or the name of a pattern in "
+                                            f"{config.FOLDER_PATTERNS}")
+    run_parser.add_argument("-g", "--generations", type=_count, default=1000, help="number of generations (default: "
+                                                                                   "%(default)s)")
+    run_parser.add_argument("-e", "--engine", choices=engines.get_available_engines(), default=None,
+                            help=f"engine evolving the grid (default: the snapshot one or {config.ENGINE})")
+    run_parser.add_argument("-r", "--rule", default=None, help="rule in B/S notation (default: the pattern one or "
+                                                               f"{config.RULE})")
+    run_parser.add_argument("-b", "--boundary", choices=BOUNDARIES, default=None,
+                            help=f"boundary condition (default: the snapshot one or {config.BOUNDARY})")
+    run_parser.add_argument("-s", "--grid-size", type=_grid_size, default=None,
+                            help="size of the grid as ROWSxCOLS, with the pattern at the center (default: the snapshot "
+                                 "size, or the configured grid size enlarged to fit the pattern)")
+    run_parser.add_argument("--report", type=_count, default=0,
+                            help="print the statistics every REPORT generations (default: only at the end)")
+    run_parser.add_argument("-o", "--out", default=None,
+                            help="file where to save the final grid: a snapshot (.snap) or a pattern (.cells, .rle, "
+                                 ".lif)")
+    run_parser.add_argument("--profile", metavar="FILE", default=None,
+                            help="save the timings of the run as JSON (- for the standard output)")
+    run_parser.add_argument("--stats", metavar="FILE", default=None,
+                            help="save the statistics of every generation (population, births, deaths, ...) to a "
+                                 f"{' or '.join(telemetry.get_available_formats())} file. The engine is then stepped "
+                                 "one generation at a time")
+
+    commands.add_parser("patterns", help=f"list the patterns in {config.FOLDER_PATTERNS}")
+    return parser.parse_args(argv)
+
+
+def _read_input(pattern: str) -> tuple:
+    """
+    Read the initial grid from a pattern or snapshot file, or from a pattern name
+
+    :param pattern: Path of a file or name of one of the available patterns
+    :return: A tuple (grid, rule, boundary, generation, engine) with the values stored in the file (None if missing)
+    """
+    file_path = pattern if os.path.isfile(pattern) else patterns.get_pattern_file(pattern)
+    if file_path is None:
+        raise ValueError(f"Pattern not found: {pattern}")
+
+    if snapshot.is_snapshot_file(file_path):
+        grid_snapshot = snapshot.load_snapshot(file_path)
+        return (grid_snapshot.to_numpy(), grid_snapshot.get_rule(), grid_snapshot.get_boundary(),
+                grid_snapshot.get_generation(), grid_snapshot.get_engine())
+
+    grid_pattern, rule = patterns.read_pattern(file_path)
+    return grid_pattern, rule, None, None, None
+
+
+def _center(grid_pattern: np.ndarray, grid_size: tuple) -> np.ndarray:
+    """
+    :return: A grid of the given size with the pattern at its center
+    """
+    grid = np.zeros(grid_size, dtype=np.uint8)
+    pattern_height, pattern_width = grid_pattern.shape
+    if pattern_height > grid_size[0] or pattern_width > grid_size[1]:
+        raise ValueError(f"The pattern ({pattern_height}x{pattern_width}) is bigger than the grid "
+                         f"({grid_size[0]}x{grid_size[1]})")
+    v_margin = (grid_size[0] - pattern_height) // 2
+    h_margin = (grid_size[1] - pattern_width) // 2
+    grid[v_margin:v_margin + pattern_height, h_margin:h_margin + pattern_width] = grid_pattern
+    return grid
+
+
+def _print_stats(gol_engine: engines.Engine, generations: int, elapsed: float, cells: int):
+    """
+    Print the progress of a run. The population of an unbounded engine counts the whole universe, while the grid is only
+    a window on it: the density is then the one of the window, and no cells/s rate is given
+    """
+    population = gol_engine.get_population()
+    gens_per_second = generations / elapsed if elapsed > 0 else float("inf")
+    if gol_engine.unbounded:
+        density = np.count_nonzero(gol_engine.to_numpy()) / cells
+        rate = f"{gens_per_second:.4g} gens/s"
+    else:
+        density = population / cells
+        rate = f"{gens_per_second:.4g} gens/s, {gens_per_second * cells:.4g} cells/s"
+    print(f"generation {gol_engine.get_generation()}: population {population}, density {density:.4f}, {rate}",
+          flush=True)
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Evolve a pattern as requested by the command line arguments
+
+    :return: The exit code
+    """
+    start_time = time.perf_counter()
+    try:
+        grid_pattern, rule, boundary, generation, engine_name = _read_input(args.pattern)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    rule = args.rule or rule or config.RULE
+    boundary = args.boundary or boundary or config.BOUNDARY
+    engine_name = args.engine or (engine_name if engine_name in engines.ENGINES else None) or config.ENGINE
+    if generation is not None:
+        # Snapshots keep their size
+        grid_size = args.grid_size or grid_pattern.shape
+    else:
+        grid_size = args.grid_size or tuple(max(size, pattern_size) for size, pattern_size
+                                            in zip(config.GRID_SIZE, grid_pattern.shape))
+
+    try:
+        gol_engine = engines.create_engine(engine_name, rule, boundary)
+        gol_engine.set_generation(generation or 0)
+        gol_engine.load(_center(grid_pattern, grid_size))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    cells = grid_size[0] * grid_size[1]
+    print(f"{args.pattern}: {grid_size[0]}x{grid_size[1]} grid, rule {gol_engine.get_rule()}, boundary "
+          f"{gol_engine.get_boundary()}, engine {engine_name} (ready in {time.perf_counter() - start_time:.2f} s)",
+          flush=True)
+
+    profiler.set_enabled(args.profile is not None)
+
+    statistics = None
+    if args.stats:
+        try:
+            writer = telemetry.TelemetryWriter(args.stats)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        writer.start()
+        statistics = StatisticsCollector(1, enabled=True)
+        statistics.set_writer(writer)
+        statistics.update(gol_engine)
+
+    # Step in chunks of report generations, or all at once (which lets the hashlife engine take the largest jumps)
+    chunk = args.report or args.generations
+    remaining = args.generations
+    run_start = time.perf_counter()
+    while remaining > 0:
+        chunk_start = time.perf_counter()
+        steps = min(chunk, remaining)
+        with profiler.section(profiling.STEP):
+            if statistics is None:
+                gol_engine.step(steps)
+            else:
+                # Collect the statistics of every generation
+                for _ in range(steps):
+                    gol_engine.step()
+                    statistics.update(gol_engine)
+        remaining -= steps
+        if args.report and remaining > 0:
+            _print_stats(gol_engine, steps, time.perf_counter() - chunk_start, cells)
+    elapsed = time.perf_counter() - run_start
+
+    _print_stats(gol_engine, args.generations, elapsed, cells)
+    print(f"{args.generations} generations in {elapsed:.3f} s")
+
+    if statistics is not None:
+        writer = statistics.get_writer()
+        writer.stop()
+        if writer.get_error() is not None:
+            print(f"error: cannot save the statistics: {writer.get_error()}", file=sys.stderr)
+            return 1
+        print(f"statistics of {writer.get_rows()} generations saved to {args.stats}")
+
+    if args.out:
+        with profiler.section(profiling.EXPORT):
+            final_grid = gol_engine.to_numpy()
+        if os.path.splitext(args.out)[1].lower() == snapshot.SNAPSHOT_EXTENSION:
+            snapshot.save_snapshot(args.out, final_grid, str(gol_engine.get_rule()), gol_engine.get_generation(),
+                                   gol_engine.get_boundary(), engine_name)
+        else:
+            patterns.save_pattern(args.out, final_grid, str(gol_engine.get_rule()))
+        print(f"final grid saved to {args.out}")
+
+    if args.profile is not None:
+        _dump_profile(args.profile, {"engine": engine_name, "grid_size": list(grid_size), "generations": args.generations,
+                                     "elapsed": elapsed, "generation": gol_engine.get_generation(),
+                                     "population": int(gol_engine.get_population())})
+    return 0
+
+
+def _dump_profile(file_path: str, run_info: dict):
+    """
+    Save the statistics of the profiler with the information of the run as JSON
+
+    :param file_path: The output file (- for the standard output)
+    :param run_info: Information of the run (engine, generations, ...)
+    """
+    profile = dict(run_info, profile=profiler.get_stats())
+    if file_path == "-":
+        print(json.dumps(profile, indent=2))
+    else:
+        with open(file_path, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(f"profile saved to {file_path}")
+
+
+def main(argv: list = None) -> int:
+    args = _parse_args(argv)
+    if args.command == "patterns":
+        print("\n".join(patterns.get_available_patterns()))
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
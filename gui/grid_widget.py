@@ -1,144 +1,308 @@
-import math
+import time
 
+import numpy as np
 from PyQt5 import QtGui
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtWidgets import QLabel, QSizePolicy, QWidget
+from PyQt5.QtCore import QRect, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap
+from PyQt5.QtWidgets import QSizePolicy, QWidget
 
-from utils.utils import numpy_to_qimage
+from config import config
+from utils import profiling
+from utils.profiling import profiler
+from utils.utils import GridImage
+from utils.viewport import ANY, Viewport, line_cells
+from model import damage
 from model.gol_model import GOLModel
 
+# Zoom multiplier of a step of the mouse wheel
+_WHEEL_ZOOM = 1.25
 
-class GridWidget(QLabel):
+
+class GridWidget(QWidget):
     """
-    Custom widget to display and edit the current GOL grid state
+    Custom widget to display and edit the current GOL grid state.
+    The grid can be zoomed with the mouse wheel and panned by dragging it with the right (or middle) button. A double
+    click with the right button shows the whole grid again.
+    The cells are edited by strokes: the left button is pressed on a cell and dragged over the grid. The cells crossed by
+    the mouse, including the ones between two mouse events, are notified in batches, at most once per display frame.
     """
 
-    # Signal to notify the mouse click on a cell of the grid
-    cell_clicked = pyqtSignal(tuple)
+    # Signal to notify the cell (row, column) where a stroke starts
+    stroke_started = pyqtSignal(tuple)
+    # Signal to notify the cells crossed by a stroke since the last notification, as numpy arrays (rows, columns)
+    stroke_drawn = pyqtSignal(tuple)
 
     def __init__(self, gol_model: GOLModel):
         super().__init__()
 
-        self.setAlignment(Qt.AlignCenter)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumSize(1, 1)  # To allow the QLabel to shrink also with a pixmap attached
+        self.setMinimumSize(1, 1)
+
+        # Zoom and pan of the view. Only the visible cells are rendered, at the resolution of the widget
+        self._viewport = Viewport()
+        # Image of the visible cells, updated in place at each frame, the pixmap drawn on the widget (reused while its
+        # size does not change) and its position inside the widget
+        self._image = GridImage()
+        self._pixmap = QPixmap()
+        self.x_pixmap = 0
+        self.y_pixmap = 0
+
+        # The grid is repainted at most once per display frame: the changes notified in between are coalesced, so only
+        # the latest state is rendered
+        self._frame_time = 1 / config.DISPLAY_FPS
+        self._last_render_time = 0
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setTimerType(Qt.PreciseTimer)
+        self._render_timer.timeout.connect(self.render_grid)
+        # Cells changed since the last rendering (see model.damage): only their pixels are rendered and repainted. None
+        # if the whole grid must be rendered (e.g. the view changed)
+        self._damage = None
 
         # Connect to the model and show the initial grid
         self._gol_model = gol_model
-        gol_model.observe(self.update_grid)
-        self.update_grid()
+        gol_model.observe(self._update_damage, gol_model.grid_changed)
+        self.render_grid()
 
-        # Coordinates of the QPixmap (the grid) upper-left corner inside the QLabel. They are required to handle mouse events on the cells
-        self.x_pixmap = 0
-        self.y_pixmap = 0
-        # Keep track of the last tile drawn to handle continuous drawing through mouse dragging
-        self._last_tile_drawn_row = -1
-        self._last_tile_drawn_col = -1
-        # Flag that indicates whether we are drawing on the grid (the mouse is pressed)
+        # Flag that indicates whether we are drawing on the grid (the mouse is pressed), the last cell (row, column) of
+        # the stroke (None when the mouse left the grid) and the cells crossed by the stroke not notified yet
         self._drawing = False
+        self._stroke_cell = None
+        self._stroke_rows = []
+        self._stroke_cols = []
+        self._stroke_timer = QTimer(self)
+        self._stroke_timer.setSingleShot(True)
+        self._stroke_timer.timeout.connect(self._flush_stroke)
+        # Last mouse position while the grid is dragged, or None
+        self._pan_position = None
 
         # To enable the mouseMoveEvent tracking
         QWidget.setMouseTracking(self, True)
 
-    def connect_to_cell_clicked(self, slot):
-        self.cell_clicked.connect(slot)
+    def connect_to_stroke_started(self, slot):
+        self.stroke_started.connect(slot)
+
+    def connect_to_stroke_drawn(self, slot):
+        self.stroke_drawn.connect(slot)
+
+    def mouseDoubleClickEvent(self, ev: QtGui.QMouseEvent) -> None:
+        """
+        Slot for the mouse double click event on the widget. A double click with the right button shows the whole grid.
+        :param ev: The mouse event
+        """
+        if ev.button() == Qt.RightButton:
+            self._viewport.fit()
+            self.update_grid()
+        else:
+            self.mousePressEvent(ev)
 
     def mouseMoveEvent(self, ev: QtGui.QMouseEvent) -> None:
         """
         Slot for the mouse move event on the widget.
-        When the application is in a drawing session (the mouse is clicked and dragged), toggle the state of all the
-        cells where the mouse pass over.
+        When the application is in a drawing session (the mouse is clicked and dragged), add to the stroke the cells on
+        the line from the last position of the mouse. When the grid is dragged, move it.
         :param ev: The mouse event
         """
-        x_pos = ev.pos().x()
-        y_pos = ev.pos().y()
+        if self._pan_position is not None:
+            self._viewport.pan(ev.pos().x() - self._pan_position.x(), ev.pos().y() - self._pan_position.y())
+            self._pan_position = ev.pos()
+            self.update_grid()
+            return
 
         # Check if the mouse position is inside the effective level grid image
-        x_grid = x_pos - self.x_pixmap
-        y_grid = y_pos - self.y_pixmap
-        if 0 <= x_grid < self.pixmap().width() and 0 <= y_grid < self.pixmap().height() and \
-                not self._gol_model.get_running():
+        cell = self._viewport.cell_at(ev.pos().x(), ev.pos().y())
+        if cell is not None and not self._gol_model.get_running():
             self.setCursor(Qt.CrossCursor)
-
-            # Check if we are drawing (the mouse is pressed and dragged)
-            if self._drawing:
-                # Converts the widget coordinates into grid coordinates
-                grid_size = self._gol_model.get_grid_size()
-                row = math.floor(y_grid * grid_size[0] / self.pixmap().height())
-                col = math.floor(x_grid * grid_size[1] / self.pixmap().width())
-
-                # Check if the event was already handled for this tile (the mouse is moved over the same tile)
-                if row != self._last_tile_drawn_row or col != self._last_tile_drawn_col:
-                    self.cell_clicked.emit((row, col))
-                    self._last_tile_drawn_row = row
-                    self._last_tile_drawn_col = col
         else:
             self.unsetCursor()
 
+        # Check if we are drawing (the mouse is pressed and dragged) and the mouse moved to another cell. The stroke is
+        # interrupted while the mouse is outside the grid
+        if self._drawing and cell != self._stroke_cell:
+            if cell is not None:
+                self._add_to_stroke(cell)
+            self._stroke_cell = cell
+
     def mousePressEvent(self, ev: QtGui.QMouseEvent) -> None:
         """
         Slot for the mouse press event on the widget. It allows the user to edit the grid cells when the simulation is
         not running.
-        Emits the cell_clicked signal sending to the connected slots the coordinates (row, column) of the clicked grid cell
-        and starts a drawing session (continuous drawing through mouse dragging).
+        Emits the stroke_started signal sending to the connected slots the coordinates (row, column) of the clicked grid
+        cell and starts a drawing session (continuous drawing through mouse dragging).
+        The right and middle buttons start dragging the grid instead.
         :param ev: The mouse event
         """
+        if ev.button() in (Qt.RightButton, Qt.MiddleButton):
+            self._pan_position = ev.pos()
+            self.setCursor(Qt.ClosedHandCursor)
+            return
 
         # Ignore the mouse click if the simulation is running (the grid is not editable)
-        if not self._gol_model.get_running():
-            x_click = ev.pos().x()
-            y_click = ev.pos().y()
-
+        if ev.button() == Qt.LeftButton and not self._gol_model.get_running():
             # Converts the widget coordinates into grid coordinates
-            x_grid = x_click - self.x_pixmap
-            y_grid = y_click - self.y_pixmap
-            if 0 <= x_grid < self.pixmap().width() and 0 <= y_grid < self.pixmap().height():
-                # Converts the widget coordinates into grid coordinates
-                grid_size = self._gol_model.get_grid_size()
-                row = math.floor(y_grid * grid_size[0] / self.pixmap().height())
-                col = math.floor(x_grid * grid_size[1] / self.pixmap().width())
-
-                self.cell_clicked.emit((row, col))
-                self._last_tile_drawn_row = row
-                self._last_tile_drawn_col = col
+            cell = self._viewport.cell_at(ev.pos().x(), ev.pos().y())
+            if cell is not None:
+                self.stroke_started.emit(cell)
 
                 # Start continuous drawing
                 self._drawing = True
+                self._stroke_cell = cell
 
     def mouseReleaseEvent(self, ev: QtGui.QMouseEvent) -> None:
         """
         Slot for the mouse release event on the widget.
-        Ends the drawing session.
+        Ends the drawing session or the dragging of the grid.
         :param ev: The mouse event
         """
+        if self._pan_position is not None:
+            self._pan_position = None
+            self.unsetCursor()
 
+        self._flush_stroke()
         self._drawing = False
-        self._last_tile_drawn_row = -1
-        self._last_tile_drawn_col = -1
+        self._stroke_cell = None
+
+    def _add_to_stroke(self, cell: tuple):
+        """
+        Helper method to add to the stroke the cells on the line from its last cell (only the given cell if the stroke
+        was interrupted). The cells are notified at the next display frame
+        :param cell: The coordinates (row, column) of the cell under the mouse
+        """
+        if self._stroke_cell is None:
+            rows, cols = np.array([cell[0]]), np.array([cell[1]])
+        else:
+            rows, cols = line_cells(self._stroke_cell, cell)
+        self._stroke_rows.append(rows)
+        self._stroke_cols.append(cols)
+        if not self._stroke_timer.isActive():
+            self._stroke_timer.start(round(self._frame_time * 1000))
+
+    def _flush_stroke(self):
+        """
+        Notify the cells crossed by the stroke since the last notification, if any
+        """
+        self._stroke_timer.stop()
+        if self._stroke_rows:
+            cells = (np.concatenate(self._stroke_rows), np.concatenate(self._stroke_cols))
+            self._stroke_rows, self._stroke_cols = [], []
+            self.stroke_drawn.emit(cells)
+
+    def wheelEvent(self, ev: QtGui.QWheelEvent) -> None:
+        """
+        Slot for the mouse wheel event on the widget. It zooms the grid around the mouse position.
+        :param ev: The wheel event
+        """
+        steps = ev.angleDelta().y() / 120
+        if steps:
+            self._viewport.zoom_at(_WHEEL_ZOOM ** steps, ev.pos().x(), ev.pos().y())
+            self.update_grid()
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+        """
+        Slot for the paint event of the widget. It draws the part of the image of the visible cells inside the region to
+        repaint
+        :param a0: The paint event
+        """
+        target = a0.rect() & QRect(self.x_pixmap, self.y_pixmap, self._pixmap.width(), self._pixmap.height())
+        if target.isEmpty():
+            return
+        painter = QPainter(self)
+        painter.drawPixmap(target, self._pixmap, target.translated(-self.x_pixmap, -self.y_pixmap))
+        painter.end()
 
     def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
         """
-        Slot for the resize event of the widget. It updates the QPixmap coordinates to handle mouse events on the grid
-        and repaints the grid to fit the new dimensions
+        Slot for the resize event of the widget. It repaints the grid to fit the new dimensions
         :param a0:
         :return:
         """
-        self.x_pixmap = (self.width() - self.pixmap().width())//2
-        self.y_pixmap = (self.height() - self.pixmap().height())//2
         self.update_grid()
 
-    def update_grid(self):
+    def _update_damage(self):
+        """
+        Slot for the changes of the grid: schedule the repaint of the changed cells only
+        """
+        self.update_grid(self._gol_model.get_damage())
+
+    def update_grid(self, damage_region: list = None):
+        """
+        Schedule the repaint of the widget to display the current state of the GOL grid. The grid is rendered at the
+        next display frame, so the states notified before it are never rendered
+        :param damage_region: The cells to repaint (see model.damage). Default: the whole grid
+        """
+        if damage_region is None or self._damage is None:
+            self._damage = None
+        else:
+            self._damage = damage.merge(self._damage + damage_region)
+            if not self._damage:
+                # Nothing to repaint
+                return
+
+        if self._render_timer.isActive():
+            profiler.count(profiling.COALESCED)
+            return
+        delay = self._last_render_time + self._frame_time - time.perf_counter()
+        self._render_timer.start(max(round(delay * 1000), 0))
+
+    def render_grid(self):
         """
         Update the widget to display the current state of the GOL grid
         """
+        self._render_timer.stop()
+        self._last_render_time = time.perf_counter()
+        damage_region, self._damage = self._damage, []
+
+        grid = self._gol_model.get_grid_as_numpy()
+        show_age = self._gol_model.get_show_cell_age()
+        self._viewport.set_sizes(grid.shape, (self.width(), self.height()))
+        x_pixmap, y_pixmap, width, height = self._viewport.get_grid_rect()
+        if damage_region is not None and (x_pixmap, y_pixmap) == (self.x_pixmap, self.y_pixmap) and \
+                self._pixmap.size() == self._image.get_image().size() and (width, height) == \
+                (self._pixmap.width(), self._pixmap.height()):
+            self._render_damage(grid, show_age, damage_region)
+            return
 
-        # Transform the numpy array of the grid state into an image (QPixmap) to be displayed on the widget
-        qimage = numpy_to_qimage(self._gol_model.get_grid_as_numpy(), self._gol_model.get_show_cell_age())
-        qpixmap = QPixmap.fromImage(qimage)
-        # Scale the created QPixmap to fit the widget
-        self.setPixmap(qpixmap.scaled(self.width(), self.height(), Qt.KeepAspectRatio))
+        # Render the visible cells at the widget resolution, directly into the image. The density reduction is not
+        # meaningful for the cells age
+        with profiler.section(profiling.SCALE):
+            self._viewport.render(grid, ANY if show_age else None, out=self._image.get_buffer(width, height))
+        self._image.set_mode(show_age, self._viewport.is_reduced() and not show_age and
+                             self._viewport.get_reduction() != ANY)
+
+        # Upload the image into the pixmap to be displayed on the widget
+        with profiler.section(profiling.QIMAGE):
+            if self._image.get_image().isNull():
+                self._pixmap = QPixmap()
+            elif self._pixmap.size() != self._image.get_image().size():
+                self._pixmap = QPixmap.fromImage(self._image.get_image())
+            else:
+                self._pixmap.convertFromImage(self._image.get_image())
 
         # Update the QPixmap coordinates
-        self.x_pixmap = (self.width() - self.pixmap().width())//2
-        self.y_pixmap = (self.height() - self.pixmap().height())//2
+        self.x_pixmap, self.y_pixmap = x_pixmap, y_pixmap
+        self.update()
+
+    def _render_damage(self, grid, show_age: bool, damage_region: list):
+        """
+        Helper method to render and repaint only the pixels showing the changed cells, on an unchanged view
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param show_age: Whether the cells age is displayed
+        :param damage_region: The changed cells (see model.damage)
+        """
+        rects = [rect for rect in (self._viewport.get_cells_rect(*cells) for cells in damage_region) if rect is not None]
+        if not rects:
+            return
+        with profiler.section(profiling.SCALE):
+            buffer = self._image.get_buffer(self._pixmap.width(), self._pixmap.height())
+            for rect in rects:
+                self._viewport.render(grid, ANY if show_age else None, out=buffer, rect=rect)
+
+        # Upload the changed pixels only into the pixmap and repaint them
+        with profiler.section(profiling.QIMAGE):
+            painter = QPainter(self._pixmap)
+            for x, y, width, height in rects:
+                source = QRect(x - self.x_pixmap, y - self.y_pixmap, width, height)
+                painter.drawImage(source, self._image.get_image(), source)
+            painter.end()
+        for x, y, width, height in rects:
+            self.update(x, y, width, height)
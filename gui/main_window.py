@@ -1,7 +1,13 @@
-from PyQt5.QtWidgets import QMainWindow, QMessageBox
-
-from utils import patterns
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFontDatabase, QKeySequence
+from PyQt5.QtWidgets import QDockWidget, QLabel, QMainWindow, QMessageBox, QPushButton, QShortcut, QVBoxLayout, QWidget
+
+from config import config
+from engine import boundary, engines, rules
+from utils import patterns, profiling
+from utils.profiling import profiler
 from gui.grid_widget import GridWidget
+from gui.statistics_plot import StatisticsPlot
 from gui.ui_main_window import Ui_MainWindow
 from model.gol_model import GOLModel
 
@@ -27,9 +33,65 @@ class MainWindow(QMainWindow):
         self.ui.combo_patterns.insertItem(0, "Custom")
         self.ui.combo_patterns.insertItems(1, patterns.get_available_patterns())
 
-        # Register the UI as observer of the GOLSettingsModel to update the controls with its values
+        # Load the available engines into the QComboBox
+        self.ui.combo_engine.insertItems(0, engines.get_available_engines())
+        self.ui.combo_engine.setCurrentText(gol_model.get_engine())
+
+        # Load the well known rules into the editable QComboBox (any rule in B/S notation can be typed)
+        for index, (rule_name, rule) in enumerate(rules.KNOWN_RULES.items()):
+            self.ui.combo_rule.insertItem(index, rule)
+            self.ui.combo_rule.setItemData(index, rule_name, Qt.ToolTipRole)
+        self.ui.combo_rule.setCurrentText(gol_model.get_rule())
+
+        # Load the available boundary conditions into the QComboBox
+        self.ui.combo_boundary.insertItems(0, boundary.BOUNDARIES)
+        self.ui.combo_boundary.setCurrentText(gol_model.get_boundary())
+
+        # Last cycle of the grid shown on the status bar
+        self._shown_cycle = None
+
+        # Panel with the live statistics of the profiler (toggled with F3). The profiler runs while the panel is shown
+        self._label_stats = QLabel()
+        self._label_stats.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self._label_stats.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        self._dock_stats = QDockWidget("Profiler", self)
+        self._dock_stats.setObjectName("dock_stats")
+        self._dock_stats.setWidget(self._label_stats)
+        self.addDockWidget(Qt.RightDockWidgetArea, self._dock_stats)
+        self._timer_stats = QTimer(self)
+        self._timer_stats.setInterval(500)
+        self._timer_stats.timeout.connect(self.update_stats)
+        self._dock_stats.visibilityChanged.connect(self._toggle_stats)
+        self._dock_stats.setVisible(config.PROFILING)
+        QShortcut(QKeySequence(Qt.Key_F3), self).activated.connect(
+            lambda: self._dock_stats.setVisible(not self._dock_stats.isVisible()))
+
+        # Panel with the live plot of the statistics of the generations (toggled with F4) and the button to record them
+        # to a file. The statistics are collected while the panel is shown or they are recorded
+        self.plot_statistics = StatisticsPlot()
+        self._button_record = QPushButton("Record...")
+        self._button_record.setToolTip("Record the statistics of every generation to a CSV or Parquet file")
+        widget_statistics = QWidget()
+        layout_statistics = QVBoxLayout(widget_statistics)
+        layout_statistics.addWidget(self.plot_statistics)
+        layout_statistics.addWidget(self._button_record)
+        self._dock_statistics = QDockWidget("Statistics", self)
+        self._dock_statistics.setObjectName("dock_statistics")
+        self._dock_statistics.setWidget(widget_statistics)
+        self.addDockWidget(Qt.RightDockWidgetArea, self._dock_statistics)
+        self._timer_statistics = QTimer(self)
+        self._timer_statistics.setInterval(250)
+        self._timer_statistics.timeout.connect(self.update_statistics)
+        self._dock_statistics.visibilityChanged.connect(self._toggle_statistics)
+        self._dock_statistics.setVisible(False)
+        QShortcut(QKeySequence(Qt.Key_F4), self).activated.connect(
+            lambda: self._dock_statistics.setVisible(not self._dock_statistics.isVisible()))
+
+        # Register the UI as observer of the GOLSettingsModel to update the controls with its values (the grid changes
+        # are left to the grid widget)
         self._gol_model = gol_model
         self._gol_model.observe(self.update_controls)
+        self._gol_model.observe(self.update_controls, gol_model.running_changed)
         self.update_controls()
 
     # Methods to connect slots to the GUI controls signals
@@ -42,15 +104,34 @@ class MainWindow(QMainWindow):
     def connect_to_button_play(self, slot):
         self.ui.button_play.clicked.connect(slot)
 
+    def connect_to_button_record(self, slot):
+        self._button_record.clicked.connect(slot)
+
     def connect_to_button_save(self, slot):
         self.ui.button_save.clicked.connect(slot)
 
     def connect_to_button_step(self, slot):
         self.ui.button_single_step.clicked.connect(slot)
 
+    def connect_to_check_max_speed(self, slot):
+        self.ui.check_max_speed.toggled.connect(slot)
+
+    def connect_to_combo_boundary(self, slot):
+        self.ui.combo_boundary.currentTextChanged.connect(slot)
+
+    def connect_to_combo_engine(self, slot):
+        self.ui.combo_engine.currentTextChanged.connect(slot)
+
+    def connect_to_combo_rule(self, slot):
+        # Only notify the rule when it is chosen from the list or confirmed with Enter, not at each typed character
+        self.ui.combo_rule.activated[str].connect(slot)
+
     def connect_to_combo_patterns(self, slot):
         self.ui.combo_patterns.currentTextChanged.connect(slot)
 
+    def connect_to_dock_statistics(self, slot):
+        self._dock_statistics.visibilityChanged.connect(slot)
+
     def connect_to_radio_age(self, slot):
         self.ui.radio_age.toggled.connect(slot)
 
@@ -60,6 +141,28 @@ class MainWindow(QMainWindow):
     def reset_combo_patterns(self):
         self.ui.combo_patterns.setCurrentIndex(0)
 
+    def set_combo_boundary(self, boundary_name: str):
+        self.ui.combo_boundary.blockSignals(True)
+        self.ui.combo_boundary.setCurrentText(boundary_name)
+        self.ui.combo_boundary.blockSignals(False)
+
+    def set_combo_engine(self, engine_name: str):
+        self.ui.combo_engine.blockSignals(True)
+        self.ui.combo_engine.setCurrentText(engine_name)
+        self.ui.combo_engine.blockSignals(False)
+
+    def set_combo_rule(self, rule: str):
+        self.ui.combo_rule.setCurrentText(rule)
+
+    def set_check_max_speed(self, checked: bool):
+        self.ui.check_max_speed.setChecked(checked)
+
+    def set_radio_age(self, checked: bool):
+        self.ui.radio_age.setChecked(checked)
+
+    def set_slider_speed(self, speed: int):
+        self.ui.slider_speed.setValue(speed)
+
     def show_error_message(self, message: str):
         """
         Show an error message into a popup dialog
@@ -74,6 +177,33 @@ class MainWindow(QMainWindow):
         """
         self.statusBar().showMessage(message, 2500)
 
+    def _toggle_stats(self, visible: bool):
+        if visible:
+            profiler.set_enabled(True)
+            self._timer_stats.start()
+        else:
+            self._timer_stats.stop()
+            profiler.set_enabled(config.PROFILING)
+
+    def update_stats(self):
+        """
+        Show the statistics of the profiler collected since the last update
+        """
+        self._label_stats.setText(profiling.format_stats(profiler.get_stats(reset=True)))
+
+    def _toggle_statistics(self, visible: bool):
+        if visible:
+            self._timer_statistics.start()
+            self.update_statistics()
+        else:
+            self._timer_statistics.stop()
+
+    def update_statistics(self):
+        """
+        Plot the statistics of the last generations
+        """
+        self.plot_statistics.set_history(self._gol_model.get_statistics().get_history())
+
     def update_controls(self):
         """
         Update the controls of the GUI using the current state and settings of the GOL simulation
@@ -86,6 +216,9 @@ class MainWindow(QMainWindow):
             self.ui.button_load.setEnabled(False)
             self.ui.button_save.setEnabled(False)
             self.ui.button_single_step.setEnabled(False)
+            self.ui.combo_boundary.setEnabled(False)
+            self.ui.combo_engine.setEnabled(False)
+            self.ui.combo_rule.setEnabled(False)
             self.ui.combo_patterns.setEnabled(False)
         else:
             self.ui.button_play.setText("Play")
@@ -93,8 +226,23 @@ class MainWindow(QMainWindow):
             self.ui.button_load.setEnabled(True)
             self.ui.button_save.setEnabled(True)
             self.ui.button_single_step.setEnabled(True)
+            self.ui.combo_boundary.setEnabled(True)
+            self.ui.combo_engine.setEnabled(True)
+            self.ui.combo_rule.setEnabled(True)
             self.ui.combo_patterns.setEnabled(True)
 
-        self.ui.label_fps.setText(f"{self._gol_model.get_fps()} FPS")
+        self._button_record.setText("Stop recording" if self._gol_model.get_recording() else "Record...")
+
+        if self._gol_model.get_max_speed():
+            self.ui.label_fps.setText("Max")
+        else:
+            self.ui.label_fps.setText(f"{self._gol_model.get_fps()} FPS")
+
+        # Report when the grid becomes periodic
+        cycle = self._gol_model.get_cycle()
+        if cycle is not self._shown_cycle:
+            self._shown_cycle = cycle
+            if cycle is not None:
+                self.show_message_on_status_bar(str(cycle))
 
 
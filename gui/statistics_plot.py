@@ -0,0 +1,76 @@
+import numpy as np
+from PyQt5 import QtGui
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtGui import QColor, QPainter, QPolygonF
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+# Colors of the plotted statistics
+POPULATION_COLOR = QColor(255, 255, 255)
+BIRTHS_COLOR = QColor(0, 200, 255)
+DEATHS_COLOR = QColor(255, 64, 64)
+
+
+class StatisticsPlot(QWidget):
+    """
+    Custom widget plotting the statistics of the last generations (see engine.statistics): the population in the upper
+    part, the births and deaths in the lower part, each scaled to its largest value. The values of the last generation
+    are written above the plot
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(200, 150)
+        # Statistics of the plotted generations (structured numpy array, see StatisticsCollector.get_history)
+        self._history = None
+
+    def set_history(self, history: np.ndarray):
+        """
+        Plot new statistics
+        :param history: The statistics of the generations to plot, from the oldest to the most recent
+        """
+        self._history = history
+        self.update()
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+        """
+        Slot for the paint event of the widget. It draws the plot of the statistics
+        :param a0: The paint event
+        """
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self._history is None or len(self._history) == 0:
+            painter.end()
+            return
+
+        last = self._history[-1]
+        text_height = painter.fontMetrics().height()
+        painter.setPen(POPULATION_COLOR)
+        painter.drawText(4, text_height, f"gen {last['generation']}  pop {last['population']}  "
+                                         f"density {last['density']:.2%}")
+        painter.drawText(4, 2 * text_height, f"+{max(last['births'], 0)}  -{max(last['deaths'], 0)}")
+
+        # Population in the upper two thirds, births and deaths in the lower third (unknown counts are drawn as 0)
+        top = 2 * text_height + 4
+        split = top + (self.height() - top) * 2 // 3
+        births = np.maximum(self._history["births"], 0)
+        deaths = np.maximum(self._history["deaths"], 0)
+        self._draw_series(painter, self._history["population"], top, split - 2, POPULATION_COLOR)
+        scale = max(int(births.max()), int(deaths.max()), 1)
+        self._draw_series(painter, births, split + 2, self.height() - 1, BIRTHS_COLOR, scale)
+        self._draw_series(painter, deaths, split + 2, self.height() - 1, DEATHS_COLOR, scale)
+        painter.end()
+
+    def _draw_series(self, painter: QPainter, values: np.ndarray, top: int, bottom: int, color: QColor,
+                     scale: int = None):
+        """
+        Helper method to draw the line of a series of values between two vertical coordinates
+        :param values: The values, one per generation
+        :param scale: The value drawn at the top (default: the largest value)
+        """
+        scale = scale or max(int(values.max()), 1)
+        xs = np.linspace(0, self.width() - 1, len(values)) if len(values) > 1 else np.zeros(1)
+        ys = bottom - values / scale * (bottom - top)
+        painter.setPen(color)
+        painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
@@ -87,6 +87,60 @@ class Ui_MainWindow(object):
         font.setPointSize(16)
         self.widget_5.setFont(font)
         self.widget_5.setObjectName("widget_5")
+        self.gridLayout_11 = QtWidgets.QGridLayout(self.widget_5)
+        self.gridLayout_11.setObjectName("gridLayout_11")
+        self.label_engine = QtWidgets.QLabel(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_engine.sizePolicy().hasHeightForWidth())
+        self.label_engine.setSizePolicy(sizePolicy)
+        self.label_engine.setObjectName("label_engine")
+        self.gridLayout_11.addWidget(self.label_engine, 0, 0, 1, 1)
+        self.combo_engine = QtWidgets.QComboBox(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.combo_engine.sizePolicy().hasHeightForWidth())
+        self.combo_engine.setSizePolicy(sizePolicy)
+        self.combo_engine.setMinimumSize(QtCore.QSize(0, 30))
+        self.combo_engine.setObjectName("combo_engine")
+        self.gridLayout_11.addWidget(self.combo_engine, 0, 1, 1, 1)
+        self.label_rule = QtWidgets.QLabel(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_rule.sizePolicy().hasHeightForWidth())
+        self.label_rule.setSizePolicy(sizePolicy)
+        self.label_rule.setObjectName("label_rule")
+        self.gridLayout_11.addWidget(self.label_rule, 0, 2, 1, 1)
+        self.combo_rule = QtWidgets.QComboBox(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.combo_rule.sizePolicy().hasHeightForWidth())
+        self.combo_rule.setSizePolicy(sizePolicy)
+        self.combo_rule.setMinimumSize(QtCore.QSize(0, 30))
+        self.combo_rule.setEditable(True)
+        self.combo_rule.setObjectName("combo_rule")
+        self.gridLayout_11.addWidget(self.combo_rule, 0, 3, 1, 1)
+        self.label_boundary = QtWidgets.QLabel(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_boundary.sizePolicy().hasHeightForWidth())
+        self.label_boundary.setSizePolicy(sizePolicy)
+        self.label_boundary.setObjectName("label_boundary")
+        self.gridLayout_11.addWidget(self.label_boundary, 0, 4, 1, 1)
+        self.combo_boundary = QtWidgets.QComboBox(self.widget_5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.combo_boundary.sizePolicy().hasHeightForWidth())
+        self.combo_boundary.setSizePolicy(sizePolicy)
+        self.combo_boundary.setMinimumSize(QtCore.QSize(0, 30))
+        self.combo_boundary.setObjectName("combo_boundary")
+        self.gridLayout_11.addWidget(self.combo_boundary, 0, 5, 1, 1)
         self.gridLayout.addWidget(self.widget_5, 0, 2, 1, 1)
         self.widget_6 = QtWidgets.QWidget(self.widget_top_bar)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred)
@@ -204,6 +258,9 @@ class Ui_MainWindow(object):
         self.label_fps.setAlignment(QtCore.Qt.AlignCenter)
         self.label_fps.setObjectName("label_fps")
         self.gridLayout_4.addWidget(self.label_fps, 1, 2, 1, 1)
+        self.check_max_speed = QtWidgets.QCheckBox(self.widget)
+        self.check_max_speed.setObjectName("check_max_speed")
+        self.gridLayout_4.addWidget(self.check_max_speed, 1, 3, 1, 1)
         self.label = QtWidgets.QLabel(self.widget)
         self.label.setObjectName("label")
         self.gridLayout_4.addWidget(self.label, 1, 0, 1, 1)
@@ -231,11 +288,16 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(_translate("MainWindow", "Conway\'s Game Of Life"))
         self.radio_age.setText(_translate("MainWindow", "Show Cell Age"))
         self.label_3.setText(_translate("MainWindow", "Pattern:"))
+        self.label_engine.setText(_translate("MainWindow", "Engine:"))
+        self.label_rule.setText(_translate("MainWindow", "Rule:"))
+        self.label_boundary.setText(_translate("MainWindow", "Boundary:"))
         self.button_save.setText(_translate("MainWindow", "Save"))
         self.button_load.setText(_translate("MainWindow", "Load"))
         self.button_play.setText(_translate("MainWindow", "Play"))
         self.button_clear.setText(_translate("MainWindow", "Clear"))
         self.button_single_step.setText(_translate("MainWindow", "Single Step"))
         self.label_fps.setText(_translate("MainWindow", "- FPS"))
+        self.check_max_speed.setToolTip(_translate("MainWindow", "Run the simulation as fast as possible"))
+        self.check_max_speed.setText(_translate("MainWindow", "Max"))
         self.label.setText(_translate("MainWindow", "Speed"))
 
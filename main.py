@@ -1,3 +1,4 @@
+import argparse
 import sys
 
 import qdarkstyle
@@ -7,7 +8,13 @@ from controller.main_controller import MainController
 from gui.main_window import MainWindow
 from model.gol_model import GOLModel
 
-app = QApplication(sys.argv)
+parser = argparse.ArgumentParser(description="Game of Life")
+parser.add_argument("--resume", nargs="?", const="", metavar="CHECKPOINT",
+                    help="resume the simulation from a checkpoint file (default: the most recent checkpoint)")
+# The remaining arguments are left to Qt
+args, qt_args = parser.parse_known_args()
+
+app = QApplication(sys.argv[:1] + qt_args)
 # Set the dark style for PyQt5
 app.setStyleSheet(qdarkstyle.load_stylesheet(qt_api='pyqt5'))
 
@@ -15,6 +22,8 @@ app.setStyleSheet(qdarkstyle.load_stylesheet(qt_api='pyqt5'))
 gol_model = GOLModel()
 main_window = MainWindow(gol_model)
 main_controller = MainController(app, main_window, gol_model)
+if args.resume is not None:
+    main_controller.resume(args.resume or None)
 
 main_window.show()
 sys.exit(app.exec_())
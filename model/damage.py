@@ -0,0 +1,59 @@
+"""
+Damage regions of the grid: the rectangles of cells changed by an update, so that the views only repaint them.
+A rectangle is a tuple (row, column, rows, columns) and a damage region is a list of rectangles, or None when the whole
+grid may have changed (e.g. a new grid or a different display mode).
+"""
+import numpy as np
+
+# Maximum number of rectangles of a damage region: beyond it they are merged into their bounding rectangle, since
+# repainting many small rectangles costs more than repainting a larger one
+MAX_RECTS = 16
+# Rows of the grid compared at once by diff_grids, which bound its temporary memory
+_BAND_ROWS = 256
+
+
+def cells_rect(rows: np.ndarray, cols: np.ndarray) -> list:
+    """
+    :param rows: Rows of the changed cells
+    :param cols: Columns of the changed cells
+    :return: The damage region of the cells: their bounding rectangle
+    """
+    if len(rows) == 0:
+        return []
+    row, col = int(np.min(rows)), int(np.min(cols))
+    return [(row, col, int(np.max(rows)) - row + 1, int(np.max(cols)) - col + 1)]
+
+
+def diff_grids(before: np.ndarray, after: np.ndarray) -> list:
+    """
+    Compare two states of the grid by bands of rows, so that distant changes give separate rectangles
+
+    :param before: Numpy array with the previous state of the grid
+    :param after: Numpy array with the new state of the grid
+    :return: The damage region between the two states (None if the size of the grid changed)
+    """
+    if before is None or before.shape != after.shape:
+        return None
+    rects = []
+    for start in range(0, after.shape[0], _BAND_ROWS):
+        changed = before[start:start + _BAND_ROWS] != after[start:start + _BAND_ROWS]
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows):
+            cols = np.flatnonzero(changed.any(axis=0))
+            rects.append((start + int(rows[0]), int(cols[0]), int(rows[-1] - rows[0]) + 1,
+                          int(cols[-1] - cols[0]) + 1))
+    return merge(rects)
+
+
+def merge(damage) -> list:
+    """
+    :param damage: A damage region
+    :return: The damage region with at most MAX_RECTS rectangles (None if the whole grid is damaged)
+    """
+    if damage is None or len(damage) <= MAX_RECTS:
+        return damage
+    row = min(rect[0] for rect in damage)
+    col = min(rect[1] for rect in damage)
+    row_stop = max(rect[0] + rect[2] for rect in damage)
+    col_stop = max(rect[1] + rect[3] for rect in damage)
+    return [(row, col, row_stop - row, col_stop - col)]
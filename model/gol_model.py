@@ -1,74 +1,195 @@
 import numpy as np
+from PyQt5.QtCore import pyqtSignal
 
+from engine.statistics import StatisticsCollector
+from model import damage
 from model.observable import Observable
 from config import config
 
 
 class GOLModel(Observable):
     """
-    Class representing the current state of the Game of Life (the model in the MVC pattern)
+    Class representing the current state of the Game of Life (the model in the MVC pattern).
+    The changes of the grid (or of the way it is displayed) and of the running state are notified through their own
+    signals, the changes of the other settings through value_changed
     """
+    grid_changed = pyqtSignal(object)
+    running_changed = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
 
         # Base pattern from which the current grid state is originated
         self._base_pattern = "Custom"
+        # Boundary condition of the grid (see engine.boundary)
+        self._boundary = config.BOUNDARY
+        # Cycle (see engine.cycles) reached by the grid, or None if the grid is not known to be periodic
+        self._cycle = None
+        # Cells changed by the last update of the grid (see model.damage): None if the whole grid may have changed
+        self._damage = None
+        # Name of the engine used to evolve the grid (see engine.engines)
+        self._engine = config.ENGINE
         # Size of the GOL grid
         self._grid_size = config.GRID_SIZE
         # Current state of the GOL grid. It is a matrix of 8-bit integers where an element represents the current age of
-        # the corresponding grid cell (0: dead cell, 255: ancient cell)
+        # the corresponding grid cell (0: dead cell, 255: ancient cell).
+        # The grid is double-buffered: the front buffer is exposed read-only to the observers, while the next state is
+        # written into the back buffer. The buffers are then swapped, so that updating the grid requires no allocation
         self._grid = np.zeros(self._grid_size, dtype=np.uint8)
+        self._grid.flags.writeable = False
+        self._back_grid = np.zeros(self._grid_size, dtype=np.uint8)
         # Speed of the GOL simulation (in frames per second)
         self._fps = config.FPS
+        # Flag that indicates whether the simulation runs as fast as possible, ignoring the speed
+        self._max_speed = False
+        # Rule of the simulation in B/S notation (B3/S23 for the Game of Life)
+        self._rule = config.RULE
         # Flag that indicates if the simulation is currently running
         self._running = False
         # Flag that indicates whether to display the cells age or only their state (dead/alive)
         self._show_cell_age = False
+        # Statistics of the last generations, collected while they are displayed or recorded. They are updated by the
+        # thread stepping the engine, so the observers read them periodically rather than being notified
+        self._statistics = StatisticsCollector(config.STATISTICS_HISTORY)
+        # Flag that indicates whether the statistics are being recorded to a file
+        self._recording = False
 
     def get_base_pattern(self) -> str:
         return self._base_pattern
 
+    def get_boundary(self) -> str:
+        return self._boundary
+
+    def get_cycle(self):
+        return self._cycle
+
+    def get_damage(self):
+        """
+        Getter method for the cells changed by the last notification of grid_changed, so that the observers can only
+        repaint them
+        :return: A list of rectangles (row, column, rows, columns) of cells, or None if the whole grid may have changed
+        """
+        return self._damage
+
+    def get_engine(self) -> str:
+        return self._engine
+
+    def get_back_buffer(self) -> np.ndarray:
+        """
+        Getter method for the back buffer of the grid, where the next state can be written before calling swap_buffers
+        :return: The writable numpy array of the back buffer
+        """
+        return self._back_grid
+
     def get_grid_as_numpy(self) -> np.ndarray:
         """
         Getter method for the current state of the GOL grid
-        :return: A copy of the numpy array of the grid, to avoid unintended changes to the GOL grid state
+        :return: A read-only view of the numpy array of the grid, to avoid unintended changes to the GOL grid state.
+        The content of the view changes when the buffers are swapped, so copy it to keep a grid state
         """
-        return self._grid.copy()
+        return self._grid
 
     def get_fps(self) -> int:
         return self._fps
 
+    def get_max_speed(self) -> bool:
+        return self._max_speed
+
     def get_grid_size(self) -> tuple:
         return self._grid_size
 
+    def get_rule(self) -> str:
+        return self._rule
+
     def get_running(self) -> bool:
         return self._running
 
+    def get_recording(self) -> bool:
+        return self._recording
+
     def get_show_cell_age(self) -> bool:
         return self._show_cell_age
 
+    def get_statistics(self) -> StatisticsCollector:
+        return self._statistics
+
     def set_base_pattern(self, base_pattern: str):
         self._base_pattern = base_pattern
         self.notify()
 
+    def set_cycle(self, cycle):
+        self._cycle = cycle
+        self.notify()
+
+    def set_engine(self, engine: str):
+        self._engine = engine
+        self.notify()
+
     def set_fps(self, value: int):
         self._fps = value
         self.notify()
 
+    def set_max_speed(self, value: bool):
+        self._max_speed = value
+        self.notify()
+
+    def set_boundary(self, boundary: str):
+        self._boundary = boundary
+        self.notify()
+
+    def set_cells(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray):
+        """
+        Change the state of some cells in place, without copying the grid
+        :param rows: Rows of the cells to change
+        :param cols: Columns of the cells to change
+        :param values: New age of each cell (0: dead cell)
+        """
+        self._grid.flags.writeable = True
+        self._grid[rows, cols] = values
+        self._grid.flags.writeable = False
+        self._damage = damage.cells_rect(rows, cols)
+        self.notify(self.grid_changed)
+
     def set_grid_size(self, rows: int, cols: int):
         self._grid_size = (rows, cols)
-        self._grid = np.zeros(self._grid_size, np.int8)
+        self._back_grid = np.zeros(self._grid_size, np.uint8)
+        self.swap_buffers()
+
+    def set_grid_as_numpy(self, grid: np.ndarray, damage_region: list = None):
+        """
+        Replace the state of the grid, copying the given array into the back buffer and swapping the buffers
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param damage_region: The cells that differ from the current state, if known (see get_damage)
+        """
+        if grid.shape != self._back_grid.shape:
+            self._back_grid = np.empty(grid.shape, np.uint8)
+        np.copyto(self._back_grid, grid)
+        self.swap_buffers(damage_region)
+
+    def set_recording(self, value: bool):
+        self._recording = value
         self.notify()
 
-    def set_grid_as_numpy(self, grid: np.ndarray):
-        self._grid = grid
+    def set_rule(self, rule: str):
+        self._rule = rule
         self.notify()
 
     def set_running(self, value: bool):
         self._running = value
-        self.notify()
+        self.notify(self.running_changed)
 
     def set_show_cell_age(self, value: bool):
         self._show_cell_age = value
-        self.notify()
+        self._damage = None
+        self.notify(self.grid_changed)
+
+    def swap_buffers(self, damage_region: list = None):
+        """
+        Make the back buffer the current state of the grid (see get_back_buffer)
+        :param damage_region: The cells that differ from the current state, if known (see get_damage)
+        """
+        self._grid, self._back_grid = self._back_grid, self._grid
+        self._grid.flags.writeable = False
+        self._back_grid.flags.writeable = True
+        self._damage = damage.merge(damage_region)
+        self.notify(self.grid_changed)
@@ -3,15 +3,24 @@ from PyQt5.QtCore import QObject, pyqtSignal
 
 class Observable(QObject):
     """
-    Object that allows to be notified on its state changes (Observer pattern)
+    Object that allows to be notified on its state changes (Observer pattern).
+    Subclasses can declare more signals to notify different kinds of changes separately, so that each observer is only
+    called for the changes it depends on
     """
     value_changed = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
 
-    def observe(self, slot):
-        self.value_changed.connect(slot)
+    def observe(self, slot, signal=None):
+        """
+        :param slot: The function called on the changes
+        :param signal: The signal of the kind of changes to observe (default: value_changed)
+        """
+        (signal or self.value_changed).connect(slot)
 
-    def notify(self):
-        self.value_changed.emit(self)
+    def notify(self, signal=None):
+        """
+        :param signal: The signal of the kind of change (default: value_changed)
+        """
+        (signal or self.value_changed).emit(self)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from config import config
+from engine import life
+from engine.batch import BatchStepper, simulate_batch, step_batch
+from engine.boundary import BOUNDARIES
+
+
+def _soups(batch: int = 6, shape: tuple = (20, 24), seed: int = 0) -> np.ndarray:
+    return (np.random.default_rng(seed).random((batch,) + shape) < 0.35).astype(np.uint8)
+
+
+def _grid(*cells, shape: tuple = (16, 16)) -> np.ndarray:
+    grid = np.zeros(shape, np.uint8)
+    for row, col in cells:
+        grid[row, col] = 1
+    return grid
+
+
+# Extinction at generation 1, still life (a block) from generation 1, oscillator of period 2
+SINGLE_CELL = _grid((5, 5))
+PRE_BLOCK = _grid((5, 5), (5, 6), (6, 5))
+BLINKER = _grid((5, 4), (5, 5), (5, 6))
+# A glider on an 8x8 torus returns to its position every 32 generations
+GLIDER = _grid((0, 1), (1, 2), (2, 0), (2, 1), (2, 2), shape=(8, 8))
+
+
+@pytest.mark.parametrize("boundary", BOUNDARIES)
+@pytest.mark.parametrize("rule", ["B3/S23", "B36/S23"])
+def test_step_matches_reference(boundary, rule):
+    grids = _soups()
+    stepper = BatchStepper(grids, rule, boundary)
+    expected = grids
+    for _ in range(10):
+        stepper.step()
+        expected = [life.step(grid, rule=rule, boundary=boundary) for grid in expected]
+        np.testing.assert_array_equal(stepper.get_alive(), np.array(expected) != 0)
+        np.testing.assert_array_equal(stepper.get_populations(), [np.count_nonzero(grid) for grid in expected])
+
+
+def test_step_batch():
+    grids = _soups(seed=1)
+    expected = [life.step(grid, 7, rule="B36/S23", boundary="torus") != 0 for grid in grids]
+    np.testing.assert_array_equal(step_batch(grids, 7, "B36/S23", "torus"), expected)
+
+
+def test_select():
+    grids = _soups(seed=2)
+    stepper = BatchStepper(grids)
+    stepper.step(3)
+    mask = np.array([True, False, True, True, False, False])
+    stepper.select(mask)
+    assert stepper.get_batch_size() == 3
+    stepper.step(2)
+    np.testing.assert_array_equal(stepper.get_alive(), [life.step(grid, 5) != 0 for grid in grids[mask]])
+
+
+def test_simulate_batch():
+    grids = np.array([SINGLE_CELL, PRE_BLOCK, BLINKER])
+    result = simulate_batch(grids, 11)
+    np.testing.assert_array_equal(result.get_stabilizations(), [1, 1, 0])
+    np.testing.assert_array_equal(result.get_periods(), [1, 1, 2])
+    np.testing.assert_array_equal(result.get_populations(), [0, 4, 3])
+    # The stable grids are removed early, but their last generation is the one of the last generation requested
+    np.testing.assert_array_equal(result.get_grids(), [life.step(grid, 11) != 0 for grid in grids])
+
+
+@pytest.mark.parametrize("boundary", ["dead", "torus"])
+@pytest.mark.parametrize("rule", ["B3/S23", "B36/S23"])
+def test_simulate_batch_soups(boundary, rule):
+    grids = _soups(seed=3)
+    result = simulate_batch(grids, 60, rule, boundary)
+    expected = [life.step(grid, 60, rule=rule, boundary=boundary) for grid in grids]
+    np.testing.assert_array_equal(result.get_grids(), np.array(expected) != 0)
+    np.testing.assert_array_equal(result.get_populations(), [np.count_nonzero(grid) for grid in expected])
+    for grid, start, period in zip(grids, result.get_stabilizations(), result.get_periods()):
+        if period:
+            # The grid repeats from its stabilization generation on, with its period
+            first = life.step(grid, start, rule=rule, boundary=boundary)
+            np.testing.assert_array_equal(life.step(first, period, rule=rule, boundary=boundary) != 0, first != 0)
+
+
+def test_period_longer_than_max_period(monkeypatch):
+    grids = np.array([GLIDER, BLINKER[:8, :8]])
+    result = simulate_batch(grids, 100, boundary="torus", max_period=64)
+    np.testing.assert_array_equal(result.get_periods(), [32, 2])
+    monkeypatch.setattr(config, "BATCH_MAX_PERIOD", 16)
+    result = simulate_batch(grids, 100, boundary="torus")
+    np.testing.assert_array_equal(result.get_periods(), [0, 2])
+    np.testing.assert_array_equal(result.get_stabilizations(), [-1, 0])
+    np.testing.assert_array_equal(result.get_grids()[0], life.step(GLIDER, 100, boundary="torus") != 0)
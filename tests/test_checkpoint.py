@@ -0,0 +1,50 @@
+import numpy as np
+
+from utils import checkpoint, snapshot
+
+
+def _write_checkpoints(folder: str, generations: list, keep: int):
+    # One writer per checkpoint, stopped to wait for the write (a newer checkpoint replaces the pending one)
+    for generation in generations:
+        writer = checkpoint.CheckpointWriter(folder, keep)
+        writer.start()
+        writer.submit(np.full((4, 6), generation % 256, np.uint8), "B3/S23", generation, "dead", "convolution",
+                      {"fps": generation})
+        writer.stop()
+
+
+def test_rotation_keeps_most_recent(tmp_path):
+    _write_checkpoints(str(tmp_path), [10, 20, 30, 40], keep=2)
+
+    file_paths = checkpoint.list_checkpoints(str(tmp_path))
+    assert [snapshot.load_snapshot(file_path).get_generation() for file_path in file_paths] == [30, 40]
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_latest_is_last_written_with_lower_generation(tmp_path):
+    # A new run (e.g. another pattern) restarts from a lower generation
+    _write_checkpoints(str(tmp_path), [1000, 2000], keep=2)
+    _write_checkpoints(str(tmp_path), [50], keep=2)
+
+    latest = checkpoint.find_latest_checkpoint(str(tmp_path))
+    assert snapshot.load_snapshot(latest).get_generation() == 50
+    assert checkpoint.read_checkpoint_settings(latest) == {"fps": 50}
+    assert len(checkpoint.list_checkpoints(str(tmp_path))) == 2
+
+
+def test_round_trip(tmp_path):
+    grid = np.random.default_rng(0).integers(0, 256, (7, 9), dtype=np.uint8)
+    writer = checkpoint.CheckpointWriter(str(tmp_path), 3)
+    writer.start()
+    writer.submit(grid, "B36/S23", 123, "torus", "tiled")
+    writer.stop()
+
+    grid_snapshot = snapshot.load_snapshot(checkpoint.find_latest_checkpoint(str(tmp_path)))
+    np.testing.assert_array_equal(grid_snapshot.to_numpy(), grid)
+    assert (grid_snapshot.get_rule(), grid_snapshot.get_generation(), grid_snapshot.get_boundary(),
+            grid_snapshot.get_engine()) == ("B36/S23", 123, "torus", "tiled")
+
+
+def test_no_checkpoints(tmp_path):
+    assert checkpoint.find_latest_checkpoint(str(tmp_path / "missing")) is None
+    assert checkpoint.read_checkpoint_settings(str(tmp_path / "missing.snap")) == {}
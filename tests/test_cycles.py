@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from engine.cycles import EXTINCTION, OSCILLATOR, STILL_LIFE, CycleDetector, detect_cycle
+from engine.engines import create_engine, get_available_engines, get_engine_class
+
+BOUNDED_ENGINES = [name for name in get_available_engines() if not get_engine_class(name).unbounded]
+
+
+def _grid(*cells) -> np.ndarray:
+    grid = np.zeros((32, 32), np.uint8)
+    for row, col in cells:
+        grid[row, col] = 1
+    return grid
+
+
+# Three cells becoming a block at generation 1
+PRE_BLOCK = _grid((10, 10), (10, 11), (11, 10))
+BLINKER = _grid((10, 9), (10, 10), (10, 11))
+
+
+@pytest.mark.parametrize("engine", BOUNDED_ENGINES)
+def test_kinds(engine):
+    assert detect_cycle(_grid((10, 10)), 10, engine=engine).get_kind() == EXTINCTION
+    still_life = detect_cycle(PRE_BLOCK, 10, engine=engine)
+    assert still_life.get_kind() == STILL_LIFE
+    assert (still_life.get_start(), still_life.get_period(), still_life.get_population()) == (1, 1, 4)
+    oscillator = detect_cycle(BLINKER, 10, engine=engine)
+    assert oscillator.get_kind() == OSCILLATOR
+    assert (oscillator.get_start(), oscillator.get_period()) == (0, 2)
+
+
+@pytest.mark.parametrize("engine", BOUNDED_ENGINES)
+def test_start_is_engine_generation(engine):
+    gol_engine = create_engine(engine)
+    gol_engine.set_generation(100)
+    gol_engine.load(PRE_BLOCK)
+    detector = CycleDetector()
+    cycle = detector.update_from_engine(gol_engine)
+    while cycle is None:
+        gol_engine.step()
+        cycle = detector.update_from_engine(gol_engine)
+    assert (cycle.get_start(), cycle.get_period()) == (101, 1)
+    assert gol_engine.get_generation() == 102
+
+
+def test_unchanged_generation_is_not_exported():
+    gol_engine = create_engine("convolution")
+    gol_engine.load(PRE_BLOCK)
+    detector = CycleDetector()
+    detector.update_from_engine(gol_engine)
+    gol_engine.step()
+    assert detector.update_from_engine(gol_engine) is None
+
+    gol_engine.step()
+    # The engine counted no birth and no death: the grid is the same as the previous generation
+    gol_engine.to_numpy = None
+    cycle = detector.update_from_engine(gol_engine)
+    assert (cycle.get_start(), cycle.get_period()) == (1, 1)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from model.damage import MAX_RECTS, cells_rect, diff_grids, merge
+
+
+def _covered(damage: list, shape: tuple) -> np.ndarray:
+    """
+    :return: Boolean numpy array with the cells inside the rectangles of a damage region
+    """
+    covered = np.zeros(shape, bool)
+    for row, col, rows, cols in damage:
+        assert rows > 0 and cols > 0
+        covered[row:row + rows, col:col + cols] = True
+    return covered
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_changed_cells_are_covered(seed):
+    rng = np.random.default_rng(seed)
+    before = (rng.random((1000, 300)) < 0.3).astype(np.uint8)
+    after = before.copy()
+    # A few changes spread over several bands of rows
+    rows, cols = rng.integers(0, 1000, 8), rng.integers(0, 300, 8)
+    after[rows, cols] ^= 1
+    damage = diff_grids(before, after)
+    assert 1 <= len(damage) <= MAX_RECTS
+    changed = before != after
+    assert not np.any(changed & ~_covered(damage, after.shape))
+
+
+def test_separate_bands():
+    before = np.zeros((1024, 64), np.uint8)
+    after = before.copy()
+    after[10, 5] = after[700, 40] = 1
+    damage = diff_grids(before, after)
+    # Distant changes give separate rectangles
+    assert damage == [(10, 5, 1, 1), (700, 40, 1, 1)]
+
+
+def test_no_change():
+    grid = np.ones((300, 20), np.uint8)
+    assert diff_grids(grid, grid.copy()) == []
+
+
+def test_collapse_beyond_max_rects():
+    before = np.zeros(((MAX_RECTS + 4) * 256, 32), np.uint8)
+    after = before.copy()
+    # One change in each band: more rectangles than MAX_RECTS
+    after[np.arange(MAX_RECTS + 4) * 256 + 3, np.arange(MAX_RECTS + 4)] = 1
+    damage = diff_grids(before, after)
+    assert damage == [(3, 0, (MAX_RECTS + 3) * 256 + 1, MAX_RECTS + 4)]
+    assert not np.any((before != after) & ~_covered(damage, after.shape))
+
+
+def test_shape_change():
+    assert diff_grids(np.zeros((10, 10), np.uint8), np.zeros((10, 11), np.uint8)) is None
+    assert diff_grids(None, np.zeros((10, 10), np.uint8)) is None
+
+
+def test_merge():
+    assert merge(None) is None
+    rects = [(i, i, 1, 1) for i in range(MAX_RECTS)]
+    assert merge(rects) is rects
+    assert merge(rects + [(40, 2, 3, 5)]) == [(0, 0, 43, 16)]
+
+
+def test_cells_rect():
+    assert cells_rect(np.array([], int), np.array([], int)) == []
+    assert cells_rect(np.array([4, 2, 9]), np.array([7, 1, 3])) == [(2, 1, 8, 7)]
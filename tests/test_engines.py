@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from engine import life
+from engine.boundary import BOUNDARIES, DEAD
+from engine.engines import create_engine, get_available_engines, get_engine_class
+
+# Generations compared with the reference implementation
+GENERATIONS = 12
+# Size of the grid and of the random soup in its middle, with enough margin for the unbounded engines: the soup cannot
+# reach the border of the grid in GENERATIONS generations
+GRID_SIZE = (64, 80)
+SOUP_SIZE = (24, 40)
+
+
+def _soup(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    grid = np.zeros(GRID_SIZE, np.uint8)
+    row, col = (GRID_SIZE[0] - SOUP_SIZE[0]) // 2, (GRID_SIZE[1] - SOUP_SIZE[1]) // 2
+    grid[row:row + SOUP_SIZE[0], col:col + SOUP_SIZE[1]] = rng.random(SOUP_SIZE) < 0.4
+    return grid
+
+
+def _full_soup(seed: int = 0) -> np.ndarray:
+    """
+    :return: A random soup filling the whole grid, so that the boundary condition matters
+    """
+    return (np.random.default_rng(seed).random(GRID_SIZE) < 0.4).astype(np.uint8)
+
+
+def _cases():
+    for name in get_available_engines():
+        boundaries = (DEAD,) if get_engine_class(name).unbounded else BOUNDARIES
+        for boundary in boundaries:
+            yield name, boundary
+
+
+@pytest.mark.parametrize("name,boundary", list(_cases()))
+@pytest.mark.parametrize("rule", ["B3/S23", "B36/S23"])
+def test_steps_match_reference(name, boundary, rule):
+    grid = _soup() if boundary == DEAD else _full_soup()
+    engine = create_engine(name, rule=rule, boundary=boundary)
+    engine.load(grid)
+    expected = grid
+    for generation in range(1, GENERATIONS + 1):
+        engine.step()
+        expected = life.step(expected, rule=rule, boundary=boundary)
+        np.testing.assert_array_equal(engine.to_numpy(), expected)
+        assert engine.get_generation() == generation
+        assert engine.get_population() == np.count_nonzero(expected)
+
+
+@pytest.mark.parametrize("name,boundary", list(_cases()))
+def test_multiple_steps_match_reference(name, boundary):
+    grid = _soup(1) if boundary == DEAD else _full_soup(1)
+    engine = create_engine(name, boundary=boundary)
+    engine.load(grid)
+    engine.step(GENERATIONS)
+    expected = life.step(grid, GENERATIONS, boundary=boundary)
+    # The engines that only store the alive state of the cells do not know the age of the cells they did not export
+    np.testing.assert_array_equal(engine.to_numpy() != 0, expected != 0)
+    assert engine.get_generation() == GENERATIONS
+    assert engine.get_population() == np.count_nonzero(expected)
+
+
+@pytest.mark.parametrize("name", get_available_engines())
+def test_rule_change_applies_to_still_lifes(name):
+    grid = np.zeros(GRID_SIZE, np.uint8)
+    grid[10:12, 10:12] = 1
+    engine = create_engine(name)
+    engine.load(grid)
+    engine.step(3)
+    engine.set_rule("B3/S")
+    engine.step()
+    assert engine.get_population() == 0
+
+
+@pytest.mark.parametrize("name", [name for name in get_available_engines() if not get_engine_class(name).unbounded])
+def test_boundary_change_applies_to_still_lifes(name):
+    grid = np.zeros(GRID_SIZE, np.uint8)
+    # A block on the left border and another on the right one: two still lifes, which touch on a torus
+    grid[10:12, :2] = 1
+    grid[10:12, -2:] = 1
+    engine = create_engine(name)
+    engine.load(grid)
+    engine.step(3)
+    np.testing.assert_array_equal(engine.to_numpy() != 0, grid != 0)
+    engine.set_boundary("torus")
+    engine.step()
+    np.testing.assert_array_equal(engine.to_numpy() != 0, life.step(grid, boundary="torus") != 0)
+
+
+@pytest.mark.parametrize("name", [name for name in get_available_engines() if not get_engine_class(name).unbounded])
+def test_counts_match_reference(name):
+    grid = _full_soup(2)
+    engine = create_engine(name, boundary="torus")
+    engine.load(grid)
+    previous = grid
+    for _ in range(GENERATIONS):
+        engine.step()
+        expected = life.step(previous, boundary="torus")
+        counts = engine.get_counts()
+        if counts is not None:
+            assert counts == (np.count_nonzero(expected), np.count_nonzero((expected != 0) & (previous == 0)),
+                              np.count_nonzero((expected == 0) & (previous != 0)))
+        previous = expected
+
+
+def test_close_parallel_engine():
+    engine = create_engine("parallel")
+    engine.load(_soup())
+    engine.step()
+    engine.close()
+    # The pool does not accept new work, and its threads exit
+    with pytest.raises(RuntimeError):
+        engine.step()
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.patterns import CELLS, LIFE_106, PATTERN_EXTENSIONS, RLE, get_available_patterns, get_pattern_file, \
+    get_pattern_format, read_pattern, save_pattern
+
+
+def _random_pattern(shape: tuple, seed: int = 0) -> np.ndarray:
+    """
+    :return: A random pattern whose bounding box is the whole array (the formats only keep the alive cells)
+    """
+    grid = (np.random.default_rng(seed).random(shape) < 0.3).astype(np.uint8)
+    grid[0, 0] = grid[-1, -1] = 1
+    return grid
+
+
+@pytest.mark.parametrize("extension", sorted(PATTERN_EXTENSIONS))
+@pytest.mark.parametrize("shape", [(1, 1), (3, 80), (50, 7), (120, 150)])
+def test_round_trip(tmp_path, extension, shape):
+    grid = _random_pattern(shape)
+    file_path = os.path.join(tmp_path, "pattern" + extension)
+    save_pattern(file_path, grid, "B36/S23")
+    grid_read, rule = read_pattern(file_path)
+    np.testing.assert_array_equal(grid_read, grid)
+    assert rule == "B36/S23"
+
+
+@pytest.mark.parametrize("extension", sorted(PATTERN_EXTENSIONS))
+def test_round_trip_without_rule(tmp_path, extension):
+    grid = _random_pattern((20, 30), 1)
+    file_path = os.path.join(tmp_path, "pattern" + extension)
+    save_pattern(file_path, grid)
+    grid_read, rule = read_pattern(file_path)
+    np.testing.assert_array_equal(grid_read, grid)
+    assert rule is None
+
+
+@pytest.mark.parametrize("pattern_format", [CELLS, RLE, LIFE_106])
+def test_format_from_content(tmp_path, pattern_format):
+    grid = _random_pattern((10, 12), 2)
+    file_path = os.path.join(tmp_path, "pattern.txt")
+    save_pattern(file_path, grid, pattern_format=pattern_format)
+    with open(file_path, "rb") as f:
+        assert get_pattern_format(file_path, f.read()) == pattern_format
+    np.testing.assert_array_equal(read_pattern(file_path)[0], grid)
+
+
+@pytest.mark.parametrize("pattern_name", get_available_patterns())
+@pytest.mark.parametrize("extension", sorted(PATTERN_EXTENSIONS))
+def test_bundled_patterns(tmp_path, pattern_name, extension):
+    grid, rule = read_pattern(get_pattern_file(pattern_name))
+    file_path = os.path.join(tmp_path, "pattern" + extension)
+    save_pattern(file_path, grid, rule)
+    grid_read, rule_read = read_pattern(file_path)
+    # The formats keep the bounding box of the alive cells
+    rows, cols = np.nonzero(grid)
+    np.testing.assert_array_equal(grid_read, grid[rows.min():rows.max() + 1, cols.min():cols.max() + 1])
+    assert rule_read == rule
+
+
+def test_missing_file(tmp_path):
+    assert read_pattern(os.path.join(tmp_path, "missing.rle")) is None
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from utils.profiling import Profiler
+
+
+def test_nested_sections():
+    profiler = Profiler(True)
+    with profiler.section("outer"):
+        with profiler.section("outer"):
+            time.sleep(0.01)
+        time.sleep(0.02)
+    section = profiler.get_stats()["sections"]["outer"]
+    assert section["calls"] == 2
+    # The outer execution includes the inner one
+    assert section["max"] >= 0.03 > section["total"] - section["max"] >= 0.01
+
+
+def test_concurrent_sections():
+    profiler = Profiler(True)
+
+    def work():
+        with profiler.section("work"):
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    section = profiler.get_stats()["sections"]["work"]
+    assert section["calls"] == 4
+    assert section["max"] < 0.5
+    assert section["total"] >= 4 * 0.05
+
+
+def test_disabled():
+    profiler = Profiler()
+    with profiler.section("step"):
+        pass
+    assert profiler.get_stats()["sections"] == {}
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.snapshot import is_snapshot_file, load_snapshot, save_snapshot
+
+
+def _grid(shape: tuple) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return ((rng.random(shape) < 0.3) * rng.integers(1, 256, shape)).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (7, 13), (64, 64), (100, 250)])
+def test_round_trip(tmp_path, shape):
+    grid = _grid(shape)
+    file_path = os.path.join(tmp_path, "grid.snap")
+    save_snapshot(file_path, grid, "B36/S23", 1234, "klein", "tiled")
+    assert is_snapshot_file(file_path)
+    snapshot = load_snapshot(file_path)
+    assert snapshot.get_grid_size() == shape
+    assert (snapshot.get_rule(), snapshot.get_generation(), snapshot.get_boundary(), snapshot.get_engine()) == \
+           ("B36/S23", 1234, "klein", "tiled")
+    np.testing.assert_array_equal(snapshot.to_numpy(), grid)
+    np.testing.assert_array_equal(snapshot.get_alive(), grid != 0)
+    np.testing.assert_array_equal(snapshot.get_alive(2 % shape[0], 3 % shape[1], 1, 1),
+                                  grid[2 % shape[0]:2 % shape[0] + 1, 3 % shape[1]:3 % shape[1] + 1] != 0)
+
+
+def test_without_ages(tmp_path):
+    grid = _grid((30, 40))
+    file_path = os.path.join(tmp_path, "grid.snap")
+    save_snapshot(file_path, grid, save_ages=False)
+    snapshot = load_snapshot(file_path)
+    assert not snapshot.has_ages()
+    assert (snapshot.get_rule(), snapshot.get_generation(), snapshot.get_boundary(), snapshot.get_engine()) == \
+           (None, 0, "dead", None)
+    np.testing.assert_array_equal(snapshot.to_numpy(), grid != 0)
+
+
+def test_invalid_file(tmp_path):
+    file_path = os.path.join(tmp_path, "grid.snap")
+    with open(file_path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert not is_snapshot_file(file_path)
+    with pytest.raises(ValueError):
+        load_snapshot(file_path)
+
+
+def test_truncated_file(tmp_path):
+    file_path = os.path.join(tmp_path, "grid.snap")
+    save_snapshot(file_path, _grid((50, 50)))
+    with open(file_path, "r+b") as f:
+        f.truncate(os.path.getsize(file_path) - 1)
+    with pytest.raises(ValueError):
+        load_snapshot(file_path)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from engine.engines import create_engine
+from engine.statistics import AGE_BINS, FIELDS, StatisticsCollector, compute_statistics
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (5, 4), (300, 301), (513, 77)])
+def test_compute_statistics(shape):
+    rng = np.random.default_rng(0)
+    grid = (rng.random(shape) < 0.4) * rng.integers(1, 256, shape, dtype=np.uint8)
+    # Views of a larger buffer, as exported by the engines with a halo
+    for cells in (grid, np.pad(grid, 1)[1:-1, 1:-1]):
+        statistics = dict(zip(FIELDS, compute_statistics(cells, 7)))
+        alive_rows, alive_cols = np.nonzero(cells)
+        assert statistics["generation"] == 7
+        assert statistics["population"] == len(alive_rows)
+        assert statistics["births"] == np.count_nonzero(cells == 1)
+        assert statistics["deaths"] == -1
+        if len(alive_rows):
+            assert (statistics["min_row"], statistics["min_col"], statistics["max_row"], statistics["max_col"]) == \
+                   (alive_rows.min(), alive_cols.min(), alive_rows.max(), alive_cols.max())
+        for age, next_age in zip(AGE_BINS, AGE_BINS[1:] + (256,)):
+            assert statistics[f"age_{age}"] == np.count_nonzero((cells >= age) & (cells < next_age))
+
+
+def test_empty_grid():
+    statistics = dict(zip(FIELDS, compute_statistics(np.zeros((8, 8), np.uint8), 0, previous_population=3)))
+    assert (statistics["population"], statistics["births"], statistics["deaths"]) == (0, 0, 3)
+    assert (statistics["min_row"], statistics["min_col"], statistics["max_row"], statistics["max_col"]) == (-1,) * 4
+
+
+@pytest.mark.parametrize("name", ["convolution", "bitpacked"])
+def test_collector_deaths(name):
+    grid = np.zeros((16, 16), np.uint8)
+    # Blinker: two cells die and two are born at each generation
+    grid[5, 4:7] = 1
+    engine = create_engine(name)
+    engine.load(grid)
+    collector = StatisticsCollector(4, enabled=True)
+    collector.update(engine)
+    for _ in range(6):
+        engine.step()
+        collector.update(engine)
+    history = collector.get_history()
+    assert list(history["generation"]) == [3, 4, 5, 6]
+    assert list(history["population"]) == [3] * 4
+    assert list(history["births"]) == [2] * 4
+    assert list(history["deaths"]) == [2] * 4
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from utils.viewport import Viewport, line_cells
+
+
+@pytest.mark.parametrize("view_side", [25, 33, 34, 49, 50, 51, 100, 200])
+def test_reduced_matches_render(view_side):
+    viewport = Viewport()
+    viewport.set_sizes((100, 100), (view_side, view_side))
+    grid = np.ones((100, 100), np.uint8)
+    # A single dead cell: a pixel showing a block of cells shows it as alive (see ANY)
+    grid[1, 1] = 0
+    pixels = viewport.render(grid)
+    assert viewport.is_reduced() == (viewport.get_zoom() <= 0.5)
+    if viewport.is_reduced():
+        assert pixels.min() > 0
+    elif viewport.get_zoom() >= 1:
+        assert pixels.min() == 0
+
+
+@pytest.mark.parametrize("end", [(0, 0), (0, 9), (9, 0), (-7, 3), (5, 5), (3, -11), (-13, -4), (1, 2), (2, 1)])
+def test_line_cells(end):
+    start = (4, 6)
+    end = (start[0] + end[0], start[1] + end[1])
+    rows, cols = line_cells(start, end)
+    assert len(rows) == len(cols) == max(abs(end[0] - start[0]), abs(end[1] - start[1]))
+    if len(rows) == 0:
+        return
+    # The line starts next to the start cell (excluded) and ends on the end cell
+    cells = np.stack((np.concatenate(([start[0]], rows)), np.concatenate(([start[1]], cols))), axis=1)
+    assert tuple(cells[-1]) == end
+    # Consecutive cells are 8-adjacent and distinct
+    steps = np.abs(np.diff(cells, axis=0))
+    assert steps.max() == 1
+    assert steps.sum(axis=1).min() >= 1
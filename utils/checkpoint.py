@@ -0,0 +1,161 @@
+"""
+Periodic checkpoints of long-running simulations.
+A checkpoint is a snapshot of the grid (see utils.snapshot) plus a small JSON file with the settings that the snapshot
+does not store. Checkpoints are written by a background thread, so that saving a large grid never stalls the simulation,
+and only the most recent ones are kept.
+The files are numbered by a sequence that grows with every checkpoint written in the folder, also across runs: the most
+recent checkpoint is the last written one, even if it has a lower generation (e.g. a new pattern has been loaded).
+"""
+import glob
+import json
+import os
+import queue
+import re
+import threading
+
+import numpy as np
+
+from utils import snapshot
+
+_CHECKPOINT_NAME = "checkpoint-{:012d}"
+_CHECKPOINT_PATTERN = re.compile(r"checkpoint-(\d+)\.snap$")
+_SETTINGS_EXTENSION = ".json"
+
+
+class CheckpointWriter(threading.Thread):
+    """
+    Thread writing the checkpoints in the background.
+    Only the latest submitted checkpoint is pending at any time: if the disk is slower than the checkpoint interval,
+    the intermediate checkpoints are skipped rather than queued.
+    """
+
+    def __init__(self, folder: str, keep: int):
+        """
+        Object constructor
+
+        :param folder: The folder of the checkpoint files (created if missing)
+        :param keep: Number of checkpoints kept: the oldest ones are deleted
+        """
+        super().__init__(daemon=True)
+        self._folder = folder
+        self._keep = max(keep, 1)
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        # Sequence number of the last checkpoint written in the folder (read from the folder at the first write)
+        self._sequence = None
+
+    def get_error(self):
+        """
+        :return: The error raised by the last failed write, or None
+        """
+        return self._error
+
+    def get_folder(self) -> str:
+        return self._folder
+
+    def run(self):
+        while True:
+            checkpoint = self._queue.get()
+            if checkpoint is None:
+                return
+            try:
+                self._write(*checkpoint)
+                self._error = None
+            except OSError as e:
+                self._error = e
+
+    def stop(self):
+        """
+        Write the pending checkpoint, if any, and stop the thread
+        """
+        self._queue.put(None)
+        self.join()
+
+    def submit(self, grid: np.ndarray, rule: str, generation: int, boundary: str, engine: str, settings: dict = None):
+        """
+        Schedule the writing of a checkpoint. The grid is copied, so it can change as soon as the method returns
+
+        :param grid: Numpy array (uint8) with the age of each cell
+        :param rule: The rule of the simulation in B/S notation
+        :param generation: The generation of the grid
+        :param boundary: The boundary condition of the grid (see engine.boundary)
+        :param engine: The name of the engine of the simulation
+        :param settings: Other settings to restore (JSON serializable)
+        """
+        checkpoint = (grid.copy(), rule, generation, boundary, engine, settings or {})
+        # Replace the pending checkpoint, if any, with the newer one
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._queue.put(checkpoint)
+
+    def _write(self, grid: np.ndarray, rule: str, generation: int, boundary: str, engine: str, settings: dict):
+        os.makedirs(self._folder, exist_ok=True)
+        if self._sequence is None:
+            file_paths = list_checkpoints(self._folder)
+            self._sequence = _get_sequence(file_paths[-1]) if file_paths else 0
+        self._sequence += 1
+        base_path = os.path.join(self._folder, _CHECKPOINT_NAME.format(self._sequence))
+        with open(base_path + _SETTINGS_EXTENSION, "w") as f:
+            json.dump(settings, f)
+        # Write to a temporary file and rename it, so that an interrupted write never leaves a corrupted checkpoint
+        temp_path = base_path + ".tmp"
+        snapshot.save_snapshot(temp_path, grid, rule, generation, boundary, engine)
+        os.replace(temp_path, base_path + snapshot.SNAPSHOT_EXTENSION)
+
+        for file_path in list_checkpoints(self._folder)[:-self._keep]:
+            remove_checkpoint(file_path)
+
+
+def list_checkpoints(folder: str) -> list:
+    """
+    :param folder: The folder of the checkpoint files
+    :return: The paths of the snapshot files of the checkpoints, from the oldest to the most recent (in the order they
+    have been written)
+    """
+    file_paths = [file_path for file_path in glob.glob(os.path.join(folder, "checkpoint-*.snap"))
+                  if _CHECKPOINT_PATTERN.search(file_path)]
+    return sorted(file_paths, key=_get_sequence)
+
+
+def _get_sequence(file_path: str) -> int:
+    """
+    :return: The sequence number of a checkpoint file
+    """
+    return int(_CHECKPOINT_PATTERN.search(file_path).group(1))
+
+
+def find_latest_checkpoint(folder: str) -> str:
+    """
+    :param folder: The folder of the checkpoint files
+    :return: The path of the snapshot file of the most recent checkpoint. None if there are no checkpoints
+    """
+    file_paths = list_checkpoints(folder) if os.path.isdir(folder) else []
+    return file_paths[-1] if file_paths else None
+
+
+def read_checkpoint_settings(file_path: str) -> dict:
+    """
+    :param file_path: The path of the snapshot file of a checkpoint
+    :return: The settings saved with the checkpoint (empty if missing or unreadable)
+    """
+    settings_path = os.path.splitext(file_path)[0] + _SETTINGS_EXTENSION
+    try:
+        with open(settings_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remove_checkpoint(file_path: str):
+    """
+    Delete the files of a checkpoint
+
+    :param file_path: The path of the snapshot file of the checkpoint
+    """
+    for path in (file_path, os.path.splitext(file_path)[0] + _SETTINGS_EXTENSION):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -11,3 +11,5 @@ AGE_COLOR_TABLE = [DEAD_COLOR] + [qRgb(0, 255-i*2, 255) for i in range(128)] +\
                   [qRgb(i*2, 0, 255-i*2) for i in range(127)]
 # Alive cell: white - Dead cell: black
 BINARY_COLOR_TABLE = [DEAD_COLOR] + [ALIVE_COLOR for i in range(256)]
+# From dark gray (a single alive cell) to white (all the cells alive), for the pixels showing several cells
+DENSITY_COLOR_TABLE = [DEAD_COLOR] + [qRgb(64 + i*3//4, 64 + i*3//4, 64 + i*3//4) for i in range(255)]
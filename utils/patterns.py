@@ -1,71 +1,415 @@
+"""
+Reading and writing of pattern files. The supported formats are:
+- Plain text (.cells): one line of characters per row of the grid, "O" for alive cells and "." for dead ones
+- Run Length Encoded (.rle): runs of cells in the form <count><tag> ("o": alive, "b": dead, "$": end of row)
+- Life 1.06 (.lif, .life): the coordinates "x y" of each alive cell, one per line
+
+Each file is read once as bytes and decoded with vectorized numpy operations, so the cost of Python code is
+proportional to the number of lines (or of comment lines for RLE and Life 1.06) rather than to the number of cells.
+"""
 import os
+import re
+
 import numpy as np
 
 from config import config
 
+CELLS = "cells"
+RLE = "rle"
+LIFE_106 = "life 1.06"
+
+# Pattern format of each supported file extension
+PATTERN_EXTENSIONS = {".cells": CELLS, ".rle": RLE, ".lif": LIFE_106, ".life": LIFE_106}
+
+_LIFE_106_HEADER = b"#Life 1.06"
+# Header line of the RLE format, e.g. "x = 3, y = 2, rule = B3/S23"
+_RLE_HEADER = re.compile(rb"^\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*([^\s:]+))?", re.IGNORECASE)
+# Length of the lines of the RLE files written (as recommended by the format specification)
+_RLE_LINE_LENGTH = 70
+# Class of each byte value, to classify the characters of a file with a single lookup
+_OTHER, _SPACE, _DIGIT, _MINUS = 0, 1, 2, 3
+_CHAR_CLASSES = np.zeros(256, dtype=np.uint8)
+_CHAR_CLASSES[np.frombuffer(b" \t\r\n", dtype=np.uint8)] = _SPACE
+_CHAR_CLASSES[ord("0"):ord("9") + 1] = _DIGIT
+_CHAR_CLASSES[ord("-")] = _MINUS
+
 
 def get_available_patterns() -> list:
     """
-    Search for available GOL classical into the patterns directory. It only considers files with the .cells extension (plain text format).
+    Search for available GOL classical into the patterns directory. It only considers the files of the supported formats
+    (see PATTERN_EXTENSIONS).
 
     :return: A list containing the names of the available GOl examples
     """
     path_folder = os.path.join(config.ROOT_PATH, config.FOLDER_PATTERNS)
-    return [f.replace(".cells", "") for f in os.listdir(path_folder) if os.path.isfile(os.path.join(path_folder, f)) and f.endswith(".cells")]
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(path_folder)
+                  if os.path.isfile(os.path.join(path_folder, f)) and os.path.splitext(f)[1] in PATTERN_EXTENSIONS)
 
 
-def read_pattern_file(file_path: str) -> np.ndarray:
+def get_pattern_file(pattern_name: str) -> str:
     """
-    Read the pattern from the specified file into a numpy array. The only format supported is plain text (.cells extension)
+    :param pattern_name: The name of one of the available patterns (see get_available_patterns)
+    :return: The path of the pattern file. None if the pattern is not found
+    """
+    path_folder = os.path.join(config.ROOT_PATH, config.FOLDER_PATTERNS)
+    for extension in PATTERN_EXTENSIONS:
+        file_path = os.path.join(path_folder, pattern_name + extension)
+        if os.path.isfile(file_path):
+            return file_path
+    return None
 
-    :param file_path: The pattern file to load
-    :return: The numpy array containing the dead and alive cells of the requested pattern. None if the pattern file is not found
+
+def get_pattern_format(file_path: str, data: bytes = None) -> str:
     """
+    Get the format of a pattern file from its extension or, if the extension is not known, from its content
 
-    # Check if the example file exists
+    :param file_path: The pattern file
+    :param data: The content of the file, if already read
+    :return: The format of the file (CELLS, RLE or LIFE_106)
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in PATTERN_EXTENSIONS or data is None:
+        return PATTERN_EXTENSIONS.get(extension, CELLS)
+
+    if data.startswith(_LIFE_106_HEADER):
+        return LIFE_106
+    for line in data.splitlines():
+        if not line.startswith(b"#"):
+            return RLE if _RLE_HEADER.match(line) else CELLS
+    return CELLS
+
+
+def read_pattern(file_path: str) -> tuple:
+    """
+    Read a pattern file of any of the supported formats
+
+    :param file_path: The pattern file to load
+    :return: A tuple (grid, rule): the numpy array (uint8) with the dead (0) and alive (1) cells of the pattern and
+        the rule of the pattern in B/S notation, or None if the file does not specify one (the Game of Life is assumed).
+        None if the pattern file is not found
+    :raise ValueError: If the file is not a valid pattern file
+    """
+    # Check if the pattern file exists
     if not os.path.isfile(file_path):
         return None
 
-    rows = 0
-    cols = 0
-    with open(file_path) as f:
-        for i, l in enumerate(f):
-            if l[0] != "!":
-                rows += 1
-                if len(l) > cols:
-                    cols = len(l) - 1  # Exclude the end of line char from the column count
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    pattern_format = get_pattern_format(file_path, data)
+    if pattern_format == RLE:
+        return _decode_rle(data)
+    elif pattern_format == LIFE_106:
+        return _decode_life_106(data)
+    return _decode_cells(data)
+
+
+def read_pattern_file(file_path: str) -> np.ndarray:
+    """
+    Read the pattern from the specified file into a numpy array (see read_pattern)
 
-    grid = np.zeros((rows, cols), dtype=np.uint8)
+    :param file_path: The pattern file to load
+    :return: The numpy array containing the dead and alive cells of the requested pattern. None if the pattern file is
+        not found
+    """
+    pattern = read_pattern(file_path)
+    return None if pattern is None else pattern[0]
 
-    skip_rows = 0
-    with open(file_path) as f:
-        for j, line in enumerate(f):
-            for k, c in enumerate(line):
-                if c == "!" and k == 0:
-                    skip_rows += 1
-                    break
-                elif c == "O":
-                    grid[j - skip_rows, k] = 1
 
-    return grid
+def save_pattern(file_path: str, grid_pattern: np.ndarray, rule: str = None, pattern_format: str = None):
+    """
+    Write a pattern into a file
+
+    :param file_path: The file into which save the pattern
+    :param grid_pattern: Numpy array representing the grid state of the pattern (non-zero cells are alive)
+    :param rule: The rule of the pattern in B/S notation. It is omitted if None
+    :param pattern_format: The format of the file (CELLS, RLE or LIFE_106). By default it depends on the file extension
+    """
+    pattern_format = pattern_format or get_pattern_format(file_path)
+    grid_alive = np.asarray(grid_pattern).astype(bool)
+    if pattern_format == RLE:
+        data = _encode_rle(grid_alive, rule)
+    elif pattern_format == LIFE_106:
+        data = _encode_life_106(grid_alive, rule)
+    else:
+        data = _encode_cells(grid_alive, rule)
+
+    with open(file_path, mode="wb") as f:
+        f.write(data)
 
 
-def save_pattern_file(file_path: str, grid_pattern: np.ndarray):
+def save_pattern_file(file_path: str, grid_pattern: np.ndarray, rule: str = None):
     """
-    Write a pattern into a .cells file (using the plain text format)
+    Write a pattern into a file, in the format given by the file extension (see save_pattern)
     :param file_path: The file into which save the pattern
     :param grid_pattern: Numpy array representing the grid state of the pattern
-    :return:
+    :param rule: The rule of the pattern in B/S notation. It is omitted if None
     """
+    save_pattern(file_path, grid_pattern, rule)
 
-    # Transform the grid into a list of string lines
-    lines = []
-    for row in range(len(grid_pattern)):
-        line = ["." if cell == 0 else "O" for cell in grid_pattern[row]]
-        line_str = "".join(line) + "\n"
-        lines.append(line_str)
 
-    with open(file_path, mode="w") as f:
-        f.writelines(lines)
+def _comment_rule(comment: bytes) -> str:
+    """
+    :param comment: A comment line without the comment prefix (e.g. "Rule: B36/S23")
+    :return: The rule specified by the comment line, or None
+    """
+    text = comment.decode("utf-8", errors="replace").strip()
+    if text.lower().startswith("rule:"):
+        return text[len("rule:"):].strip()
+    return None
+
+
+def _decode_cells(data: bytes) -> tuple:
+    """
+    Decode a pattern in plain text format. Lines starting with "!" are comments
+    """
+    rule = None
+    rows = []
+    for line in data.splitlines():
+        if line.startswith(b"!"):
+            rule = _comment_rule(line[1:]) or rule
+        else:
+            rows.append(line)
+
+    cols = max((len(row) for row in rows), default=0)
+    # Pad the rows to the same length and decode all the characters at once
+    cells = np.frombuffer(b"".join(row.ljust(cols, b".") for row in rows), dtype=np.uint8).reshape(len(rows), cols)
+    grid = ((cells == ord("O")) | (cells == ord("*"))).astype(np.uint8)
+    return grid, rule
+
+
+def _decode_rle(data: bytes) -> tuple:
+    """
+    Decode a pattern in RLE format: comment lines starting with "#", the header line and the runs of cells up to "!"
+    """
+    lines = data.splitlines()
+    rule = None
+    header = None
+    for index, line in enumerate(lines):
+        if line.startswith(b"#"):
+            # Rule comment of the older RLE files, e.g. "#r 23/3"
+            if line[1:2] in (b"r", b"R"):
+                rule = line[2:].decode("utf-8", errors="replace").strip() or rule
+            continue
+        header = _RLE_HEADER.match(line)
+        if header is None:
+            raise ValueError("Invalid RLE file: missing header line")
+        body = b"".join(lines[index + 1:])
+        break
+    else:
+        raise ValueError("Invalid RLE file: missing header line")
+
+    width, height = int(header.group(1)), int(header.group(2))
+    if header.group(3):
+        rule = header.group(3).decode("utf-8", errors="replace")
+
+    # Drop whitespace and everything after the final "!"
+    runs = np.frombuffer(body.split(b"!", 1)[0], dtype=np.uint8)
+    runs = runs[_CHAR_CLASSES[runs] != _SPACE]
+
+    # Each tag is preceded by an optional run count: find the tags and read the digits before them
+    is_digit = (runs >= ord("0")) & (runs <= ord("9"))
+    tag_indices = np.flatnonzero(~is_digit)
+    tags = runs[tag_indices]
+    if np.any(is_digit[tag_indices[-1] + 1:] if tag_indices.size else is_digit):
+        raise ValueError("Invalid RLE file: run count without tag")
+    digits_count = np.diff(tag_indices, prepend=-1) - 1
+    digit_values = runs.astype(np.int64) - ord("0")
+    counts = np.zeros(tag_indices.size, dtype=np.int64)
+    for position in range(1, int(digits_count.max(initial=0)) + 1):
+        has_digit = digits_count >= position
+        counts[has_digit] += digit_values[tag_indices[has_digit] - position] * 10 ** (position - 1)
+    counts[digits_count == 0] = 1
+
+    # Position of each run: the "$" tags move down by count rows, the other tags move right by count cells
+    is_row_end = tags == ord("$")
+    row_advance = np.where(is_row_end, counts, 0)
+    col_advance = np.where(is_row_end, 0, counts)
+    run_rows = np.cumsum(row_advance) - row_advance
+    cum_cols = np.cumsum(col_advance)
+    last_row_end = np.maximum.accumulate(np.where(is_row_end, np.arange(tags.size), -1))
+    row_first_col = np.where(last_row_end >= 0, cum_cols[np.maximum(last_row_end, 0)], 0)
+    run_cols = cum_cols - col_advance - row_first_col
+
+    # Every tag other than "b" (dead) and "$" is an alive run (multi-state tags are considered alive)
+    alive = ~is_row_end & (tags != ord("b")) & (tags != ord("B")) & (tags != ord("."))
+    run_rows, run_cols, run_counts = run_rows[alive], run_cols[alive], counts[alive]
+
+    # Expand the runs into cells
+    cell_rows = np.repeat(run_rows, run_counts)
+    run_starts = np.cumsum(run_counts) - run_counts
+    cell_cols = np.repeat(run_cols - run_starts, run_counts) + np.arange(cell_rows.size)
+
+    height = max(height, int(cell_rows.max(initial=-1)) + 1)
+    width = max(width, int(cell_cols.max(initial=-1)) + 1)
+    grid = np.zeros((height, width), dtype=np.uint8)
+    grid[cell_rows, cell_cols] = 1
+    return grid, rule
+
+
+def _decode_life_106(data: bytes) -> tuple:
+    """
+    Decode a pattern in Life 1.06 format: the "#Life 1.06" header, other comment lines starting with "#" and the
+    coordinates of the alive cells, which can be negative
+    """
+    rule = None
+    comments_end = 0
+    # Only the comment lines at the beginning of the file are split
+    while data.startswith(b"#", comments_end):
+        line_end = data.find(b"\n", comments_end)
+        line_end = len(data) if line_end < 0 else line_end + 1
+        line = data[comments_end:line_end]
+        # Rule comment used by some files, e.g. "#R 23/3"
+        if line[1:2] in (b"r", b"R"):
+            rule = line[2:].decode("utf-8", errors="replace").strip() or rule
+        comments_end = line_end
+
+    coordinates = _parse_integers(data[comments_end:])
+    if coordinates.size % 2:
+        raise ValueError("Invalid Life 1.06 file: odd number of coordinates")
+
+    cols, rows = coordinates[0::2], coordinates[1::2]
+    if rows.size == 0:
+        return np.zeros((0, 0), dtype=np.uint8), rule
+    rows, cols = rows - rows.min(), cols - cols.min()
+    grid = np.zeros((rows.max() + 1, cols.max() + 1), dtype=np.uint8)
+    grid[rows, cols] = 1
+    return grid, rule
+
+
+def _encode_cells(grid_alive: np.ndarray, rule: str) -> bytes:
+    header = b"" if rule is None else f"!Rule: {rule}\n".encode()
+    # Build the characters of all the cells at once, with a newline at the end of each row
+    chars = np.full((grid_alive.shape[0], grid_alive.shape[1] + 1), ord("\n"), dtype=np.uint8)
+    chars[:, :-1] = np.where(grid_alive, ord("O"), ord("."))
+    return header + chars.tobytes()
+
+
+def _encode_rle(grid_alive: np.ndarray, rule: str) -> bytes:
+    height, width = grid_alive.shape
+    header = f"x = {width}, y = {height}" + ("" if rule is None else f", rule = {rule}")
+
+    # Find the runs of equal cells of each row, dropping the trailing dead runs
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = grid_alive
+    changes = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(changes == 1)
+    _, run_ends = np.nonzero(changes == -1)
+
+    # Alternate dead and alive runs: the dead run before each alive run starts where the previous alive run in the same
+    # row ends (or at the row start)
+    previous_ends = np.zeros_like(run_starts)
+    same_row = np.zeros(run_rows.size, dtype=bool)
+    same_row[1:] = run_rows[1:] == run_rows[:-1]
+    previous_ends[1:] = np.where(same_row[1:], run_ends[:-1], 0)
+    row_skips = np.diff(run_rows, prepend=0)
+    row_skips[same_row] = 0
+
+    # Tokens of each run, in order: the row ends before it (if any), the dead cells before it (if any) and its alive
+    # cells. The run of the last row is followed by the final "!"
+    token_counts = np.column_stack((row_skips, run_starts - previous_ends, run_ends - run_starts)).ravel()
+    token_tags = np.tile(np.frombuffer(b"$bo", dtype=np.uint8), run_rows.size)
+    present = token_counts > 0
+    token_counts = np.append(token_counts[present], 1)
+    token_tags = np.append(token_tags[present], ord("!"))
+    return (header + "\n").encode() + _format_tokens(token_counts, token_tags)
+
+
+def _format_tokens(counts: np.ndarray, tags: np.ndarray) -> bytes:
+    """
+    Format the tokens <count><tag> of an RLE body (the count is omitted when equal to 1) into lines of at most
+    _RLE_LINE_LENGTH characters, without splitting the tokens
+
+    :param counts: Numpy array with the count of each token
+    :param tags: Numpy array (uint8) with the character of the tag of each token
+    :return: The formatted tokens
+    """
+    digits = np.where(counts > 1, _count_digits(counts), 0)
+    lengths = digits + 1
+    ends = np.cumsum(lengths)
+    # A line holds the tokens ending within the same window: a window is shorter than a line by the length of the
+    # longest token, which can start before the window
+    window = _RLE_LINE_LENGTH - int(lengths.max()) + 1
+    windows = (ends - 1) // window
+    # Number the lines skipping the empty windows
+    lines = np.zeros(windows.size, dtype=np.int64)
+    np.cumsum(windows[1:] != windows[:-1], out=lines[1:])
+    # Each line but the first is preceded by a newline
+    starts = ends - lengths + lines
+
+    output = np.full(int(ends[-1] + lines[-1] + 1), ord("\n"), dtype=np.uint8)
+    output[starts + digits] = tags
+    _write_digits(output, starts + digits, counts, digits)
+    return output.tobytes()
+
+
+def _encode_life_106(grid_alive: np.ndarray, rule: str) -> bytes:
+    header = "#Life 1.06\n" + ("" if rule is None else f"#R {rule}\n")
+    rows, cols = np.nonzero(grid_alive)
+    # Lines "<col> <row>\n" of all the alive cells, written at once
+    cols_digits, rows_digits = _count_digits(cols), _count_digits(rows)
+    ends = np.cumsum(cols_digits + rows_digits + 2)
+    output = np.full(int(ends[-1]) if ends.size else 0, ord(" "), dtype=np.uint8)
+    output[ends - 1] = ord("\n")
+    _write_digits(output, ends - 1, rows, rows_digits)
+    _write_digits(output, ends - 2 - rows_digits, cols, cols_digits)
+    return header.encode() + output.tobytes()
+
+
+def _count_digits(values: np.ndarray) -> np.ndarray:
+    """
+    :param values: Numpy array of non-negative integers
+    :return: Numpy array with the number of decimal digits of each value
+    """
+    digits = np.ones(values.shape, dtype=np.int64)
+    power = 10
+    while True:
+        more = values >= power
+        if not more.any():
+            return digits
+        digits += more
+        power *= 10
+
+
+def _write_digits(output: np.ndarray, ends: np.ndarray, values: np.ndarray, digits: np.ndarray):
+    """
+    Write in place the decimal digits of non-negative integers into a buffer of characters
+
+    :param output: Numpy array (uint8) with the characters
+    :param ends: Position following the last digit of each value
+    :param values: Numpy array of the values
+    :param digits: Numpy array with the number of digits to write for each value (0 to skip the value)
+    """
+    for position in range(int(digits.max(initial=0))):
+        # Digits from the least significant one
+        has_digit = digits > position
+        output[ends[has_digit] - 1 - position] = ord("0") + values[has_digit] // 10 ** position % 10
+
+
+def _parse_integers(data: bytes) -> np.ndarray:
+    """
+    Parse the integers separated by whitespace of a text
+
+    :param data: The text
+    :return: Numpy array (int64) with the integers
+    :raise ValueError: If the text contains something other than integers
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    classes = _CHAR_CLASSES[chars]
+    if np.any(classes == _OTHER):
+        raise ValueError("Invalid file: integers expected")
 
+    # Split the text into tokens of consecutive non whitespace characters
+    in_token = classes != _SPACE
+    bounds = np.flatnonzero(np.diff(in_token, prepend=False, append=False))
+    token_starts, token_ends = bounds[0::2], bounds[1::2]
+    negative = classes[token_starts] == _MINUS
+    digits = token_ends - token_starts - negative
+    if np.any(digits <= 0) or np.count_nonzero(classes == _MINUS) != np.count_nonzero(negative):
+        raise ValueError("Invalid file: integers expected")
 
+    values = np.zeros(token_starts.size, dtype=np.int64)
+    for position in range(int(digits.max(initial=0))):
+        has_digit = digits > position
+        values[has_digit] += (chars[token_ends[has_digit] - 1 - position] - ord("0")).astype(np.int64) * 10 ** position
+    return np.where(negative, -values, values)
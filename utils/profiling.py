@@ -0,0 +1,192 @@
+"""
+Optional instrumentation of the simulation hot path: timers of the code sections and event counters.
+When the profiler is disabled (the default, see config.PROFILING) a section costs a method call and a flag check, so the
+instrumentation can stay in the step loop.
+
+    with profiler.section(profiling.STEP):
+        engine.step()
+"""
+import threading
+import time
+
+from config import config
+
+# Sections of the step loop
+STEP = "step"  # Evolution of the grid by the engine
+EXPORT = "export"  # Export of the grid from the engine (which computes the cells age if it only stores the alive state)
+NOTIFY = "notify"  # Update of the model and emission of its signal (repaint included)
+QUEUE = "queue"  # Delay between the export of a generation by the worker thread and its display
+QIMAGE = "qimage"  # Conversion of the rendered grid into the QPixmap drawn on the widget
+SCALE = "scale"  # Rendering of the visible cells at the widget resolution (see utils.viewport)
+SECTIONS = (STEP, EXPORT, NOTIFY, QUEUE, QIMAGE, SCALE)
+# Counters
+COALESCED = "coalesced"  # Changes of the grid replaced by a newer one before being rendered
+
+
+class _NullSection:
+    """
+    Section of a disabled profiler, which measures nothing
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """
+    Timer of a single execution of a code section, used as a context manager. Each execution has its own timer, so
+    nested sections and sections running on several threads at once do not mix their start times
+    """
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Profiler:
+    """
+    Collector of the time spent in the code sections and of event counters.
+    Sections can be timed from any thread; the statistics are accumulated from the last reset.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        # Statistics of each section: [calls, total seconds, max seconds]
+        self._timings = {}
+        self._counters = {}
+        # Start time of the pending measures (see mark)
+        self._marks = {}
+        self._reset_time = time.perf_counter()
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def set_enabled(self, enabled: bool):
+        """
+        Enable or disable the profiler. Enabling it resets the statistics
+        """
+        if enabled and not self._enabled:
+            self.reset()
+        self._enabled = enabled
+
+    def section(self, name: str):
+        """
+        :param name: The name of the section (e.g. one of SECTIONS)
+        :return: A context manager timing the enclosed code (a no-op one if the profiler is disabled)
+        """
+        if not self._enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def add(self, name: str, seconds: float):
+        """
+        Record a measure of a section
+
+        :param name: The name of the section
+        :param seconds: The time spent in the section
+        """
+        if not self._enabled:
+            return
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                if seconds > timing[2]:
+                    timing[2] = seconds
+
+    def count(self, name: str, n: int = 1):
+        """
+        Increment an event counter
+
+        :param name: The name of the counter
+        :param n: The increment
+        """
+        if not self._enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def mark(self, name: str):
+        """
+        Start a measure that ends in another part of the code, possibly on another thread (see add_since_mark)
+
+        :param name: The name of the section
+        """
+        if self._enabled:
+            self._marks[name] = time.perf_counter()
+
+    def add_since_mark(self, name: str):
+        """
+        Record the time elapsed since the last mark of a section, if any. The mark is consumed, so that each mark is
+        measured once
+
+        :param name: The name of the section
+        """
+        start = self._marks.pop(name, None)
+        if start is not None:
+            self.add(name, time.perf_counter() - start)
+
+    def reset(self):
+        """
+        Clear the statistics
+        """
+        with self._lock:
+            self._timings = {}
+            self._counters = {}
+            self._marks = {}
+            self._reset_time = time.perf_counter()
+
+    def get_stats(self, reset: bool = False) -> dict:
+        """
+        :param reset: Whether to clear the statistics after reading them (to get the statistics of an interval)
+        :return: The statistics since the last reset as a JSON serializable dictionary: the elapsed seconds, the calls,
+        the total, mean and max time (in seconds) of each section and the counters
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._reset_time
+            sections = {name: {"calls": calls, "total": total, "mean": total / calls, "max": max_time}
+                        for name, (calls, total, max_time) in self._timings.items()}
+            stats = {"elapsed": elapsed, "sections": sections, "counters": dict(self._counters)}
+        if reset:
+            self.reset()
+        return stats
+
+
+def format_stats(stats: dict) -> str:
+    """
+    :param stats: Statistics returned by Profiler.get_stats
+    :return: A text table of the statistics, one section per line
+    """
+    elapsed = stats["elapsed"] or 1e-9
+    lines = [f"{'section':<8} {'calls/s':>8} {'mean ms':>8} {'max ms':>8} {'busy':>6}"]
+    names = [name for name in SECTIONS if name in stats["sections"]] + \
+            sorted(name for name in stats["sections"] if name not in SECTIONS)
+    for name in names:
+        section = stats["sections"][name]
+        lines.append(f"{name:<8} {section['calls'] / elapsed:>8.1f} {section['mean'] * 1000:>8.2f} "
+                     f"{section['max'] * 1000:>8.2f} {section['total'] / elapsed:>6.1%}")
+    for name, value in sorted(stats["counters"].items()):
+        lines.append(f"{name:<8} {value / elapsed:>8.1f}")
+    return "\n".join(lines)
+
+
+profiler = Profiler(config.PROFILING)
@@ -0,0 +1,204 @@
+"""
+Compact binary snapshots of the grid state.
+A snapshot file is made of:
+- a header with the grid size, the generation, the rule, the boundary condition and the engine of the simulation
+- the alive plane: the alive state of the cells packed 8 per byte, row by row (see np.packbits)
+- optionally, the age plane: the age of each cell as a byte, row by row
+The planes start at offsets aligned to _ALIGNMENT bytes, so that they can be memory-mapped: loading a snapshot only
+reads its header, while the cells are read from the disk when (and only where) they are accessed.
+"""
+import struct
+
+import numpy as np
+
+from engine.boundary import DEAD
+
+SNAPSHOT_EXTENSION = ".snap"
+
+_MAGIC = b"GOLSNAP\0"
+_VERSION = 1
+# Magic, version, flags, rows, cols, generation, alive plane offset, age plane offset, lengths of the rule, boundary and
+# engine strings
+_HEADER = struct.Struct("<8sHHIIQQQHHH")
+_FLAG_AGES = 1
+_ALIGNMENT = 64
+
+
+class Snapshot:
+    """
+    Grid state read from a snapshot file. The planes are memory-mapped: the cells are read from the file on access
+    """
+
+    def __init__(self, file_path: str, grid_size: tuple, generation: int, rule: str, boundary: str, engine: str,
+                 alive_offset: int, ages_offset: int):
+        rows, cols = grid_size
+        self._file_path = file_path
+        self._grid_size = grid_size
+        self._generation = generation
+        self._rule = rule
+        self._boundary = boundary
+        self._engine = engine
+        self._packed_alive = np.memmap(file_path, dtype=np.uint8, mode="r", offset=alive_offset,
+                                       shape=(rows, _packed_cols(cols))) if rows and cols else \
+            np.zeros((rows, _packed_cols(cols)), dtype=np.uint8)
+        self._ages = None
+        if ages_offset and rows and cols:
+            self._ages = np.memmap(file_path, dtype=np.uint8, mode="r", offset=ages_offset, shape=grid_size)
+
+    def get_alive(self, row: int = 0, col: int = 0, rows: int = None, cols: int = None) -> np.ndarray:
+        """
+        Read the alive state of a region of the grid. Only the rows of the region are read from the file
+
+        :param row: First row of the region
+        :param col: First column of the region
+        :param rows: Number of rows of the region (default: up to the last row)
+        :param cols: Number of columns of the region (default: up to the last column)
+        :return: Numpy array (uint8) with 1 for the alive cells and 0 for the dead ones
+        """
+        rows = self._grid_size[0] - row if rows is None else rows
+        cols = self._grid_size[1] - col if cols is None else cols
+        first_byte, last_byte = col // 8, _packed_cols(col + cols)
+        packed = self._packed_alive[row:row + rows, first_byte:last_byte]
+        unpacked = np.unpackbits(packed, axis=1)
+        return unpacked[:, col - first_byte * 8:col - first_byte * 8 + cols]
+
+    def get_ages(self) -> np.ndarray:
+        """
+        :return: Read-only memory-mapped numpy array (uint8) with the age of each cell, or None if the snapshot does
+            not store the ages
+        """
+        return self._ages
+
+    def get_boundary(self) -> str:
+        return self._boundary
+
+    def get_engine(self) -> str:
+        """
+        :return: The name of the engine of the simulation, or None if not specified
+        """
+        return self._engine
+
+    def get_file_path(self) -> str:
+        return self._file_path
+
+    def get_generation(self) -> int:
+        return self._generation
+
+    def get_grid_size(self) -> tuple:
+        return self._grid_size
+
+    def get_packed_alive(self) -> np.ndarray:
+        """
+        :return: Read-only memory-mapped numpy array (uint8) of the alive plane, with 8 cells per byte (see np.packbits)
+        """
+        return self._packed_alive
+
+    def get_rule(self) -> str:
+        return self._rule
+
+    def has_ages(self) -> bool:
+        return self._ages is not None
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Read the whole grid into memory
+
+        :return: Numpy array (uint8) with the age of each cell if the snapshot stores them, otherwise with 1 for the
+            alive cells (0: dead cell)
+        """
+        if self._ages is not None:
+            return np.array(self._ages)
+        return self.get_alive()
+
+
+def _packed_cols(cols: int) -> int:
+    return (cols + 7) // 8
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def is_snapshot_file(file_path: str) -> bool:
+    """
+    :param file_path: A file path
+    :return: True if the file starts with the signature of a snapshot
+    """
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+
+def load_snapshot(file_path: str) -> Snapshot:
+    """
+    Open a snapshot file. Only the header is read: the grid is memory-mapped
+
+    :param file_path: The snapshot file
+    :return: The snapshot
+    :raise ValueError: If the file is not a valid snapshot
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(_MAGIC):
+            raise ValueError("Invalid snapshot file")
+        (_, version, flags, rows, cols, generation, alive_offset, ages_offset, rule_length, boundary_length,
+         engine_length) = _HEADER.unpack(header)
+        if version > _VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        strings = f.read(rule_length + boundary_length + engine_length)
+        f.seek(0, 2)
+        file_size = f.tell()
+
+    if len(strings) < rule_length + boundary_length + engine_length:
+        raise ValueError("Invalid snapshot file")
+    rule = strings[:rule_length].decode("utf-8")
+    boundary = strings[rule_length:rule_length + boundary_length].decode("utf-8") or DEAD
+    engine = strings[rule_length + boundary_length:].decode("utf-8") or None
+    if not flags & _FLAG_AGES:
+        ages_offset = 0
+
+    expected_size = ages_offset + rows * cols if ages_offset else alive_offset + rows * _packed_cols(cols)
+    if file_size < expected_size:
+        raise ValueError("Invalid snapshot file: truncated")
+
+    return Snapshot(file_path, (rows, cols), generation, rule or None, boundary, engine, alive_offset, ages_offset)
+
+
+def save_snapshot(file_path: str, grid: np.ndarray, rule: str = None, generation: int = 0, boundary: str = DEAD,
+                  engine: str = None, save_ages: bool = True):
+    """
+    Write the grid state into a snapshot file
+
+    :param file_path: The file into which save the snapshot
+    :param grid: Numpy array (uint8) with the age of each cell (0: dead cell)
+    :param rule: The rule of the simulation in B/S notation. It is omitted if None
+    :param generation: The generation of the grid
+    :param boundary: The boundary condition of the grid (see engine.boundary)
+    :param engine: The name of the engine of the simulation. It is omitted if None
+    :param save_ages: Whether to store the age plane besides the alive plane
+    """
+    rows, cols = grid.shape
+    rule_bytes = (rule or "").encode("utf-8")
+    boundary_bytes = (boundary or DEAD).encode("utf-8")
+    engine_bytes = (engine or "").encode("utf-8")
+    strings = rule_bytes + boundary_bytes + engine_bytes
+
+    alive_offset = _align(_HEADER.size + len(strings))
+    ages_offset = _align(alive_offset + rows * _packed_cols(cols)) if save_ages else 0
+    header = _HEADER.pack(_MAGIC, _VERSION, _FLAG_AGES if save_ages else 0, rows, cols, generation, alive_offset,
+                          ages_offset, len(rule_bytes), len(boundary_bytes), len(engine_bytes))
+
+    with open(file_path, "wb") as f:
+        f.write(header + strings)
+        f.seek(alive_offset)
+        # Pack the rows in blocks, to bound the memory used by the temporary arrays on huge grids
+        block_rows = max(1, (1 << 24) // max(cols, 1))
+        for first_row in range(0, rows, block_rows):
+            f.write(np.packbits(grid[first_row:first_row + block_rows].astype(bool), axis=1).tobytes())
+        if save_ages:
+            f.seek(ages_offset)
+            f.write(np.ascontiguousarray(grid, dtype=np.uint8).data)
+        # Extend the file up to the end of the planes even if they are empty
+        f.truncate(ages_offset + rows * cols if save_ages else alive_offset + rows * _packed_cols(cols))
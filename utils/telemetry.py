@@ -0,0 +1,136 @@
+"""
+Export of the statistics of each generation (see engine.statistics) to a CSV or Parquet file.
+The rows are written by a background thread, so that the disk never stalls the simulation. Parquet requires pyarrow,
+which is an optional dependency.
+"""
+import csv
+import os
+import queue
+import threading
+
+from engine.statistics import DTYPE, FIELDS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# File formats
+CSV = ".csv"
+PARQUET = ".parquet"
+FORMATS = (CSV, PARQUET)
+
+# Rows written at once: the size of a Parquet row group, and the rows after which a CSV file is flushed
+_BATCH_ROWS = 4096
+
+
+def get_available_formats() -> list:
+    return [file_format for file_format in FORMATS if file_format != PARQUET or pyarrow is not None]
+
+
+class TelemetryWriter(threading.Thread):
+    """
+    Thread appending the statistics of the generations to a file, in the format given by its extension.
+    Unlike the checkpoints, no row is skipped: the rows are queued until they are written.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Object constructor
+
+        :param file_path: The output file (.csv or .parquet), replaced if it exists
+        """
+        super().__init__(daemon=True)
+        self._file_format = os.path.splitext(file_path)[1].lower()
+        if self._file_format not in FORMATS:
+            raise ValueError(f"Unsupported statistics format: {self._file_format} (use {' or '.join(FORMATS)})")
+        if self._file_format == PARQUET and pyarrow is None:
+            raise ValueError("Exporting the statistics to Parquet requires pyarrow")
+        self._file_path = file_path
+        self._queue = queue.Queue()
+        self._error = None
+        self._rows = 0
+
+    def get_error(self):
+        """
+        :return: The error that stopped the writing, or None
+        """
+        return self._error
+
+    def get_file_path(self) -> str:
+        return self._file_path
+
+    def get_rows(self) -> int:
+        """
+        :return: The number of rows written
+        """
+        return self._rows
+
+    def submit(self, statistics: tuple):
+        """
+        Schedule the writing of the statistics of a generation
+
+        :param statistics: The values of the statistics, in the order of engine.statistics.FIELDS
+        """
+        self._queue.put(statistics)
+
+    def stop(self):
+        """
+        Write the pending rows and stop the thread
+        """
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            if self._file_format == CSV:
+                self._write_csv()
+            else:
+                self._write_parquet()
+        except OSError as e:
+            self._error = e
+            # Drain the queue until stopped, so that the producers are never blocked
+            while self._queue.get() is not None:
+                pass
+
+    def _get_batch(self) -> list:
+        """
+        :return: The next rows to write (waiting for at least one), or None if the writer has been stopped
+        """
+        row = self._queue.get()
+        if row is None:
+            return None
+        batch = [row]
+        while len(batch) < _BATCH_ROWS:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is None:
+                # Stop after writing this batch
+                self._queue.put(None)
+                break
+            batch.append(row)
+        return batch
+
+    def _write_csv(self):
+        with open(self._file_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            batch = self._get_batch()
+            while batch is not None:
+                writer.writerows(batch)
+                f.flush()
+                self._rows += len(batch)
+                batch = self._get_batch()
+
+    def _write_parquet(self):
+        schema = pyarrow.schema([(field, pyarrow.from_numpy_dtype(DTYPE[field])) for field in FIELDS])
+        with pyarrow.parquet.ParquetWriter(self._file_path, schema) as writer:
+            batch = self._get_batch()
+            while batch is not None:
+                columns = [pyarrow.array(column, schema.field(field).type) for field, column in zip(FIELDS, zip(*batch))]
+                writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+                self._rows += len(batch)
+                batch = self._get_batch()
@@ -4,28 +4,65 @@ from PyQt5.QtGui import QImage
 import utils.colors as colors
 
 
-def numpy_to_qimage(np_array: np.ndarray, show_age: bool):
-    """
-    Convert the numpy array representing the GOL grid to a QImage.
+def _get_bytes_per_line(width: int) -> int:
+    return (width + 3) // 4 * 4
+
+
+def _get_color_table(show_age: bool, density: bool) -> list:
+    if show_age:
+        return colors.AGE_COLOR_TABLE
+    elif density:
+        return colors.DENSITY_COLOR_TABLE
+    return colors.BINARY_COLOR_TABLE
 
-    :param np_array: Numpy array to be converted
-    :param show_age: Whether to show cells ages using progressive color transitions. If False a binary color pattern is used (dead or alive)
 
-    :return: The QImage created from the numpy array
+class GridImage:
+    """
+    Indexed QImage of the GOL grid whose pixels live in a persistent numpy buffer, updated in place at each frame.
+    The buffer is only allocated again when the size of the image changes, and the color table is only set when the
+    display mode changes
     """
 
-    # Only support 2D array of bytes
-    assert len(np_array.shape) == 2 and np_array.dtype == np.uint8
+    def __init__(self):
+        self._buffer = np.zeros((0, 0), np.uint8)
+        self._image = QImage()
+        self._width = 0
+        self._color_table = None
 
-    width = np_array.shape[1]
-    height = np_array.shape[0]
-    bytes_per_line = width
-    image = QImage(np_array, width, height, bytes_per_line, QImage.Format_Indexed8)
+    def get_image(self) -> QImage:
+        """
+        :return: The image, which shares the memory of the buffer (see get_buffer)
+        """
+        return self._image
 
-    # Maps array values to color
-    if show_age:
-        image.setColorTable(colors.AGE_COLOR_TABLE)
-    else:
-        image.setColorTable(colors.BINARY_COLOR_TABLE)
+    def get_buffer(self, width: int, height: int) -> np.ndarray:
+        """
+        Resize the image if needed
+
+        :param width: The width of the image in pixels
+        :param height: The height of the image in pixels
+        :return: The numpy array (uint8) of the image pixels, to update in place. Its lines are padded to 4 bytes, so it
+        can be wider than the image: the padding is ignored
+        """
+        if width != self._width or height != self._buffer.shape[0]:
+            self._width = width
+            self._buffer = np.zeros((height, _get_bytes_per_line(width)), np.uint8)
+            if width and height:
+                self._image = QImage(self._buffer, width, height, self._buffer.shape[1], QImage.Format_Indexed8)
+            else:
+                self._image = QImage()
+            self._color_table = None
+        return self._buffer
+
+    def set_mode(self, show_age: bool, density: bool = False):
+        """
+        Choose the colors of the pixel values
 
-    return image
+        :param show_age: Whether the values are cells age, shown with progressive color transitions. If False a binary
+        color pattern is used (dead or alive)
+        :param density: Whether the values are densities of alive cells (see utils.viewport) rather than cells age
+        """
+        color_table = _get_color_table(show_age, density)
+        if color_table is not self._color_table and not self._image.isNull():
+            self._image.setColorTable(color_table)
+            self._color_table = color_table
@@ -0,0 +1,361 @@
+"""
+Viewport on the grid: the zoom and pan state of the view and the rendering of the visible cells at the screen
+resolution. Only the visible window of the grid is read, so the cost of a frame depends on the size of the view rather
+than on the size of the grid. The cells crossed by the mouse between two of its positions are given by line_cells.
+"""
+import math
+
+import numpy as np
+
+from config import config
+
+# Reductions of the cells shown by a single pixel (zoomed out beyond one cell per pixel)
+ANY = "any"  # The pixel shows the oldest cell (alive if any cell is alive)
+DENSITY = "density"  # The pixel shows the fraction of alive cells, from 1 (a single cell) to 255 (all the cells)
+REDUCTIONS = (ANY, DENSITY)
+
+# Largest zoom, in pixels per cell
+MAX_ZOOM = 64
+
+
+def line_cells(start: tuple, end: tuple) -> tuple:
+    """
+    Cells of the digital line between two cells, as drawn by Bresenham's algorithm (up to the rounding of the ties): one
+    cell for each row or column along the longest axis, so that consecutive cells are adjacent
+
+    :param start: The first cell (row, column), excluded from the line
+    :param end: The last cell (row, column)
+    :return: The rows and the columns of the cells as numpy arrays
+    """
+    d_row, d_col = end[0] - start[0], end[1] - start[1]
+    steps = max(abs(d_row), abs(d_col))
+    t = np.arange(1, steps + 1)
+    # Integer rounding of the exact position along the shortest axis (half steps round up)
+    rows = start[0] + (2 * d_row * t + steps) // (2 * steps)
+    cols = start[1] + (2 * d_col * t + steps) // (2 * steps)
+    return rows, cols
+
+
+class Viewport:
+    """
+    Mapping between the cells of the grid and the pixels of the view.
+    The view shows the grid scaled by the zoom (pixels per cell) around a center cell. In fit mode, the default, the
+    whole grid is shown as large as possible and it is centered in the view.
+    """
+
+    def __init__(self, reduction: str = None, max_cells: int = None):
+        """
+        Object constructor
+
+        :param reduction: How to reduce the cells shown by a single pixel (see REDUCTIONS, default: config.RENDER_REDUCTION)
+        :param max_cells: Maximum number of cells read to render a zoomed out view (default: config.RENDER_MAX_CELLS).
+        Beyond it, the reduction samples the cells of each pixel, so the rendering cost stays bounded on huge grids
+        """
+        reduction = reduction or config.RENDER_REDUCTION
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction: {reduction}")
+        self._reduction = reduction
+        self._max_cells = max_cells or config.RENDER_MAX_CELLS
+        # Size of the grid (rows, columns) and of the view (width, height) in pixels
+        self._grid_size = (1, 1)
+        self._view_size = (1, 1)
+        # Pixels per cell and coordinates (row, column) of the cell shown at the center of the view
+        self._zoom = 1.0
+        self._center = (0.5, 0.5)
+        self._fit = True
+        # Mapping between pixels and cells of the last rendered view, and arrays reused by the frames (see render)
+        self._mapping_key = None
+        self._mapping = None
+        self._buffers = {}
+
+    def get_center(self) -> tuple:
+        return self._center
+
+    def get_reduction(self) -> str:
+        return self._reduction
+
+    def get_zoom(self) -> float:
+        return self._zoom
+
+    def is_fit(self) -> bool:
+        return self._fit
+
+    def set_sizes(self, grid_size: tuple, view_size: tuple):
+        """
+        :param grid_size: The size of the grid as (rows, columns)
+        :param view_size: The size of the view as (width, height) in pixels
+        """
+        self._grid_size = (max(grid_size[0], 1), max(grid_size[1], 1))
+        self._view_size = (max(view_size[0], 1), max(view_size[1], 1))
+        if self._fit:
+            self.fit()
+        else:
+            self._zoom = max(self._zoom, self._get_fit_zoom())
+            self._clamp_center()
+
+    def fit(self):
+        """
+        Show the whole grid, centered in the view
+        """
+        self._fit = True
+        self._zoom = self._get_fit_zoom()
+        self._center = (self._grid_size[0] / 2, self._grid_size[1] / 2)
+
+    def _get_fit_zoom(self) -> float:
+        return min(self._view_size[0] / self._grid_size[1], self._view_size[1] / self._grid_size[0])
+
+    def zoom_at(self, factor: float, x: float, y: float):
+        """
+        Change the zoom keeping the cell under a point of the view in place. The view cannot be zoomed out beyond the
+        fit zoom
+
+        :param factor: The zoom multiplier (> 1 to zoom in)
+        :param x: Horizontal coordinate of the point in pixels
+        :param y: Vertical coordinate of the point in pixels
+        """
+        fit_zoom = self._get_fit_zoom()
+        zoom = min(max(self._zoom * factor, fit_zoom), max(MAX_ZOOM, fit_zoom))
+        if zoom <= fit_zoom:
+            self.fit()
+            return
+
+        # Cell coordinates of the point, which must not move
+        row = self._center[0] + (y - self._view_size[1] / 2) / self._zoom
+        col = self._center[1] + (x - self._view_size[0] / 2) / self._zoom
+        self._zoom = zoom
+        self._center = (row - (y - self._view_size[1] / 2) / zoom, col - (x - self._view_size[0] / 2) / zoom)
+        self._fit = False
+        self._clamp_center()
+
+    def pan(self, dx: float, dy: float):
+        """
+        Move the grid in the view
+
+        :param dx: Horizontal displacement in pixels
+        :param dy: Vertical displacement in pixels
+        """
+        if self._fit and self._zoom == self._get_fit_zoom():
+            # The whole grid is already visible
+            return
+        self._center = (self._center[0] - dy / self._zoom, self._center[1] - dx / self._zoom)
+        self._fit = False
+        self._clamp_center()
+
+    def _clamp_center(self):
+        # Keep the center on the grid, so that the grid never leaves the view
+        self._center = (min(max(self._center[0], 0), self._grid_size[0]),
+                        min(max(self._center[1], 0), self._grid_size[1]))
+
+    def _get_origin(self) -> tuple:
+        """
+        :return: The view coordinates (x, y) of the upper-left corner of the grid
+        """
+        return (self._view_size[0] / 2 - self._center[1] * self._zoom,
+                self._view_size[1] / 2 - self._center[0] * self._zoom)
+
+    def get_grid_rect(self) -> tuple:
+        """
+        :return: The rectangle (x, y, width, height) of the view, in pixels, covered by the visible part of the grid
+        """
+        x_origin, y_origin = self._get_origin()
+        x0 = min(max(round(x_origin), 0), self._view_size[0])
+        y0 = min(max(round(y_origin), 0), self._view_size[1])
+        x1 = min(max(round(x_origin + self._grid_size[1] * self._zoom), x0), self._view_size[0])
+        y1 = min(max(round(y_origin + self._grid_size[0] * self._zoom), y0), self._view_size[1])
+        return x0, y0, x1 - x0, y1 - y0
+
+    def cell_at(self, x: float, y: float):
+        """
+        :param x: Horizontal coordinate of a point of the view in pixels
+        :param y: Vertical coordinate of a point of the view in pixels
+        :return: The coordinates (row, column) of the cell shown at the point, or None if the point is outside the grid
+        """
+        x0, y0, width, height = self.get_grid_rect()
+        if not (x0 <= x < x0 + width and y0 <= y < y0 + height):
+            return None
+        x_origin, y_origin = self._get_origin()
+        row = min(max(math.floor((y + 0.5 - y_origin) / self._zoom), 0), self._grid_size[0] - 1)
+        col = min(max(math.floor((x + 0.5 - x_origin) / self._zoom), 0), self._grid_size[1] - 1)
+        return row, col
+
+    def get_cells_rect(self, row: int, col: int, rows: int, cols: int):
+        """
+        :param row: First row of a rectangle of cells
+        :param col: First column of the rectangle
+        :param rows: Number of rows of the rectangle
+        :param cols: Number of columns of the rectangle
+        :return: The rectangle (x, y, width, height) of the view, in pixels, showing the cells (inside the grid rectangle,
+        see get_grid_rect), or None if they are not visible
+        """
+        row_stop, col_stop = row + rows, col + cols
+        block = self._get_block()
+        if block > 1:
+            # A pixel shows a whole block of cells (see render)
+            row, col = row - row % block, col - col % block
+            row_stop, col_stop = -(-row_stop // block) * block, -(-col_stop // block) * block
+
+        # Pixels showing the cells, with a margin for the rounding of the pixel centers
+        x_origin, y_origin = self._get_origin()
+        x0, y0, width, height = self.get_grid_rect()
+        left = max(math.floor(x_origin + col * self._zoom - 0.5), x0)
+        top = max(math.floor(y_origin + row * self._zoom - 0.5), y0)
+        right = min(math.ceil(x_origin + col_stop * self._zoom + 0.5), x0 + width)
+        bottom = min(math.ceil(y_origin + row_stop * self._zoom + 0.5), y0 + height)
+        if left >= right or top >= bottom:
+            return None
+        return left, top, right - left, bottom - top
+
+    def _get_pixel_cells(self, start: int, stop: int, origin: float, cells: int) -> np.ndarray:
+        """
+        :return: The index of the cell shown by each pixel in [start, stop) along an axis
+        """
+        pixel_cells = np.floor((np.arange(start, stop) + 0.5 - origin) / self._zoom).astype(np.intp)
+        return np.clip(pixel_cells, 0, cells - 1, out=pixel_cells)
+
+    def _get_block(self) -> int:
+        """
+        :return: The side of the square blocks of cells shown by a single pixel (1 if zoomed in)
+        """
+        return max(int(1 / self._zoom), 1)
+
+    def is_reduced(self) -> bool:
+        """
+        :return: Whether a pixel shows several cells (see render)
+        """
+        return self._get_block() > 1
+
+    def render(self, grid: np.ndarray, reduction: str = None, out: np.ndarray = None, rect: tuple = None) -> np.ndarray:
+        """
+        Render the visible part of the grid at the view resolution, replicating each cell over its pixels when zoomed in
+        and reducing the cells of each pixel (see REDUCTIONS) when zoomed out.
+        While the view does not change, the frames reuse the same arrays: rendering into out with the any reduction
+        allocates no memory
+
+        :param grid: Numpy array (uint8) with the age of each cell, of the size given to set_sizes
+        :param reduction: The reduction of the cells of each pixel (default: the one of the viewport)
+        :param out: Contiguous numpy array (uint8) where to write the pixels, with the height of the grid rectangle and at
+        least its width (e.g. an image buffer with padded lines: the padding gets copies of the last column). Default: a
+        new array of the size of the grid rectangle
+        :param rect: A rectangle (x, y, width, height) of the view inside the grid rectangle (e.g. from get_cells_rect):
+        only its pixels are rendered, reading only the cells they show. Default: the whole grid rectangle
+        :return: Numpy array (uint8) with a value for each pixel of the grid rectangle (see get_grid_rect)
+        """
+        x0, y0, width, height = self.get_grid_rect()
+        if out is None:
+            out = np.empty((height, width), np.uint8)
+        if width == 0 or height == 0:
+            return out
+
+        rows, cols, (row_start, row_stop, col_start, col_stop), block = self._get_mapping(out.shape[1])
+        # Read only a sample of the cells of each block (regularly spaced) if the window exceeds the budget
+        blocks = -(-(row_stop - row_start) // block) * -(-(col_stop - col_start) // block)
+        samples = min(max(math.isqrt(self._max_cells // blocks), 1), block)
+        target = out
+        if rect is not None:
+            left, top = rect[0] - x0, rect[1] - y0
+            rows, cols = rows[top:top + rect[3]], cols[left:left + rect[2]]
+            if len(rows) == 0 or len(cols) == 0:
+                return out
+            # Restrict the window to the cells (or blocks of cells) shown by the pixels of the rectangle
+            row_stop = min(row_start + (rows[-1] + 1) * block, row_stop)
+            col_stop = min(col_start + (cols[-1] + 1) * block, col_stop)
+            row_start, col_start = row_start + rows[0] * block, col_start + cols[0] * block
+            rows, cols = rows - rows[0], cols - cols[0]
+            target = out[top:top + len(rows), left:left + len(cols)]
+        window = grid[row_start:row_stop, col_start:col_stop]
+        if block > 1:
+            window = self._reduce(window, block, reduction or self._reduction, samples)
+
+        # Nearest neighbour: each pixel shows a cell (or block of cells) of the visible window
+        if rect is None:
+            window_rows = self._get_buffer("rows", (height, window.shape[1]), np.uint8)
+            np.take(window, rows, axis=0, out=window_rows, mode="clip")
+        else:
+            window_rows = np.take(window, rows, axis=0, mode="clip")
+        np.take(window_rows, cols, axis=1, out=target, mode="clip")
+        return out
+
+    def _get_mapping(self, out_width: int) -> tuple:
+        """
+        :param out_width: The width of the output array, which can exceed the one of the grid rectangle
+        :return: The index of the cell (or block of cells) shown by each row and column of pixels, relative to the
+        visible window of the grid, the bounds (row start, row stop, column start, column stop) of the window and the
+        size of the blocks of cells shown by a pixel. The mapping is only computed when the view changes
+        """
+        key = (self._grid_size, self._view_size, self._zoom, self._center, out_width)
+        if key == self._mapping_key:
+            return self._mapping
+
+        x0, y0, width, height = self.get_grid_rect()
+        x_origin, y_origin = self._get_origin()
+        rows = self._get_pixel_cells(y0, y0 + height, y_origin, self._grid_size[0])
+        cols = self._get_pixel_cells(x0, x0 + max(out_width, width), x_origin, self._grid_size[1])
+        row_start, col_start = rows[0], cols[0]
+        row_stop, col_stop = rows[-1] + 1, cols[width - 1] + 1
+        # The padding columns repeat the last one
+        cols[width:] = cols[width - 1]
+
+        # Number of cells (along each axis) shown by each pixel
+        block = self._get_block()
+        if block > 1:
+            # Reduce the blocks of cells, aligned to the grid so that they do not change while panning
+            row_start -= row_start % block
+            col_start -= col_start % block
+            row_stop = min(-(-row_stop // block) * block, self._grid_size[0])
+            col_stop = min(-(-col_stop // block) * block, self._grid_size[1])
+            rows = rows // block - row_start // block
+            cols = cols // block - col_start // block
+        else:
+            rows -= row_start
+            cols -= col_start
+
+        self._mapping_key = key
+        self._mapping = (rows, cols, (row_start, row_stop, col_start, col_stop), block)
+        return self._mapping
+
+    def _get_buffer(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        """
+        :return: An array reused by the frames, only allocated again when its shape changes
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype)
+        return buffer
+
+    def _reduce(self, window: np.ndarray, block: int, reduction: str, samples: int) -> np.ndarray:
+        """
+        :param window: Numpy array (uint8) with the age of the visible cells
+        :param block: Size of the square blocks of cells reduced to a single value
+        :param reduction: The reduction of the blocks (see REDUCTIONS)
+        :param samples: Number of cells read along each axis of a block
+        :return: Numpy array (uint8) with the reduction of each block (the last blocks can be partial)
+        """
+        shape = (-(-window.shape[0] // block), -(-window.shape[1] // block))
+        offsets = np.arange(samples) * block // samples
+
+        # Combine the cells at the same offset in every block: each step is a vectorized operation on a whole array of
+        # blocks, with one value per block
+        if reduction == ANY:
+            reduced = self._get_buffer("reduced", shape, np.uint8)
+            reduced.fill(0)
+            for row_offset in offsets:
+                for col_offset in offsets:
+                    cells = window[row_offset::block, col_offset::block]
+                    target = reduced[:cells.shape[0], :cells.shape[1]]
+                    np.maximum(target, cells, out=target)
+            return reduced
+
+        alive = self._get_buffer("alive", shape, np.uint16)
+        alive.fill(0)
+        # Number of cells read in each row and column of blocks (lower for the last partial blocks)
+        row_counts = np.zeros(shape[0], np.uint16)
+        col_counts = np.zeros(shape[1], np.uint16)
+        for row_offset in offsets:
+            row_counts[:len(range(row_offset, window.shape[0], block))] += 1
+            for col_offset in offsets:
+                cells = window[row_offset::block, col_offset::block]
+                alive[:cells.shape[0], :cells.shape[1]] += cells != 0
+        for col_offset in offsets:
+            col_counts[:len(range(col_offset, window.shape[1], block))] += 1
+        density = alive * (255 / np.outer(row_counts, col_counts))
+        return np.ceil(density, out=density).astype(np.uint8)
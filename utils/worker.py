@@ -1,35 +1,86 @@
 import threading
 import time
 
+# Policies for the executions missed when the task falls behind its schedule
+CATCH_UP = "catch_up"
+SKIP = "skip"
+POLICIES = (CATCH_UP, SKIP)
+
+# The last fraction of a wait is spent yielding the CPU rather than sleeping, since a sleep can overshoot its deadline by
+# the granularity of the OS timer
+_SPIN_TIME = 0.0005
+
 
 class Worker(threading.Thread):
     """
-    Object that performs a recurrent task in loop on a separate thread
+    Object that performs a recurrent task in loop on a separate thread.
+    The executions are scheduled on deadlines of the monotonic clock, so that their rate does not drift with the
+    duration of the task or the sleep granularity. When the task falls behind the schedule, the missed executions are
+    either dropped (SKIP) or run back to back to recover them (CATCH_UP, at most max_catch_up of them)
     """
 
-    def __init__(self, task, wait_time):
+    def __init__(self, task, wait_time, policy: str = SKIP, max_catch_up: int = 10):
         """
         Object constructor
 
         :param task: The task (a function) to execute
-        :param wait_time: Seconds to wait between two consecutive executions
+        :param wait_time: Seconds between the start of two consecutive executions (0: as fast as possible)
+        :param policy: How to handle the missed executions (CATCH_UP or SKIP)
+        :param max_catch_up: Maximum number of missed executions recovered with the CATCH_UP policy
         """
         super().__init__()
 
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
         self.task = task
         self.wait_time = wait_time
+        self._policy = policy
+        self._max_catch_up = max_catch_up
         self._running = False
+        # Interrupts the wait for the next deadline (see set_wait_time and stop)
+        self._wake_up = threading.Event()
 
     def run(self):
         self._running = True
+        last_start = deadline = time.perf_counter()
         while self._running:
-            start = time.time()
+            now = time.perf_counter()
+            wait_time = self.wait_time
+            if self._wake_up.is_set():
+                # The rate has changed: the next execution is one new period after the last one
+                self._wake_up.clear()
+                deadline = last_start + wait_time
+            if now < deadline:
+                self._wait(deadline - now)
+                continue
+
+            last_start = now
             self.task()
-            end = time.time()
-            time.sleep(max(self.wait_time - (end - start), 0.001))
+            if wait_time <= 0:
+                deadline = time.perf_counter()
+                continue
+
+            deadline += wait_time
+            late = time.perf_counter() - deadline
+            if late >= 0:
+                missed = int(late / wait_time)
+                if self._policy == SKIP:
+                    # Resume the schedule from the next deadline still ahead
+                    deadline += (missed + 1) * wait_time
+                elif missed > self._max_catch_up:
+                    # Only recover the most recent missed executions
+                    deadline += (missed - self._max_catch_up) * wait_time
+
+    def _wait(self, seconds: float):
+        if seconds > _SPIN_TIME:
+            self._wake_up.wait(seconds - _SPIN_TIME)
+        else:
+            time.sleep(0)
 
     def set_wait_time(self, wait_time):
         self.wait_time = wait_time
+        self._wake_up.set()
 
     def stop(self):
         self._running = False
+        self._wake_up.set()